@@ -1,10 +1,21 @@
 """Backend Server Exists here"""
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from routers import chat, screenshot, game_detection, settings
+from routers import chat, screenshot, game_detection, settings, health
+from services.lazy import start_warmup
+from services.executors import shutdown_executors
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start loading models in the background so the server answers right away."""
+    start_warmup()
+    yield
+    shutdown_executors()
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(chat.router, tags=["Chat"])
 app.include_router(screenshot.router, prefix="/screenshots", tags=["Screenshots"])
 app.include_router(game_detection.router, prefix="/games", tags=["Game Detection"])
-app.include_router(settings.router, prefix="/settings", tags=["Settings"])
\ No newline at end of file
+app.include_router(settings.router, prefix="/settings", tags=["Settings"])
+app.include_router(health.router, prefix="/health", tags=["Health"])
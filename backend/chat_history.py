@@ -4,8 +4,7 @@ Stores conversation history in ChromaDB with timestamps and game context
 """
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
-import chromadb
-from chromadb.config import Settings
+from services.vector_store import get_store
 
 
 class ChatHistoryManager:
@@ -20,10 +19,9 @@ class ChatHistoryManager:
             max_history: Maximum number of chat messages to store per game
         """
         self.max_history = max_history
-        self.client = chromadb.PersistentClient(
-            path=persist_directory,
-            settings=Settings(anonymized_telemetry=False)
-        )
+        # Shares the client (and collection handles) with the knowledge store
+        self.store = get_store(persist_directory)
+        self.client = self.store.client
     
     def _get_collection_name(self, game: str) -> str:
         """Generate collection name for game's chat history"""
@@ -31,15 +29,10 @@ class ChatHistoryManager:
     
     def _get_or_create_collection(self, game: str):
         """Get or create ChromaDB collection for a game's chat history"""
-        collection_name = self._get_collection_name(game)
-        try:
-            collection = self.client.get_collection(name=collection_name)
-        except:
-            collection = self.client.create_collection(
-                name=collection_name,
-                metadata={"game": game, "type": "chat_history"}
-            )
-        return collection
+        return self.store.get_or_create_collection(
+            self._get_collection_name(game),
+            metadata={"game": game, "type": "chat_history"}
+        )
     
     def add_message(self, game: str, user_message: str, assistant_response: str) -> None:
         """
@@ -237,7 +230,7 @@ class ChatHistoryManager:
         """Clear all chat history for a game"""
         collection_name = self._get_collection_name(game)
         try:
-            self.client.delete_collection(name=collection_name)
+            self.store.delete_collection(collection_name)
         except:
             pass
     
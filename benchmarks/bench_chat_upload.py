@@ -0,0 +1,157 @@
+"""
+Compare screenshot uploads as base64 JSON and as a raw request body.
+
+"json" posts {"message", "image_data"} to /chat, as the overlay did before.
+"raw" posts the image bytes to /chat/image with the message as a query
+parameter. Each mode runs in its own spawned process through the backend
+app with the offline fake model, for synthetic 1080p and 4K captures sent
+as full-resolution PNG (older clients) and preprocessed WebP (the overlay).
+The request body is built before measuring, so the figures cover the server
+side: median /chat latency and the growth of peak resident memory over an
+idle app that has already answered a small request.
+
+Usage: python -m benchmarks.bench_chat_upload [--repeat N] [--max-side N]
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+SIZES = {'1080p': (1920, 1080), '4K': (3840, 2160)}
+MODES = ('json', 'raw')
+MESSAGE = "What should I do here?"
+
+
+def reset_peak_rss():
+    """Start peak tracking from the current resident memory, where the OS allows it."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss() -> int:
+    """Peak resident memory of this process in bytes."""
+    try:
+        # Linux: VmHWM can be reset, unlike ru_maxrss, which a spawned process inherits from its parent
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset
+    # Bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def request_body(mode, image):
+    """URL, body and headers of one upload."""
+    if mode == 'json':
+        body = json.dumps({"message": MESSAGE, "image_data": base64.b64encode(image).decode('ascii')})
+        return "/chat", {}, body.encode('utf-8'), {"Content-Type": "application/json"}
+    return "/chat/image", {"message": MESSAGE}, image, {"Content-Type": "application/octet-stream"}
+
+
+async def post(client, url, params, body, headers):
+    start = time.perf_counter()
+    response = await client.post(url, params=params, content=body, headers=headers)
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def measure(mode, image, warmup_image, repeat):
+    import httpx
+    from backend.backend import app
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://pixly", timeout=None) as client:
+        await post(client, *request_body(mode, warmup_image))
+        request = request_body(mode, image)
+        del image
+        reset_peak_rss()
+        baseline = peak_rss()
+        times = [await post(client, *request) for _ in range(repeat)]
+        return statistics.median(times), peak_rss() - baseline
+
+
+def upload_worker(mode, path, warmup_path, max_side, repeat, results):
+    """One process per measurement, so peak memory is not inherited from earlier runs."""
+    os.environ['PIXLY_VISION_MAX_SIDE'] = str(max_side)
+    from unittest.mock import Mock, patch
+    from benchmarks.load_chat import FakeHistory
+    from routers import chat
+    from services import vector_service
+    from services.lazy import preload
+    from services.llm_provider import FakeProvider
+
+    preload(chat.chat_model, FakeProvider(latency=0, tokens_per_second=0))
+    preload(chat.chat_history_manager, FakeHistory())
+    preload(vector_service.vector_service, Mock(search_knowledge=Mock(return_value=[])))
+    with open(path, 'rb') as f:
+        image = f.read()
+    with open(warmup_path, 'rb') as f:
+        warmup_image = f.read()
+    with patch('services.chatbot.detect_current_game', return_value=None):
+        results.put(asyncio.run(measure(mode, image, warmup_image, repeat)))
+
+
+def run_mode(mode, path, warmup_path, max_side, repeat):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=upload_worker, args=(mode, path, warmup_path, max_side, repeat, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Requests per measurement (median reported)")
+    parser.add_argument("--max-side", type=int, default=1536, help="Longest side the overlay and server downscale to")
+    args = parser.parse_args()
+
+    from benchmarks.bench_image_preprocess import synthetic_frame
+    from services.image_preprocess import encode, preprocess_image
+
+    print(f"{args.repeat} requests per mode, max side {args.max_side}")
+    print(f"{'frame':<6} {'image':<5} {'mode':<5} {'body KB':>8} {'/chat ms':>8} {'peak +MB':>8}")
+    with tempfile.TemporaryDirectory(prefix="pixly-upload-") as workdir:
+        warmup_path = os.path.join(workdir, 'warmup')
+        with open(warmup_path, 'wb') as f:
+            f.write(encode(synthetic_frame(320, 180), 'PNG'))
+        for label, size in SIZES.items():
+            frame = synthetic_frame(*size)
+            images = {
+                'png': encode(frame, 'PNG'),
+                'webp': preprocess_image(frame, max_side=args.max_side, fmt='WEBP')[0]
+            }
+            for name, image in images.items():
+                path = os.path.join(workdir, f"{label}.{name}")
+                with open(path, 'wb') as f:
+                    f.write(image)
+                for mode in MODES:
+                    body = request_body(mode, image)[2]
+                    seconds, peak = run_mode(mode, path, warmup_path, args.max_side, args.repeat)
+                    print(f"{label:<6} {name:<5} {mode:<5} {len(body) / 1024:>8.0f} {seconds * 1000:>8.0f} "
+                          f"{peak / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Micro-benchmark for KnowledgeManager._clean_text.
+
+Builds a multi-megabyte text from the saved page fixtures and times the
+current cleaner against the original chain of seven re.sub calls,
+checking both produce identical output.
+
+Usage: python -m benchmarks.bench_clean_text [--megabytes N] [--repeat N]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from services.html_extractors import BeautifulSoupExtractor
+from services.knowledge_manager import knowledge_manager
+
+FIXTURES_DIR = os.path.join(project_root, "tests", "fixtures", "html")
+
+
+def legacy_clean_text(text):
+    """Original regex-chain implementation of KnowledgeManager._clean_text."""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'Advertisement\s*', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'Cookie\s*Policy\s*', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'Privacy\s*Policy\s*', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'Terms\s*of\s*Service\s*', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'Home\s*>\s*.*?>\s*', '', text)
+    text = re.sub(r'You are here:\s*.*?>\s*', '', text)
+    return text.strip()
+
+
+def build_corpus(megabytes):
+    """Concatenate raw page texts until the corpus reaches the requested size."""
+    extractor = BeautifulSoupExtractor()
+    pages = []
+    for filename in sorted(os.listdir(FIXTURES_DIR)):
+        with open(os.path.join(FIXTURES_DIR, filename), "rb") as f:
+            pages.append(extractor.extract(f.read(), [])[1])
+    page_text = "\n".join(pages)
+    copies = max(1, int(megabytes * 1e6 // len(page_text)))
+    return page_text * copies
+
+
+def time_cleaner(clean, text, repeat):
+    """Best-of-repeat wall time of one cleaning call."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        clean(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=4.0, help="Approximate corpus size")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per cleaner (best is reported)")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.megabytes)
+    identical = knowledge_manager._clean_text(corpus) == legacy_clean_text(corpus)
+
+    legacy = time_cleaner(legacy_clean_text, corpus, args.repeat)
+    current = time_cleaner(knowledge_manager._clean_text, corpus, args.repeat)
+
+    print(f"corpus: {len(corpus) / 1e6:.1f} MB, identical output: {identical}")
+    print(f"legacy  {legacy * 1000:8.1f} ms  {len(corpus) / 1e6 / legacy:8.1f} MB/s")
+    print(f"current {current * 1000:8.1f} ms  {len(corpus) / 1e6 / current:8.1f} MB/s")
+    print(f"speedup {legacy / current:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark HTML extraction backends over the saved page fixtures.
+
+Reports pages/s and MB/s per backend and checks that every backend
+extracts the same cleaned text as BeautifulSoup.
+
+Usage: python -m benchmarks.bench_html_extraction [--repeat N] [--parser NAME ...]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from services.html_extractors import available_extractors, get_extractor
+from services.knowledge_manager import knowledge_manager, WIKI_CONTENT_SELECTORS, FORUM_CONTENT_SELECTORS
+
+FIXTURES_DIR = os.path.join(project_root, "tests", "fixtures", "html")
+
+
+def load_fixtures():
+    """Load (name, html, selectors, all_matches) for every fixture page."""
+    fixtures = []
+    for filename in sorted(os.listdir(FIXTURES_DIR)):
+        if not filename.endswith(".html"):
+            continue
+        with open(os.path.join(FIXTURES_DIR, filename), "rb") as f:
+            html = f.read()
+        is_forum = filename.startswith("forum")
+        selectors = FORUM_CONTENT_SELECTORS if is_forum else WIKI_CONTENT_SELECTORS
+        fixtures.append((filename, html, selectors, is_forum))
+    return fixtures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50, help="Extractions per fixture and backend")
+    parser.add_argument("--parser", action="append", help="Backend to benchmark (default: all registered)")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+    total_bytes = sum(len(html) for _, html, _, _ in fixtures)
+    names = args.parser or available_extractors()
+
+    reference = {}
+    baseline = get_extractor("bs4")
+    for filename, html, selectors, all_matches in fixtures:
+        title, text = baseline.extract(html, selectors, all_matches)
+        reference[filename] = (title, knowledge_manager._clean_text(text))
+
+    print(f"{len(fixtures)} fixtures, {total_bytes / 1024:.0f} KiB, {args.repeat} repeats")
+    print(f"{'parser':<8} {'pages/s':>10} {'MB/s':>8} {'parity':>8}")
+    for name in names:
+        extractor = get_extractor(name)
+        matches = 0
+        for filename, html, selectors, all_matches in fixtures:
+            title, text = extractor.extract(html, selectors, all_matches)
+            matches += (title, knowledge_manager._clean_text(text)) == reference[filename]
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for _, html, selectors, all_matches in fixtures:
+                extractor.extract(html, selectors, all_matches)
+        elapsed = time.perf_counter() - start
+
+        pages = args.repeat * len(fixtures)
+        megabytes = args.repeat * total_bytes / 1e6
+        print(f"{extractor.name:<8} {pages / elapsed:>10.1f} {megabytes / elapsed:>8.2f} {matches:>5}/{len(fixtures)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Measure screenshot payload size, encode time and /chat vision latency per image format.
+
+Synthetic game frames (gradient scenery with noise, HUD panels and text)
+are sent the way the overlay used to send them, as full-resolution PNG,
+and after preprocessing to --max-side as WebP and JPEG. For each frame size and
+format it reports:
+
+- the base64 payload size
+- the client's encode time
+- the server's preparation time (decode and, for PNG, downscale and re-encode)
+- the /chat latency through the backend app with the offline fake model,
+  which covers JSON parsing, base64 decoding and preparation
+- the estimated upload time at --uplink-mbps
+
+Usage: python -m benchmarks.bench_image_preprocess [--max-side N] [--quality N] [--uplink-mbps N] [--repeat N]
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import os
+import statistics
+import sys
+import time
+from unittest.mock import Mock, patch
+
+import httpx
+import numpy as np
+from PIL import Image, ImageDraw
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.backend import app
+from benchmarks.load_chat import FakeHistory
+from routers import chat
+from services import vector_service
+from services.image_preprocess import encode, prepare_vision_image, preprocess_image
+from services.lazy import preload
+from services.llm_provider import FakeProvider
+
+SIZES = {'1080p': (1920, 1080), '1440p': (2560, 1440), '4K': (3840, 2160)}
+
+
+def synthetic_frame(width, height, seed=0):
+    """A frame with smooth scenery, textured noise, HUD boxes and text, like a game screenshot."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    scenery = np.stack([
+        128 + 100 * np.sin(x / width * 3 + y / height),
+        110 + 90 * np.cos(y / height * 4),
+        140 + 80 * np.sin((x + y) / (width + height) * 6)
+    ], axis=-1)
+    scenery += rng.normal(0, 12, scenery.shape)
+    image = Image.fromarray(np.clip(scenery, 0, 255).astype(np.uint8), 'RGB')
+    draw = ImageDraw.Draw(image)
+    scale = width / 1920
+    for i in range(12):
+        left = int(rng.integers(0, width - 400 * scale))
+        top = int(rng.integers(0, height - 120 * scale))
+        draw.rectangle([left, top, left + 380 * scale, top + 100 * scale], fill=(20, 20, 30), outline=(200, 180, 90))
+        draw.text((left + 10 * scale, top + 10 * scale), f"HP 1234/2000  Stamina 87  Quest {i}",
+                  fill=(240, 240, 240), font_size=int(22 * scale))
+    return image
+
+
+def timed(func, *args, repeat=3, **kwargs):
+    """Median seconds of a call and its last result."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def png_payload(frame):
+    """What the overlay sent before: a full-resolution PNG."""
+    return encode(frame, 'PNG'), 'image/png'
+
+
+async def chat_latency(payload, repeat):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://pixly", timeout=None) as client:
+        times = []
+        body = {"message": "What should I do here?", "image_data": payload}
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = await client.post("/chat", json=body)
+            response.raise_for_status()
+            times.append(time.perf_counter() - start)
+        return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-side", type=int, default=1536, help="Longest side after downscaling")
+    parser.add_argument("--quality", type=int, default=80, help="WebP / JPEG quality")
+    parser.add_argument("--uplink-mbps", type=float, default=20, help="Client upload bandwidth for the transfer estimate")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (median reported)")
+    args = parser.parse_args()
+
+    preload(chat.chat_model, FakeProvider(latency=0, tokens_per_second=0))
+    preload(chat.chat_history_manager, FakeHistory())
+    preload(vector_service.vector_service, Mock(search_knowledge=Mock(return_value=[])))
+
+    print(f"max side {args.max_side}, quality {args.quality}, {args.uplink_mbps:g} Mbit/s uplink")
+    print(f"{'frame':<6} {'format':<6} {'payload KB':>10} {'encode ms':>9} {'server ms':>9} "
+          f"{'/chat ms':>8} {'upload ms':>9}")
+    variants = [
+        ('png', png_payload, {}),
+        ('webp', preprocess_image, {'max_side': args.max_side, 'fmt': 'WEBP', 'quality': args.quality}),
+        ('jpeg', preprocess_image, {'max_side': args.max_side, 'fmt': 'JPEG', 'quality': args.quality}),
+    ]
+    with patch('services.chatbot.detect_current_game', return_value=None):
+        for label, size in SIZES.items():
+            frame = synthetic_frame(*size)
+            for name, prepare, kwargs in variants:
+                encode_seconds, (data, _) = timed(prepare, frame, repeat=args.repeat, **kwargs)
+                payload = base64.b64encode(data).decode('ascii')
+                server_seconds, _ = timed(prepare_vision_image, data, max_side=args.max_side, repeat=args.repeat)
+                chat_seconds = asyncio.run(chat_latency(payload, args.repeat))
+                upload_seconds = len(payload) * 8 / (args.uplink_mbps * 1e6)
+                print(f"{label:<6} {name:<6} {len(payload) / 1024:>10.0f} {encode_seconds * 1000:>9.0f} "
+                      f"{server_seconds * 1000:>9.0f} {chat_seconds * 1000:>8.0f} {upload_seconds * 1000:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Compare float32 Chroma storage with int8 / float16 quantized storage.
+
+Embeds the descriptions in the games_info CSVs as documents and uses the
+YouTube titles as queries, then reports recall@k against an exact float32
+search, the bytes scanned in memory per query and the on-disk size for
+Chroma and for each quantized index.
+
+Usage: python -m benchmarks.bench_quantization [--k N] [--synthetic N] [--rerank-factor N]
+"""
+
+import argparse
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import chromadb
+from chromadb.config import Settings
+
+from services.dense_index import DenseIndex, QUANTIZATIONS
+
+GAMES_INFO_DIR = os.path.join(project_root, "games_info")
+DOCUMENT_COLUMNS = ['wiki_desc', 'forum_desc']
+QUERY_COLUMNS = ['yt_desc']
+
+
+def load_texts():
+    """Return (documents, queries) taken from the games_info CSVs."""
+    documents, queries = [], []
+    for path in sorted(glob.glob(os.path.join(GAMES_INFO_DIR, "*.csv"))):
+        try:
+            df = pd.read_csv(path)
+        except Exception:
+            continue
+        for column in DOCUMENT_COLUMNS:
+            if column in df:
+                documents.extend(str(text) for text in df[column].dropna())
+        for column in QUERY_COLUMNS:
+            if column in df:
+                queries.extend(str(text) for text in df[column].dropna())
+    return documents, queries
+
+
+def embed(texts):
+    from sentence_transformers import SentenceTransformer
+    from services.vector_service import EMBEDDING_MODEL_NAME
+    model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+    return np.asarray(model.encode(texts, convert_to_numpy=True, show_progress_bar=False), dtype=np.float32)
+
+
+def synthetic_vectors(count, dim, seed):
+    """Clustered unit vectors standing in for embeddings when no model is available."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, count // 50), dim))
+    vectors = centers[rng.integers(0, len(centers), count)] + 0.5 * rng.standard_normal((count, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def directory_bytes(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+def recall(results, truth):
+    return float(np.mean([len(set(found) & set(expected)) / len(expected)
+                          for found, expected in zip(results, truth)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Add N synthetic vectors to the corpus (use without the embedding model to skip it)")
+    parser.add_argument("--rerank-factor", type=int, default=4, help="Candidates re-ranked per result")
+    args = parser.parse_args()
+
+    documents, queries = load_texts()
+    try:
+        doc_vectors, query_vectors = embed(documents), embed(queries)
+    except Exception as e:
+        if not args.synthetic:
+            print(f"Embedding model unavailable ({e}); rerun with --synthetic N")
+            return
+        print(f"Embedding model unavailable ({e}); using synthetic vectors only")
+        doc_vectors = np.empty((0, 384), dtype=np.float32)
+        query_vectors = synthetic_vectors(200, 384, seed=1)
+    if args.synthetic:
+        doc_vectors = np.vstack([doc_vectors, synthetic_vectors(args.synthetic, doc_vectors.shape[1], seed=0)])
+
+    ids = [str(i) for i in range(len(doc_vectors))]
+    k = min(args.k, len(ids))
+    distances = (query_vectors ** 2).sum(1)[:, None] + (doc_vectors ** 2).sum(1)[None, :] - 2 * query_vectors @ doc_vectors.T
+    truth = [[ids[i] for i in np.argsort(row)[:k]] for row in distances]
+    print(f"{len(ids)} vectors x {doc_vectors.shape[1]} dims, {len(query_vectors)} queries, recall@{k}")
+
+    workdir = tempfile.mkdtemp(prefix="pixly-quant-")
+    try:
+        client = chromadb.PersistentClient(path=os.path.join(workdir, "chroma"),
+                                           settings=Settings(anonymized_telemetry=False))
+        collection = client.create_collection("bench")
+        for start in range(0, len(ids), 5000):
+            collection.add(ids=ids[start:start + 5000], embeddings=doc_vectors[start:start + 5000])
+        start = time.perf_counter()
+        found = collection.query(query_embeddings=query_vectors, n_results=k, include=[])['ids']
+        elapsed = time.perf_counter() - start
+        print(f"{'storage':<10} {'recall':>7} {'scan MB':>8} {'disk MB':>8} {'ms/query':>9}")
+        print(f"{'float32':<10} {recall(found, truth):>7.3f} {doc_vectors.nbytes / 1e6:>8.2f} "
+              f"{directory_bytes(os.path.join(workdir, 'chroma')) / 1e6:>8.2f} {elapsed * 1000 / len(query_vectors):>9.3f}")
+
+        for quantization in QUANTIZATIONS:
+            index = DenseIndex(os.path.join(workdir, quantization), quantization, rerank_factor=args.rerank_factor)
+            index.upsert(ids, doc_vectors)
+            start = time.perf_counter()
+            found = [[doc_id for doc_id, _ in index.search(query, k)] for query in query_vectors]
+            elapsed = time.perf_counter() - start
+            print(f"{quantization:<10} {recall(found, truth):>7.3f} {index.memory_bytes() / 1e6:>8.2f} "
+                  f"{index.disk_bytes() / 1e6:>8.2f} {elapsed * 1000 / len(query_vectors):>9.3f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
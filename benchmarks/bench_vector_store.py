@@ -0,0 +1,103 @@
+"""
+Compare separate Chroma clients with one shared client per directory.
+
+"separate" reproduces the old layout, where the knowledge store and the chat
+history each opened their own PersistentClient on vector_db. Chroma refuses a
+second client with different settings in one process, so each writer runs in
+its own process. "shared" runs the same writers as threads of one process on
+the store returned by get_store(). Both report the resident memory of all
+processes involved and the combined write throughput.
+
+Usage: python -m benchmarks.bench_vector_store [--writers N] [--docs N] [--batch N]
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import psutil
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+DIMENSIONS = 384
+
+
+def write_documents(collection, writer, docs, batch):
+    rng = np.random.default_rng(writer)
+    for start in range(0, docs, batch):
+        count = min(batch, docs - start)
+        collection.add(
+            ids=[f"{writer}_{start + i}" for i in range(count)],
+            embeddings=rng.standard_normal((count, DIMENSIONS)).astype(np.float32),
+            documents=[f"message {start + i} from writer {writer}" for i in range(count)]
+        )
+
+
+def separate_writer(path, writer, docs, batch, barrier, results):
+    """One process with its own client, as when each service opened Chroma itself."""
+    import chromadb
+    from chromadb.config import Settings
+    client = chromadb.PersistentClient(path=path, settings=Settings(anonymized_telemetry=False))
+    collection = client.get_or_create_collection(f"writer_{writer}")
+    barrier.wait()
+    start = time.perf_counter()
+    write_documents(collection, writer, docs, batch)
+    results.put((time.perf_counter() - start, psutil.Process().memory_info().rss))
+
+
+def run_separate(path, writers, docs, batch):
+    context = multiprocessing.get_context("spawn")
+    # Writers start together once every process has imported chromadb and opened its client
+    barrier, results = context.Barrier(writers), context.Queue()
+    processes = [context.Process(target=separate_writer, args=(path, writer, docs, batch, barrier, results))
+                 for writer in range(writers)]
+    for process in processes:
+        process.start()
+    measured = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return max(elapsed for elapsed, _ in measured), sum(rss for _, rss in measured)
+
+
+def run_shared(path, writers, docs, batch):
+    from services.vector_store import get_store
+    store = get_store(path)
+    collections = [store.get_or_create_collection(f"writer_{writer}") for writer in range(writers)]
+    threads = [threading.Thread(target=write_documents, args=(collections[writer], writer, docs, batch))
+               for writer in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, psutil.Process().memory_info().rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writers", type=int, default=2, help="Concurrent writers (services sharing vector_db)")
+    parser.add_argument("--docs", type=int, default=2000, help="Documents written by each writer")
+    parser.add_argument("--batch", type=int, default=50, help="Documents per add() call")
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers x {args.docs} docs, batches of {args.batch}")
+    print(f"{'layout':<10} {'RSS MB':>8} {'docs/s':>9}")
+    for layout, run in (("separate", run_separate), ("shared", run_shared)):
+        workdir = tempfile.mkdtemp(prefix="pixly-store-")
+        try:
+            elapsed, rss = run(workdir, args.writers, args.docs, args.batch)
+            print(f"{layout:<10} {rss / 1e6:>8.1f} {args.writers * args.docs / elapsed:>9.0f}")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
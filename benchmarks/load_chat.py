@@ -0,0 +1,125 @@
+"""
+Load test concurrent /chat requests against the backend app.
+
+The model is the offline FakeProvider (the one PIXLY_LLM=fake selects), with
+--latency before the first token and --tokens-per-second after it. Chat
+history and knowledge search are replaced by fakes that block for a fixed
+time, like the real synchronous clients do. The test fires
+--requests chats, --concurrency at a time, and polls /health meanwhile. It
+reports chat throughput and latency, and the worst /health latency, which
+shows whether the event loop stayed responsive.
+
+"pooled" runs the app as is, with blocking calls routed through the
+executor pools. "inline" calls them directly on the event loop, as /chat did
+before.
+
+Usage: python -m benchmarks.load_chat [--requests N] [--concurrency N] [--latency S] [--tokens-per-second N] [--mode pooled|inline|both]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from unittest.mock import Mock, patch
+
+import httpx
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.backend import app
+from routers import chat
+from services import chatbot, vector_service
+from services.lazy import preload
+from services.llm_provider import FakeProvider
+
+HISTORY_LATENCY = 0.005
+
+
+class FakeHistory:
+    max_history = 30
+
+    def get_recent_history(self, game, limit=None, hours_ago=None):
+        time.sleep(HISTORY_LATENCY)
+        return []
+
+    def add_message(self, game, user_message, assistant_response):
+        time.sleep(HISTORY_LATENCY)
+
+
+async def inline(func, *args, **kwargs):
+    """Stand-in for run_io / run_cpu that blocks the event loop like the old code."""
+    return func(*args, **kwargs)
+
+
+async def run_load(requests, concurrency):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://pixly", timeout=None) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies, health_latencies = [], []
+        done = asyncio.Event()
+
+        async def one_chat(i):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/chat", json={"message": f"How do I beat boss {i}?"})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        async def poll_health():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                health_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.05)
+
+        poller = asyncio.create_task(poll_health())
+        start = time.perf_counter()
+        await asyncio.gather(*(one_chat(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await poller
+    return elapsed, latencies, health_latencies
+
+
+def report(mode, requests, elapsed, latencies, health_latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    print(f"{mode:<8} {requests / elapsed:>8.1f} {statistics.median(latencies) * 1000:>9.0f} "
+          f"{p95 * 1000:>8.0f} {max(health_latencies) * 1000:>14.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=40, help="Chat requests to send")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight at once")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds before the fake model's first token")
+    parser.add_argument("--tokens-per-second", type=float, default=0,
+                        help="Fake model output rate, 0 to return the whole answer at once")
+    parser.add_argument("--mode", choices=["pooled", "inline", "both"], default="both")
+    args = parser.parse_args()
+
+    preload(chat.chat_model, FakeProvider(latency=args.latency, tokens_per_second=args.tokens_per_second))
+    preload(chat.chat_history_manager, FakeHistory())
+    preload(vector_service.vector_service, Mock(search_knowledge=Mock(return_value=[])))
+
+    print(f"{args.requests} chats, {args.concurrency} concurrent, {args.latency:.2f}s to first token, "
+          f"{args.tokens_per_second:g} tokens/s")
+    print(f"{'mode':<8} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>8} {'max /health ms':>14}")
+    modes = ["pooled", "inline"] if args.mode == "both" else [args.mode]
+    with patch('services.chatbot.detect_current_game', return_value=None):
+        for mode in modes:
+            if mode == "inline":
+                with patch('services.chatbot.run_io', inline), patch('services.chatbot.run_cpu', inline), \
+                     patch('routers.chat.run_io', inline), patch('services.llm_client.run_io', inline):
+                    result = asyncio.run(run_load(args.requests, args.concurrency))
+            else:
+                result = asyncio.run(run_load(args.requests, args.concurrency))
+            report(mode, args.requests, *result)
+
+
+if __name__ == "__main__":
+    main()
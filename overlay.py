@@ -126,24 +126,46 @@ class ChatWindow(ctk.CTkFrame):
                 daemon=True
             ).start()
 
-    def get_response(self, message, image_data=None):
+    def get_response(self, message, image_bytes=None, mime_type=None):
+        """Stream the answer from the backend and render it as it arrives."""
+        started = False
         try:
-            payload = {"message": message}
-            if image_data:
-                payload["image_data"] = image_data
-                
-            response = requests.post(
-                "http://127.0.0.1:8000/chat",
-                json=payload
-            )
-            if response.status_code == 200:
-                ai_response = response.json()["response"]
-                self.after(0, self.add_assistant_message, ai_response)
+            if image_bytes:
+                # Screenshot as the raw body, without base64 in JSON
+                request = {
+                    "url": "http://127.0.0.1:8000/chat/stream/image",
+                    "params": {"message": message},
+                    "data": image_bytes,
+                    "headers": {"Content-Type": mime_type or "application/octet-stream"}
+                }
             else:
-                self.after(0, self.add_assistant_message, "Error: Could not get response")
+                request = {"url": "http://127.0.0.1:8000/chat/stream", "json": {"message": message}}
+                
+            with requests.post(**request, stream=True, timeout=(5, 300)) as response:
+                if response.status_code != 200:
+                    self.after(0, self.add_assistant_message, "Error: Could not get response")
+                    return
+                event = None
+                for line in response.iter_lines(decode_unicode=True):
+                    if line.startswith("event: "):
+                        event = line[len("event: "):]
+                    elif line.startswith("data: ") and event in ("token", "error"):
+                        data = json.loads(line[len("data: "):])
+                        text = data["text"] if event == "token" else f"Error: {data['detail']}"
+                        if not started:
+                            # First token: replace the typing indicator with the answer
+                            started = True
+                            self.after(0, self.stop_typing)
+                            self.after(0, self.begin_assistant_message)
+                        self.after(0, self.append_assistant_text, text)
         except Exception as e:
-            self.after(0, self.add_assistant_message, f"Error: {str(e)}")
+            if started:
+                self.after(0, self.append_assistant_text, f"\nError: {str(e)}")
+            else:
+                self.after(0, self.add_assistant_message, f"Error: {str(e)}")
         finally:
+            if started:
+                self.after(0, self.append_assistant_text, "\n\n")
             # Re-enable input
             self.after(0, self.stop_typing)
             self.after(0, self.enable_input)
@@ -168,6 +190,21 @@ class ChatWindow(ctk.CTkFrame):
         self.chat_text.see("end")
         self.chat_text.configure(state="disabled")
 
+    def begin_assistant_message(self):
+        self.chat_text.configure(state="normal")
+        try:
+            self.chat_text.insert("end", "Pixly : ", "assistant")
+        except Exception:
+            self.chat_text.insert("end", "Pixly : ")
+        self.chat_text.see("end")
+        self.chat_text.configure(state="disabled")
+
+    def append_assistant_text(self, text):
+        self.chat_text.configure(state="normal")
+        self.chat_text.insert("end", text)
+        self.chat_text.see("end")
+        self.chat_text.configure(state="disabled")
+
     def start_typing(self):
         self._typing_active = True
         self._typing_step = 0
@@ -230,20 +267,17 @@ class ChatWindow(ctk.CTkFrame):
     def capture_and_send_screenshot(self, message):
         """Capture screenshot and send to backend."""
         try:
-            import base64
-            import io
             from PIL import ImageGrab
+            from services.image_preprocess import VISION_REGION, parse_region, preprocess_image
             
             # Capture screenshot
             screenshot = ImageGrab.grab()
             
-            # Convert to base64
-            buffer = io.BytesIO()
-            screenshot.save(buffer, format='PNG')
-            img_data = base64.b64encode(buffer.getvalue()).decode('utf-8')
+            # Crop, downscale and compress before upload instead of sending a full-size PNG
+            image_bytes, mime_type = preprocess_image(screenshot, region=parse_region(VISION_REGION))
             
-            # Send to backend with image data
-            self.get_response(message, img_data)
+            # Send to backend as the raw request body
+            self.get_response(message, image_bytes, mime_type)
             
         except Exception as e:
             self.after(0, self.update_chat, f"Error capturing screenshot: {str(e)}")
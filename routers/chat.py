@@ -2,20 +2,34 @@
 routers/chat.py - Updated with Chat History Support
 """
 
-from fastapi import APIRouter, HTTPException
-from services.chatbot import chat_with_gemini
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from services.chatbot import chat_with_gemini, stream_chat_with_gemini, llm_client, response_cache, model as chat_model
+from services.vector_service import vector_service
 from schemas.chat import ChatMessage
 from backend.chat_history import ChatHistoryManager
-from typing import Optional
+from services.lazy import LazyObject
+from services.executors import run_io
+from services.stream_metrics import stream_metrics
+from routers.health import requires_ready
+from typing import Dict, List, Optional
 from datetime import datetime
+import json
+import os
+import time
 
 router = APIRouter()
 
-# Initialize chat history manager
-chat_history_manager = ChatHistoryManager(
+# Initialize chat history manager on first use or by the startup warm-up
+chat_history_manager = LazyObject('chat_history', lambda: ChatHistoryManager(
     persist_directory="./vector_db",
     max_history=30  # Store last 30 messages per game
-)
+))
+history_ready = Depends(requires_ready(chat_history_manager))
+chat_ready = Depends(requires_ready(chat_model, vector_service, chat_history_manager))
+
+# Largest raw screenshot upload accepted by the /image endpoints
+MAX_IMAGE_BYTES = int(os.getenv('PIXLY_MAX_IMAGE_BYTES', str(32 * 1024 * 1024)))
 
 
 def parse_temporal_query(message: str) -> dict:
@@ -39,16 +53,91 @@ def parse_temporal_query(message: str) -> dict:
     return {"is_temporal": False}
 
 
-@router.post("/chat")
-async def chat(message: ChatMessage):
-    """
-    Enhanced chat endpoint with conversation history
+async def summarize_history(game: str, hours_ago: int) -> str:
+    """Answer to a temporal query: the game's conversation over the last hours."""
+    history = await run_io(
+        chat_history_manager.get_recent_history,
+        game=game,
+        hours_ago=hours_ago
+    )
     
-    Now includes:
-    - Persistent chat history per game
-    - Context from previous conversations
-    - Temporal query support ("What did I ask yesterday?")
+    if not history:
+        return f"I don't have any conversation history from the last {hours_ago} hours for {game}."
+    
+    # Format historical conversation
+    history_summary = []
+    for msg in history:
+        timestamp = datetime.fromisoformat(msg["timestamp"])
+        time_str = timestamp.strftime("%H:%M")
+        history_summary.append(f"At {time_str}:")
+        history_summary.append(f"  You: {msg['user_message']}")
+        history_summary.append(f"  Me: {msg['assistant_response'][:100]}...")
+    
+    return "\n".join(history_summary)
+
+
+async def history_context(message: ChatMessage, game: str) -> List[Dict]:
+    """Recent exchanges for the game, which the chatbot fits into the prompt's token budget."""
+    if not getattr(message, 'include_history', True):
+        return []
+    return await run_io(
+        chat_history_manager.get_recent_history,
+        game=game,
+        limit=getattr(message, 'history_limit', 5)
+    )
+
+
+async def stream_text(text: str):
+    """Stream an answer that is already complete as a single chunk."""
+    yield text
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def read_image_body(request: Request) -> bytearray:
+    """
+    Read a raw image upload into one buffer sized from Content-Length.
+
+    Chunks are copied straight into place, so the body is held once rather
+    than as a list of chunks plus their join. Without a (correct)
+    Content-Length, the chunks past the buffer are kept and joined once.
     """
+    try:
+        length = int(request.headers.get('content-length', 0))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length")
+    if length > MAX_IMAGE_BYTES:
+        raise HTTPException(status_code=413, detail=f"Image larger than {MAX_IMAGE_BYTES} bytes")
+    
+    buffer = bytearray(length)
+    filled = 0
+    overflow = []
+    size = 0
+    with memoryview(buffer) as view:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > MAX_IMAGE_BYTES:
+                raise HTTPException(status_code=413, detail=f"Image larger than {MAX_IMAGE_BYTES} bytes")
+            if not overflow and size <= length:
+                view[filled:size] = chunk
+                filled = size
+            else:
+                overflow.append(chunk)
+    if overflow:
+        with memoryview(buffer)[:filled] as prefix:
+            buffer = bytearray().join([prefix, *overflow])
+    else:
+        del buffer[size:]
+    if not size:
+        raise HTTPException(status_code=400, detail="Empty image body")
+    return buffer
+
+
+async def answer_chat(message: ChatMessage, image_bytes: Optional[bytearray] = None):
+    """Answer a chat message, with its screenshot as base64 in the message or as raw bytes."""
     try:
         # 1. Determine game context (default to 'general' if not specified)
         game = getattr(message, 'game', 'general')
@@ -60,28 +149,11 @@ async def chat(message: ChatMessage):
         
         if temporal_info["is_temporal"]:
             # User is asking about past conversation
-            hours_ago = temporal_info["hours_ago"]
-            history = chat_history_manager.get_recent_history(
-                game=game,
-                hours_ago=hours_ago
-            )
-            
-            if not history:
-                response_text = f"I don't have any conversation history from the last {hours_ago} hours for {game}."
-            else:
-                # Format historical conversation
-                history_summary = []
-                for msg in history:
-                    timestamp = datetime.fromisoformat(msg["timestamp"])
-                    time_str = timestamp.strftime("%H:%M")
-                    history_summary.append(f"At {time_str}:")
-                    history_summary.append(f"  You: {msg['user_message']}")
-                    history_summary.append(f"  Me: {msg['assistant_response'][:100]}...")
-                
-                response_text = "\n".join(history_summary)
+            response_text = await summarize_history(game, temporal_info["hours_ago"])
             
             # Store this exchange too
-            chat_history_manager.add_message(
+            await run_io(
+                chat_history_manager.add_message,
                 game=game,
                 user_message=user_message,
                 assistant_response=response_text
@@ -94,23 +166,14 @@ async def chat(message: ChatMessage):
             }
         
         # 3. Get chat history for context
-        include_history = getattr(message, 'include_history', True)
-        history_limit = getattr(message, 'history_limit', 5)
+        history = await history_context(message, game)
         
-        enhanced_message = user_message
+        # 4. Call existing Gemini service with the message and its history
+        response = await chat_with_gemini(user_message, image_data, history=history, image_bytes=image_bytes)
         
-        if include_history:
-            history_context = chat_history_manager.get_history_context(
-                game=game,
-                limit=history_limit
-            )
-            
-            if history_context:
-                # Prepend history to the message
-                enhanced_message = f"{history_context}\n\n---\n\nCurrent question: {user_message}"
-        
-        # 4. Call existing Gemini service with enhanced message
-        response = await chat_with_gemini(enhanced_message, image_data)
+        # Failed answers are returned but not remembered as the assistant's reply
+        if isinstance(response, dict) and response.get("error"):
+            return response
         
         # Extract response text (adjust based on your response structure)
         if isinstance(response, dict):
@@ -119,7 +182,8 @@ async def chat(message: ChatMessage):
             response_text = str(response)
         
         # 5. Store the exchange in chat history
-        chat_history_manager.add_message(
+        await run_io(
+            chat_history_manager.add_message,
             game=game,
             user_message=user_message,
             assistant_response=response_text
@@ -132,11 +196,128 @@ async def chat(message: ChatMessage):
         raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
 
 
+@router.post("/chat", dependencies=[chat_ready])
+async def chat(message: ChatMessage):
+    """
+    Enhanced chat endpoint with conversation history
+    
+    Now includes:
+    - Persistent chat history per game
+    - Context from previous conversations
+    - Temporal query support ("What did I ask yesterday?")
+    """
+    return await answer_chat(message)
+
+
+@router.post("/chat/image", dependencies=[chat_ready])
+async def chat_image(request: Request, message: str):
+    """
+    Chat about a screenshot sent as the raw request body
+
+    The image bytes (PNG, JPEG or WebP) are the body and the message is a
+    query parameter, which avoids base64 in JSON.
+    
+    Example: POST /chat/image?message=What%20now%3F with Content-Type: image/webp
+    """
+    image_bytes = await read_image_body(request)
+    return await answer_chat(ChatMessage(message=message), image_bytes)
+
+
+def stream_answer(message: ChatMessage, image_bytes: Optional[bytearray] = None) -> StreamingResponse:
+    """Stream the answer to a chat message as Server-Sent Events."""
+    started = time.perf_counter()
+    game = getattr(message, 'game', 'general')
+    
+    async def events():
+        ttft = None
+        parts = []
+        failed = False
+        try:
+            temporal_info = parse_temporal_query(message.message)
+            if temporal_info["is_temporal"]:
+                chunks = stream_text(await summarize_history(game, temporal_info["hours_ago"]))
+            else:
+                history = await history_context(message, game)
+                chunks = stream_chat_with_gemini(message.message, message.image_data, history=history,
+                                                 image_bytes=image_bytes)
+            async for text in chunks:
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                parts.append(text)
+                yield sse_event("token", {"text": text})
+        except Exception as e:
+            failed = True
+            yield sse_event("error", {"detail": f"Chat error: {str(e)}"})
+        
+        total = time.perf_counter() - started
+        stream_metrics.record(ttft, total, error=failed)
+        if parts:
+            try:
+                await run_io(
+                    chat_history_manager.add_message,
+                    game=game,
+                    user_message=message.message,
+                    assistant_response="".join(parts)
+                )
+            except Exception as e:
+                print(f"Error saving chat history: {e}")
+        yield sse_event("done", {
+            "ttft_ms": round(ttft * 1000, 1) if ttft is not None else None,
+            "total_ms": round(total * 1000, 1)
+        })
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/chat/stream", dependencies=[chat_ready])
+async def chat_stream(message: ChatMessage):
+    """
+    Chat endpoint that streams the answer as Server-Sent Events
+
+    Events:
+    - token: {"text": ...} for each chunk of the answer as Gemini generates it
+    - error: {"detail": ...} if generation fails
+    - done: {"ttft_ms": ..., "total_ms": ...} once the answer is complete
+    """
+    return stream_answer(message)
+
+
+@router.post("/chat/stream/image", dependencies=[chat_ready])
+async def chat_stream_image(request: Request, message: str):
+    """
+    Like /chat/stream, with the screenshot as the raw request body (see /chat/image)
+    """
+    image_bytes = await read_image_body(request)
+    return stream_answer(ChatMessage(message=message), image_bytes)
+
+
+@router.get("/chat/stream/metrics")
+async def chat_stream_metrics():
+    """Time-to-first-token and total time of recent streamed answers"""
+    return stream_metrics.snapshot()
+
+
+@router.get("/chat/llm/stats")
+async def chat_llm_stats():
+    """Model call counters: in flight, retries, timeouts, failures and circuit breaker state"""
+    return llm_client.snapshot()
+
+
+@router.get("/chat/cache/stats")
+async def chat_cache_stats():
+    """Hit/miss counters of the semantic response cache"""
+    return response_cache.get_stats()
+
+
 # ============================================================================
 # NEW ENDPOINTS: CHAT HISTORY MANAGEMENT
 # ============================================================================
 
-@router.get("/history/{game}")
+@router.get("/history/{game}", dependencies=[history_ready])
 async def get_chat_history(
     game: str,
     limit: Optional[int] = None,
@@ -148,7 +329,8 @@ async def get_chat_history(
     Example: GET /chat/history/minecraft?limit=10&hours_ago=24
     """
     try:
-        history = chat_history_manager.get_recent_history(
+        history = await run_io(
+            chat_history_manager.get_recent_history,
             game=game,
             limit=limit,
             hours_ago=hours_ago
@@ -163,7 +345,7 @@ async def get_chat_history(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/history/search")
+@router.post("/history/search", dependencies=[history_ready])
 async def search_chat_history(
     game: str,
     query: str,
@@ -175,7 +357,8 @@ async def search_chat_history(
     Example: POST /chat/history/search?game=minecraft&query=diamond&n_results=5
     """
     try:
-        results = chat_history_manager.search_history(
+        results = await run_io(
+            chat_history_manager.search_history,
             game=game,
             query=query,
             n_results=n_results
@@ -190,7 +373,7 @@ async def search_chat_history(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.delete("/history/{game}")
+@router.delete("/history/{game}", dependencies=[history_ready])
 async def clear_chat_history(game: str):
     """
     Clear all chat history for a specific game
@@ -198,7 +381,7 @@ async def clear_chat_history(game: str):
     Example: DELETE /chat/history/minecraft
     """
     try:
-        chat_history_manager.clear_history(game)
+        await run_io(chat_history_manager.clear_history, game)
         return {
             "message": f"Chat history cleared for {game}",
             "game": game
@@ -207,7 +390,7 @@ async def clear_chat_history(game: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/settings/history")
+@router.post("/settings/history", dependencies=[history_ready])
 async def update_history_settings(max_history: int):
     """
     Update chat history settings
@@ -233,7 +416,7 @@ async def update_history_settings(max_history: int):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/settings/history")
+@router.get("/settings/history", dependencies=[history_ready])
 async def get_history_settings():
     """
     Get current chat history settings
@@ -3,9 +3,11 @@ from services.knowledge_manager import get_available_games as get_csv_games, val
 from services.vector_service import vector_service
 from schemas.game_detection import GameDetectionRequest
 from schemas.knowledge_search import KnowledgeSearchRequest
-from fastapi import APIRouter,HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from routers.health import requires_ready
 
 router = APIRouter()
+vector_ready = Depends(requires_ready(vector_service))
 # Game Detection endpoints
 @router.post("/detect")
 def detect_game(request: GameDetectionRequest):
@@ -20,7 +22,7 @@ def detect_game(request: GameDetectionRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error detecting game: {str(e)}")
 
-@router.get("/list")
+@router.get("/list", dependencies=[vector_ready])
 def list_games():
     """List all available games."""
     try:
@@ -37,8 +39,16 @@ def list_games():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error listing games: {str(e)}")
 
+@router.get("/cache/stats", dependencies=[vector_ready])
+def get_query_cache_stats():
+    """Get hit-rate counters of the knowledge query cache."""
+    try:
+        return {"status": "ok", "stats": vector_service.get_cache_stats()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting cache stats: {str(e)}")
+
 # Knowledge Management endpoints
-@router.post("/{game_name}/knowledge/process")
+@router.post("/{game_name}/knowledge/process", dependencies=[vector_ready])
 def process_game_knowledge(game_name: str):
     """Process and vectorize knowledge for a specific game."""
     try:
@@ -63,7 +73,20 @@ def process_game_knowledge(game_name: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing knowledge: {str(e)}")
 
-@router.post("/{game_name}/knowledge/search")
+@router.get("/{game_name}/knowledge/progress", dependencies=[vector_ready])
+def get_game_knowledge_progress(game_name: str):
+    """Get per-stage progress of the latest knowledge processing run for a game."""
+    try:
+        progress = vector_service.get_ingest_progress(game_name)
+        if progress is None:
+            raise HTTPException(status_code=404, detail=f"No knowledge processing run for {game_name}")
+        return {"status": "ok", "game_name": game_name, "progress": progress}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting progress: {str(e)}")
+
+@router.post("/{game_name}/knowledge/search", dependencies=[vector_ready])
 def search_game_knowledge(game_name: str, request: KnowledgeSearchRequest):
     """Search knowledge base for a specific game."""
     try:
@@ -71,7 +94,8 @@ def search_game_knowledge(game_name: str, request: KnowledgeSearchRequest):
             game_name=game_name,
             query=request.query,
             content_types=request.content_types,
-            limit=request.limit
+            limit=request.limit,
+            search_mode=request.search_mode
         )
         
         return {
@@ -84,7 +108,7 @@ def search_game_knowledge(game_name: str, request: KnowledgeSearchRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching knowledge: {str(e)}")
 
-@router.get("/{game_name}/knowledge/stats")
+@router.get("/{game_name}/knowledge/stats", dependencies=[vector_ready])
 def get_game_knowledge_stats(game_name: str):
     """Get statistics for a game's knowledge base."""
     try:
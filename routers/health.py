@@ -0,0 +1,41 @@
+import os
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from services.lazy import LazyObject, lazy_status, readiness, wait_ready
+
+# Seconds a request waits for a warming service before answering 503
+WARMUP_TIMEOUT = float(os.getenv('PIXLY_WARMUP_TIMEOUT', '120'))
+
+router = APIRouter()
+
+def requires_ready(*services):
+    """
+    Dependency that waits until lazily built services are ready.
+
+    Args:
+        services: LazyObject singletons the endpoint uses
+
+    Raises:
+        HTTPException: 503 if a service fails or does not warm up in time
+    """
+    async def dependency():
+        for service in services:
+            if not await wait_ready(service, WARMUP_TIMEOUT):
+                status = lazy_status(service) if isinstance(service, LazyObject) else {}
+                detail = f"{service!r} is not ready"
+                if status.get('error'):
+                    detail += f": {status['error']}"
+                raise HTTPException(status_code=503, detail=detail)
+    return dependency
+
+@router.get("")
+def health():
+    """Liveness check; answers as soon as the server is up."""
+    return {"status": "ok"}
+
+@router.get("/ready")
+def ready():
+    """Warm-up state of the lazily loaded services (503 until all are ready)."""
+    state = readiness()
+    return JSONResponse(status_code=200 if state['ready'] else 503,
+                        content={"status": "ok" if state['ready'] else "warming", **state})
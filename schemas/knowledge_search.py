@@ -1,6 +1,8 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Literal
 class KnowledgeSearchRequest(BaseModel):
     query: str
     content_types: Optional[List[str]] = None
-    limit: Optional[int] = 5
\ No newline at end of file
+    limit: Optional[int] = 5
+    # 'vector', 'keyword' (BM25) or 'hybrid' (both, rank-fused); None uses the server default
+    search_mode: Optional[Literal['vector', 'keyword', 'hybrid']] = None
\ No newline at end of file
@@ -0,0 +1,210 @@
+"""Incremental BM25 keyword index and reciprocal-rank fusion for knowledge search"""
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+_TOKEN_RE = re.compile(r'\w+')
+# Function words that match nearly every chunk and only add noise to scores
+STOPWORDS = frozenset(
+    'a an and are as at be but by do does for from has have how i in is it its me my of on or '
+    'that the this to was what when where which who why will with you your'.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of a text without stopwords."""
+    return [token for token in _TOKEN_RE.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Merge ranked id lists with reciprocal-rank fusion.
+
+    Each id scores sum(1 / (k + rank)) over the lists it appears in (rank
+    starting at 1); ties keep the order in which ids were first seen.
+
+    Returns:
+        ``(id, score)`` pairs, best first
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+class BM25Index:
+    def __init__(self, db_path: str, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize the keyword index stored in a SQLite database.
+
+        Postings are kept per game and updated as chunks are upserted or
+        deleted, so the index never needs a full rebuild.
+
+        Args:
+            db_path: Path of the SQLite database file
+            k1: BM25 term-frequency saturation
+            b: BM25 document-length normalization
+        """
+        self.db_path = db_path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._init_database()
+
+    def _init_database(self):
+        """Create the document and postings tables."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS bm25_docs (
+                game TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                label TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                PRIMARY KEY (game, doc_id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS bm25_postings (
+                game TEXT NOT NULL,
+                term TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (game, term, doc_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_bm25_postings_doc ON bm25_postings (game, doc_id)')
+        conn.commit()
+        conn.close()
+
+    def _delete_docs(self, cursor, game: str, ids: Sequence[str]):
+        cursor.executemany('DELETE FROM bm25_postings WHERE game = ? AND doc_id = ?', [(game, doc_id) for doc_id in ids])
+        cursor.executemany('DELETE FROM bm25_docs WHERE game = ? AND doc_id = ?', [(game, doc_id) for doc_id in ids])
+
+    def add(self, game_name: str, docs: Sequence[Tuple[str, str, str]]):
+        """
+        Index (or re-index) documents of a game.
+
+        Args:
+            game_name: Game the documents belong to
+            docs: ``(doc_id, text, label)`` tuples; the label (content type) can filter searches
+        """
+        if not docs:
+            return
+        game = game_name.lower()
+        doc_rows, posting_rows = [], []
+        for doc_id, text, label in docs:
+            terms = Counter(tokenize(text))
+            doc_rows.append((game, doc_id, label, sum(terms.values())))
+            posting_rows.extend((game, term, doc_id, tf) for term, tf in terms.items())
+
+        with self._lock:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            self._delete_docs(cursor, game, [doc_id for doc_id, _, _ in docs])
+            cursor.executemany('INSERT INTO bm25_docs (game, doc_id, label, length) VALUES (?, ?, ?, ?)', doc_rows)
+            cursor.executemany('INSERT INTO bm25_postings (game, term, doc_id, tf) VALUES (?, ?, ?, ?)', posting_rows)
+            conn.commit()
+            conn.close()
+
+    def remove(self, game_name: str, ids: Sequence[str]):
+        """Remove documents of a game from the index."""
+        if not ids:
+            return
+        with self._lock:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            self._delete_docs(cursor, game_name.lower(), ids)
+            conn.commit()
+            conn.close()
+
+    def drop_game(self, game_name: str):
+        """Remove every document of a game."""
+        with self._lock:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM bm25_postings WHERE game = ?', (game_name.lower(),))
+            cursor.execute('DELETE FROM bm25_docs WHERE game = ?', (game_name.lower(),))
+            conn.commit()
+            conn.close()
+
+    def count(self, game_name: str) -> int:
+        """Number of indexed documents of a game."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM bm25_docs WHERE game = ?', (game_name.lower(),))
+        count = cursor.fetchone()[0]
+        conn.close()
+        return count
+
+    def labels(self, game_name: str, ids: Sequence[str]) -> Dict[str, str]:
+        """Labels stored with the given documents of a game, by document id."""
+        if not ids:
+            return {}
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        placeholders = ",".join("?" * len(ids))
+        cursor.execute(f'SELECT doc_id, label FROM bm25_docs WHERE game = ? AND doc_id IN ({placeholders})',
+                       [game_name.lower()] + list(ids))
+        labels = dict(cursor.fetchall())
+        conn.close()
+        return labels
+
+    def search(self, game_name: str, query: str, k: int,
+               labels: Optional[Sequence[str]] = None) -> List[Tuple[str, float]]:
+        """
+        Rank a game's documents against a query with Okapi BM25.
+
+        Args:
+            game_name: Game to search
+            query: Free-text query
+            k: Number of results
+            labels: Only return documents with one of these labels
+
+        Returns:
+            ``(doc_id, score)`` pairs, best first; documents sharing no term are omitted
+        """
+        terms = sorted(set(tokenize(query)))
+        if not terms or k <= 0:
+            return []
+        game = game_name.lower()
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*), AVG(length) FROM bm25_docs WHERE game = ?', (game,))
+        total, average_length = cursor.fetchone()
+        if not total:
+            conn.close()
+            return []
+        placeholders = ",".join("?" * len(terms))
+        cursor.execute(f'''
+            SELECT p.term, p.doc_id, p.tf, d.length, d.label
+            FROM bm25_postings p JOIN bm25_docs d ON d.game = p.game AND d.doc_id = p.doc_id
+            WHERE p.game = ? AND p.term IN ({placeholders})
+        ''', [game] + terms)
+        postings = cursor.fetchall()
+        conn.close()
+
+        document_frequency = Counter(term for term, _, _, _, _ in postings)
+        allowed = set(labels) if labels is not None else None
+        average_length = average_length or 1.0
+        scores: Dict[str, float] = {}
+        for term, doc_id, tf, length, label in postings:
+            if allowed is not None and label not in allowed:
+                continue
+            df = document_frequency[term]
+            idf = math.log(1.0 + (total - df + 0.5) / (df + 0.5))
+            norm = tf + self.k1 * (1.0 - self.b + self.b * length / average_length)
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1.0) / norm
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:k]
@@ -1,19 +1,46 @@
 """ Includes gemini chatbot integration"""
 import os
-import google.generativeai as genai
 from dotenv import load_dotenv
 from services.screenshot import get_recent_screenshots, get_screenshot_by_id, get_screenshot_stats
 from services.game_detection import detect_current_game
 from services import vector_service
+from services.lazy import LazyObject, lazy_status
+from services.executors import run_cpu, run_io
+from services.llm_client import LLMClient
+from services.response_cache import ResponseCache
+from services.context_budget import ContextBudget
+from services.image_preprocess import prepare_vision_image
+# genai stays importable from here for code that configures the client directly
+from services.llm_provider import LLM_PROVIDER, GeminiProvider, create_provider, genai
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
 import base64
+import re
 
-system_prompt_file = open("PROMPTS.txt","r")
-system_prompt = system_prompt_file.read()
 load_dotenv()
 
-# Configure Gemini
-genai.configure(api_key=os.getenv('GOOGLE_API_KEY'),)
-model = genai.GenerativeModel(model_name="gemini-2.5-flash-lite",system_instruction=system_prompt)
+# Provider selected by PIXLY_LLM, built on first use or by the startup warm-up
+model = LazyObject('llm', create_provider)
+# Deadlines, retries and the circuit breaker around every model call; always uses the current model
+llm_client = LLMClient(lambda: model)
+
+# Answers to earlier questions about the same game, matched by query embedding similarity
+RESPONSE_CACHE_ENABLED = os.getenv('PIXLY_RESPONSE_CACHE', '1') != '0'
+response_cache = ResponseCache(
+    threshold=float(os.getenv('PIXLY_RESPONSE_CACHE_THRESHOLD', '0.9')),
+    max_size=int(os.getenv('PIXLY_RESPONSE_CACHE_SIZE', '128')),
+    ttl=float(os.getenv('PIXLY_RESPONSE_CACHE_TTL', '3600'))
+)
+# Cached answers quote a game's knowledge, so they go stale when it is re-ingested or deleted
+vector_service.add_knowledge_listener(response_cache.invalidate_game)
+
+SCREENSHOT_KEYWORDS = ['screenshot', 'screen', 'capture', 'git', 'visual', 'see', 'show me']
+# Questions that refer back to the conversation ("how do I beat her?", "what about the second phase?")
+FOLLOW_UP_RE = re.compile(
+    r"^\s*(?:and|also|so|then|what about|how about)\b"
+    r"|\b(?:he|him|his|she|her|hers|it|its|they|them|their|this|that|these|those|there"
+    r"|again|else|same|previous|earlier)\b",
+    re.IGNORECASE
+)
 
 def set_api_key(new_key: str):
     """Update the Google API key at runtime and reinitialize the model."""
@@ -21,93 +48,202 @@ def set_api_key(new_key: str):
         if not new_key:
             raise ValueError("Empty API key")
         os.environ['GOOGLE_API_KEY'] = new_key
-        genai.configure(api_key=new_key)
-        global model
-        model = genai.GenerativeModel(model_name="gemini-2.5-flash", system_instruction=system_prompt)
+        if LLM_PROVIDER == GeminiProvider.name:
+            global model
+            model = GeminiProvider(api_key=new_key)
         return True
     except Exception as e:
         print(f"Error setting API key: {e}")
         return False
 
-async def chat_with_gemini(message: str, image_data: str = None):
+def with_history(message: str, history: str = "") -> str:
+    """Prefix a question with the recent conversation."""
+    if history:
+        return f"{history}\n\n---\n\nCurrent question: {message}"
+    return message
+
+def asks_about_screenshots(message: str) -> bool:
+    return any(keyword in message.lower() for keyword in SCREENSHOT_KEYWORDS)
+
+def is_follow_up(message: str) -> bool:
+    """Whether a question likely depends on the conversation before it."""
+    return bool(FOLLOW_UP_RE.search(message))
+
+async def _cache_embedding(message: str, full_message: str, image_bytes, detected_game: str):
+    """
+    Embedding a question is cached under, or None if its answer is not cacheable.
+
+    Only text questions answered from a detected game's knowledge are cached;
+    screenshot questions depend on live data. The cache is keyed by the
+    question alone, so follow-ups asked with history ("how do I beat her?")
+    are not cached either; standalone questions are, history or not. The
+    lookup never waits for the embedding model to load.
+    """
+    if (not RESPONSE_CACHE_ENABLED or image_bytes is not None or not detected_game
+            or asks_about_screenshots(full_message) or (full_message != message and is_follow_up(message))):
+        return None
+    try:
+        if lazy_status(vector_service.vector_service)['state'] != 'ready':
+            return None
+        return await run_cpu(vector_service.embed_query, message)
+    except Exception as e:
+        print(f"Error embedding query for response cache: {e}")
+        return None
+
+async def _prepare(message: str, image_bytes, history: Sequence[Dict]
+                   ) -> Tuple[str, Optional[str], object, Optional[str], ContextBudget]:
+    """
+    Fit history into the prompt budget, detect the game and look the question up in the response cache.
+
+    Returns:
+        The message with history, the detected game, the cache embedding (or
+        None), the cached answer (or None) and the prompt's token budget
+    """
+    budget = ContextBudget(message)
+    full_message = with_history(message, budget.history(history or []))
+    # Detect current game
+    detected_game = await run_io(detect_current_game, full_message)
+    embedding = await _cache_embedding(message, full_message, image_bytes, detected_game)
+    cached = None
+    if embedding is not None:
+        try:
+            cached = response_cache.get(detected_game, embedding)
+        except Exception as e:
+            print(f"Error reading response cache: {e}")
+            embedding = None
+    return full_message, detected_game, embedding, cached, budget
+
+def _cache_answer(detected_game: str, message: str, embedding, answer: str):
+    if embedding is None or not answer:
+        return
+    try:
+        response_cache.put(detected_game, message, embedding, answer)
+    except Exception as e:
+        print(f"Error writing response cache: {e}")
+
+async def _build_content(message: str, image_bytes=None, detected_game: str = None,
+                         question: str = None, budget: ContextBudget = None):
+    """
+    Gemini prompt for a message: the text plus screenshot, game and knowledge context.
+
+    Args:
+        message: The question, with history if any
+        image_bytes: Screenshot to analyze (bytes-like)
+        detected_game: Game the question is about
+        question: The question alone, used for knowledge search; defaults to message
+        budget: Token budget knowledge is fitted into; defaults to a fresh one
+    """
+    question = question or message
+    budget = budget or ContextBudget(question)
+    # If image data is provided, use vision capabilities
+    if image_bytes is not None:
+        # Downscaled and re-encoded unless the client already did
+        image = await run_cpu(prepare_vision_image, image_bytes)
+
+        # Enhanced message for image analysis
+        enhanced_message = f"""
+        {message}
+
+        LIVE SCREENSHOT PROVIDED: I can see a screenshot that the user just captured. 
+        Please analyze this image in the context of gaming and provide specific, actionable advice based on what you can see.
+        Focus on game mechanics, strategies, UI elements, or any gaming-related aspects visible in the screenshot.
+        """
+
+        # Add game context if detected
+        if detected_game:
+            enhanced_message += f"\n\nDETECTED GAME: {detected_game.upper()}"
+
+        return [enhanced_message, image]
+
+    # Check if user is asking about screenshots (existing functionality)
+    if asks_about_screenshots(message):
+        # Get recent screenshots
+        recent_screenshots = await run_io(get_recent_screenshots, limit=5)
+        screenshot_stats = await run_io(get_screenshot_stats)
+
+        # Prepare screenshot context
+        screenshot_context = f"""
+        SCREENSHOT DATA AVAILABLE:
+        - Total screenshots stored: {screenshot_stats['total_screenshots']}
+        - Recent applications captured: {[app[0] for app in screenshot_stats['applications'][:5]]}
+        - Recent screenshots: {recent_screenshots}
+
+        You can analyze these screenshots to help with gaming-related questions. 
+        The screenshots are automatically captured and show what applications the user was using.
+        """
+
+        # Add screenshot context to the message
+        enhanced_message = f"{message}\n\n{screenshot_context}"
+        return enhanced_message
+    else:
+        # Enhanced chat with game knowledge
+        enhanced_message = message
+
+        # Add game context and knowledge if detected
+        if detected_game:
+            enhanced_message += f"\n\nDETECTED GAME: {detected_game.lower()}"
+
+            # Search for relevant knowledge
+            try:
+                # Mostly query embedding, hence the CPU pool
+                knowledge_results = await run_cpu(vector_service.search_knowledge, detected_game, question)
+
+                if knowledge_results:
+                    # Deduplicated and trimmed to the tokens history left over
+                    enhanced_message += budget.knowledge(knowledge_results)
+            except Exception as e:
+                print(f"Error searching knowledge: {e}")
+
+        return enhanced_message
+
+async def _assemble(message: str, image_bytes, full_message: str, detected_game: Optional[str],
+                    budget: ContextBudget):
+    """Build the prompt and log its size."""
+    content = await _build_content(full_message, image_bytes, detected_game, question=message, budget=budget)
+    budget.log(content[0] if isinstance(content, list) else content)
+    return content
+
+def _image_bytes(image_data: Optional[str], image_bytes):
+    """Raw screenshot bytes, decoding base64 image_data if no raw bytes were uploaded."""
+    if image_bytes is None and image_data:
+        return base64.b64decode(image_data)
+    return image_bytes
+
+async def chat_with_gemini(message: str, image_data: str = None, history: Optional[List[Dict]] = None,
+                           image_bytes=None):
+    """
+    Answer a question with Gemini.
+
+    Args:
+        message: The user's question
+        image_data: Base64 screenshot to analyze
+        history: Recent exchanges of the conversation, oldest first
+        image_bytes: Screenshot uploaded as raw bytes instead of image_data
+    """
     try:
-        # Detect current game
-        detected_game = detect_current_game(message)
-        
-        # If image data is provided, use vision capabilities
-        if image_data:
-            import PIL.Image
-            import io
-            
-            # Decode base64 image
-            image_bytes = base64.b64decode(image_data)
-            image = PIL.Image.open(io.BytesIO(image_bytes))
-            
-            # Enhanced message for image analysis
-            enhanced_message = f"""
-            {message}
-            
-            LIVE SCREENSHOT PROVIDED: I can see a screenshot that the user just captured. 
-            Please analyze this image in the context of gaming and provide specific, actionable advice based on what you can see.
-            Focus on game mechanics, strategies, UI elements, or any gaming-related aspects visible in the screenshot.
-            """
-            
-            # Add game context if detected
-            if detected_game:
-                enhanced_message += f"\n\nDETECTED GAME: {detected_game.upper()}"
-            
-            # Generate content with image
-            response = model.generate_content([enhanced_message, image])
-            return {"response": response.text}
-        
-        # Check if user is asking about screenshots (existing functionality)
-        screenshot_keywords = ['screenshot', 'screen', 'capture', 'git', 'visual', 'see', 'show me']
-        if any(keyword in message.lower() for keyword in screenshot_keywords):
-            # Get recent screenshots
-            recent_screenshots = get_recent_screenshots(limit=5)
-            screenshot_stats = get_screenshot_stats()
-            
-            # Prepare screenshot context
-            screenshot_context = f"""
-            SCREENSHOT DATA AVAILABLE:
-            - Total screenshots stored: {screenshot_stats['total_screenshots']}
-            - Recent applications captured: {[app[0] for app in screenshot_stats['applications'][:5]]}
-            - Recent screenshots: {recent_screenshots}
-            
-            You can analyze these screenshots to help with gaming-related questions. 
-            The screenshots are automatically captured and show what applications the user was using.
-            """
-            
-            # Add screenshot context to the message
-            enhanced_message = f"{message}\n\n{screenshot_context}"
-            response = model.generate_content(enhanced_message)
-            return {"response": response.text}
-        else:
-            # Enhanced chat with game knowledge
-            enhanced_message = message
-            
-            # Add game context and knowledge if detected
-            if detected_game:
-                enhanced_message += f"\n\nDETECTED GAME: {detected_game.lower()}"
-                
-                # Search for relevant knowledge
-                try:
-                    knowledge_results = vector_service.search_knowledge(detected_game, message)
-                    
-                    if knowledge_results:
-                        knowledge_context = "\n\nRELEVANT KNOWLEDGE FROM GAME DATABASE:\n"
-                        for i, result in enumerate(knowledge_results, 1):
-                            knowledge_context += f"\n{i}. {result['metadata'].get('title', 'Unknown Title')}\n"
-                            knowledge_context += f"   Source: {result['metadata'].get('content_type', 'unknown').upper()}\n"
-                            knowledge_context += f"   Content: {result['content'][:200]}...\n"
-                            knowledge_context += f"   URL: {result['metadata'].get('url', 'N/A')}\n"
-                        
-                        enhanced_message += knowledge_context
-                except Exception as e:
-                    print(f"Error searching knowledge: {e}")
-            
-            response = model.generate_content(enhanced_message)
-            return {"response": response.text}
+        image_bytes = _image_bytes(image_data, image_bytes)
+        full_message, detected_game, embedding, cached, budget = await _prepare(message, image_bytes, history)
+        if cached is not None:
+            return {"response": cached}
+        content = await _assemble(message, image_bytes, full_message, detected_game, budget)
+        answer = await llm_client.generate(content)
+        _cache_answer(detected_game, message, embedding, answer)
+        return {"response": answer}
     except Exception as e:
-        print(e)
-        return {"response": f"Error processing request: {str(e)}"}
\ No newline at end of file
+        print(f"Error generating chat response: {e}")
+        return {"response": f"Error processing request: {str(e)}", "error": True}
+
+async def stream_chat_with_gemini(message: str, image_data: str = None, history: Optional[List[Dict]] = None,
+                                  image_bytes=None) -> AsyncIterator[str]:
+    """Like chat_with_gemini, but yields the answer as text chunks while Gemini generates it."""
+    image_bytes = _image_bytes(image_data, image_bytes)
+    full_message, detected_game, embedding, cached, budget = await _prepare(message, image_bytes, history)
+    if cached is not None:
+        yield cached
+        return
+    content = await _assemble(message, image_bytes, full_message, detected_game, budget)
+    parts = []
+    async for text in llm_client.stream(content):
+        parts.append(text)
+        yield text
+    _cache_answer(detected_game, message, embedding, "".join(parts))
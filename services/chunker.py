@@ -0,0 +1,142 @@
+"""Token-aware chunking of knowledge text for embedding"""
+import re
+from bisect import bisect_left
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+# Paragraphs are separated by blank lines; headings are markdown-style "# Title"
+# paragraphs as produced by the HTML extractors
+_PARAGRAPH_SPLIT_RE = re.compile(r'\n\s*\n')
+_HEADING_RE = re.compile(r'#{1,6} ')
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+# Word / punctuation pieces, used to approximate tokens without a tokenizer
+_APPROX_TOKEN_RE = re.compile(r'\w+|[^\w\s]')
+
+
+class _Unit(NamedTuple):
+    text: str
+    tokens: int
+    paragraph: int
+    heading: bool
+
+
+class TextChunker:
+    def __init__(self, tokenizer=None, max_tokens: int = 254, overlap_tokens: int = 32):
+        """
+        Initialize the chunker.
+
+        Args:
+            tokenizer: Hugging Face fast tokenizer of the embedding model; without one,
+                words and punctuation marks are counted as tokens
+            max_tokens: Maximum tokens per chunk, excluding the model's special tokens
+            overlap_tokens: Tokens of trailing sentences repeated at the start of the
+                next chunk within the same section
+        """
+        self.tokenizer = tokenizer
+        self.max_tokens = max(1, max_tokens)
+        self.overlap_tokens = max(0, min(overlap_tokens, self.max_tokens // 2))
+
+    def _token_offsets(self, texts: Sequence[str]) -> List[List[Tuple[int, int]]]:
+        """Character spans of the tokens of each text, in one tokenizer call."""
+        if self.tokenizer is not None:
+            try:
+                encoded = self.tokenizer(list(texts), add_special_tokens=False, return_offsets_mapping=True)
+                return [[(start, end) for start, end in offsets] for offsets in encoded['offset_mapping']]
+            except Exception as e:
+                print(f"Error tokenizing text for chunking, approximating tokens: {e}")
+        return [[match.span() for match in _APPROX_TOKEN_RE.finditer(text)] for text in texts]
+
+    def count_tokens(self, text: str) -> int:
+        """Number of tokens the embedding model sees for a text (without special tokens)."""
+        return len(self._token_offsets([text])[0]) if text else 0
+
+    def _split_long_paragraph(self, paragraph: str, offsets: List[Tuple[int, int]]) -> List[Tuple[str, int]]:
+        """Split an oversized paragraph into sentences, and oversized sentences into token windows."""
+        starts = [start for start, _ in offsets]
+        pieces = []
+        position = 0
+        boundaries = [match.start() for match in _SENTENCE_END_RE.finditer(paragraph)] + [len(paragraph)]
+        for boundary in boundaries:
+            first = bisect_left(starts, position)
+            last = bisect_left(starts, boundary)
+            count = last - first
+            if count > self.max_tokens:
+                # No sentence break small enough: cut at token boundaries
+                for window in range(first, last, self.max_tokens):
+                    end = min(window + self.max_tokens, last)
+                    pieces.append((paragraph[offsets[window][0]:offsets[end - 1][1]], end - window))
+            else:
+                sentence = paragraph[position:boundary].strip()
+                if sentence:
+                    pieces.append((sentence, count))
+            position = boundary
+        return pieces
+
+    def _units(self, text: str) -> List[_Unit]:
+        """Break text into paragraphs (or sentences of long paragraphs) with token counts."""
+        paragraphs = [" ".join(paragraph.split()) for paragraph in _PARAGRAPH_SPLIT_RE.split(text)]
+        paragraphs = [paragraph for paragraph in paragraphs if paragraph]
+        if not paragraphs:
+            return []
+
+        units = []
+        for index, (paragraph, offsets) in enumerate(zip(paragraphs, self._token_offsets(paragraphs))):
+            heading = _HEADING_RE.match(paragraph) is not None
+            if len(offsets) <= self.max_tokens:
+                units.append(_Unit(paragraph, len(offsets), index, heading))
+            else:
+                for piece, count in self._split_long_paragraph(paragraph, offsets):
+                    units.append(_Unit(piece, count, index, False))
+        return units
+
+    def _join(self, units: List[_Unit]) -> str:
+        """Join units, keeping sentences of a paragraph on one line."""
+        parts = []
+        for i, unit in enumerate(units):
+            if i:
+                parts.append(" " if unit.paragraph == units[i - 1].paragraph else "\n\n")
+            parts.append(unit.text)
+        return "".join(parts)
+
+    def chunk(self, text: Optional[str]) -> List[str]:
+        """
+        Split text into chunks of at most max_tokens tokens.
+
+        Paragraphs are packed greedily and only split (at sentence boundaries,
+        then at token boundaries) when a single paragraph exceeds the budget.
+        A heading starts a new chunk once the current one has body text, and
+        overlap is never carried across a heading. Each unit is tokenized
+        once, so chunking is linear in the text length.
+        """
+        if not text:
+            return []
+
+        chunks = []
+        current: List[_Unit] = []
+        current_tokens = 0
+        has_body = False
+
+        for unit in self._units(text):
+            new_section = unit.heading and has_body
+            if current and (new_section or current_tokens + unit.tokens > self.max_tokens):
+                chunks.append(self._join(current))
+                carried = []
+                if not new_section:
+                    carried_tokens = 0
+                    for previous in reversed(current[1:]):
+                        if carried_tokens + previous.tokens > self.overlap_tokens:
+                            break
+                        carried.insert(0, previous)
+                        carried_tokens += previous.tokens
+                    while carried and carried_tokens + unit.tokens > self.max_tokens:
+                        carried_tokens -= carried.pop(0).tokens
+                current = carried
+                current_tokens = sum(previous.tokens for previous in carried)
+                has_body = any(not previous.heading for previous in carried)
+
+            current.append(unit)
+            current_tokens += unit.tokens
+            has_body = has_body or not unit.heading
+
+        if current:
+            chunks.append(self._join(current))
+        return chunks
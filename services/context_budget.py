@@ -0,0 +1,223 @@
+"""Token budget for chat prompts: system prompt, conversation history and retrieved knowledge"""
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .llm_provider import load_system_prompt
+
+# Whole prompt, system prompt included, in approximate tokens
+PROMPT_TOKEN_BUDGET = int(os.getenv('PIXLY_PROMPT_TOKEN_BUDGET', '3000'))
+# Share of the tokens left after the system prompt and question that history may use;
+# knowledge gets the rest, including whatever history leaves unused
+HISTORY_TOKEN_SHARE = float(os.getenv('PIXLY_HISTORY_TOKEN_SHARE', '0.4'))
+# Knowledge chunks sharing this fraction of their word 5-grams with better-ranked chunks are dropped
+DUPLICATE_CHUNK_OVERLAP = float(os.getenv('PIXLY_DUPLICATE_CHUNK_OVERLAP', '0.6'))
+# Tokens kept of each side of an older exchange that does not fit in full
+CONDENSED_MESSAGE_TOKENS = 40
+# Chunks that would get fewer content tokens than this are left out
+MIN_CHUNK_TOKENS = 24
+# Labels the chatbot adds around the context (detected game, section headings)
+RESERVED_TOKENS = 32
+
+# Words and punctuation marks, the same approximation the chunker uses without a tokenizer.
+# Gemini's tokenizer produces roughly as many tokens for English text.
+_TOKEN_RE = re.compile(r'\w+|[^\w\s]')
+_WORD_RE = re.compile(r'\w+')
+_SHINGLE_SIZE = 5
+
+
+def count_tokens(text: str) -> int:
+    """Approximate number of tokens in a text."""
+    return len(_TOKEN_RE.findall(text)) if text else 0
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cut a text to at most max_tokens tokens, marking a cut with '...' (3 of those tokens)."""
+    matches = list(_TOKEN_RE.finditer(text))
+    if len(matches) <= max_tokens:
+        return text
+    keep = max_tokens - 3
+    if keep <= 0:
+        return ""
+    return text[:matches[keep].start()].rstrip() + "..."
+
+
+@lru_cache(maxsize=1)
+def system_prompt_tokens() -> int:
+    """Tokens of the system prompt sent with every request."""
+    try:
+        return count_tokens(load_system_prompt())
+    except OSError as e:
+        print(f"Error reading system prompt for token budget: {e}")
+        return 0
+
+
+def format_exchange(exchange: Dict, max_tokens: Optional[int] = None) -> str:
+    """One history exchange as prompt lines, each side cut to max_tokens if given."""
+    time_str = exchange.get("timestamp", "")[:16].replace("T", " ")
+    user_message = exchange["user_message"]
+    assistant_response = exchange["assistant_response"]
+    if max_tokens is not None:
+        user_message = truncate_tokens(user_message, max_tokens)
+        assistant_response = truncate_tokens(assistant_response, max_tokens)
+    return f"[{time_str}] User: {user_message}\n[{time_str}] Assistant: {assistant_response}"
+
+
+def _shingles(text: str) -> set:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < _SHINGLE_SIZE:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + _SHINGLE_SIZE]) for i in range(len(words) - _SHINGLE_SIZE + 1)}
+
+
+def dedupe_chunks(results: Sequence[Dict], overlap: float = DUPLICATE_CHUNK_OVERLAP) -> Tuple[List[Dict], int]:
+    """
+    Drop knowledge results that mostly repeat better-ranked ones.
+
+    Neighbouring chunks of a page share their overlap sentences, and the same
+    text is often scraped from several pages, so a result whose word 5-grams
+    are largely covered by earlier results adds little.
+
+    Args:
+        results: Search results in rank order
+        overlap: Fraction of a result's 5-grams already seen for it to be dropped
+
+    Returns:
+        The kept results, in order, and the number dropped
+    """
+    kept, seen = [], set()
+    for result in results:
+        shingles = _shingles(result.get('content', ''))
+        if not shingles or len(shingles & seen) / len(shingles) >= overlap:
+            continue
+        kept.append(result)
+        seen |= shingles
+    return kept, len(results) - len(kept)
+
+
+class ContextBudget:
+    def __init__(self, question: str, total_tokens: int = PROMPT_TOKEN_BUDGET,
+                 history_share: float = HISTORY_TOKEN_SHARE, system_tokens: Optional[int] = None):
+        """
+        Initialize the token budget of one prompt.
+
+        The system prompt and question are always sent. Of the tokens left,
+        history may use history_share; knowledge gets everything history
+        does not use.
+
+        Args:
+            question: The user's question
+            total_tokens: Budget for the whole prompt
+            history_share: Share of the remaining tokens history may use
+            system_tokens: Tokens of the system prompt; defaults to PROMPTS.txt's
+        """
+        self.total_tokens = total_tokens
+        self.history_share = history_share
+        system_tokens = system_prompt_tokens() if system_tokens is None else system_tokens
+        question_tokens = count_tokens(question)
+        self.remaining = max(0, total_tokens - system_tokens - question_tokens - RESERVED_TOKENS)
+        self.stats = {
+            'budget': total_tokens,
+            'system': system_tokens,
+            'question': question_tokens,
+            'history': 0,
+            'history_budget': 0,
+            'messages': 0,
+            'condensed': 0,
+            'dropped_messages': 0,
+            'knowledge': 0,
+            'knowledge_budget': 0,
+            'chunks': 0,
+            'duplicates': 0,
+            'dropped_chunks': 0,
+            'total': None
+        }
+
+    def history(self, exchanges: Sequence[Dict]) -> str:
+        """
+        Format as much recent history as fits the history budget.
+
+        The newest exchanges are kept in full; older ones are condensed to the
+        start of each message, and the oldest dropped, once the budget runs out.
+
+        Args:
+            exchanges: History exchanges, oldest first, as returned by ChatHistoryManager.get_recent_history
+
+        Returns:
+            The history context, or "" if nothing fits
+        """
+        heading = "Previous conversation history:"
+        budget = int(self.remaining * self.history_share)
+        self.stats['history_budget'] = budget
+        left = budget - count_tokens(heading)
+        lines = []
+        for exchange in reversed(exchanges):
+            text = format_exchange(exchange)
+            tokens = count_tokens(text)
+            if tokens > left:
+                text = format_exchange(exchange, CONDENSED_MESSAGE_TOKENS)
+                tokens = count_tokens(text)
+                if tokens > left:
+                    break
+                self.stats['condensed'] += 1
+            lines.append(text)
+            left -= tokens
+        self.stats['messages'] = len(lines)
+        self.stats['dropped_messages'] = len(exchanges) - len(lines)
+        if not lines:
+            return ""
+        context = "\n".join([heading] + lines[::-1])
+        self.stats['history'] = count_tokens(context)
+        self.remaining -= self.stats['history']
+        return context
+
+    def knowledge(self, results: Sequence[Dict]) -> str:
+        """
+        Format deduplicated knowledge results within the tokens history left.
+
+        Each result gets an equal share of what is left when it is formatted,
+        so short chunks pass their unused tokens on to later ones.
+
+        Args:
+            results: Search results in rank order
+
+        Returns:
+            The knowledge context, or "" if nothing fits
+        """
+        heading = "\n\nRELEVANT KNOWLEDGE FROM GAME DATABASE:\n"
+        self.stats['knowledge_budget'] = self.remaining
+        results, self.stats['duplicates'] = dedupe_chunks(results)
+        left = self.remaining - count_tokens(heading)
+        entries = []
+        for i, result in enumerate(results):
+            metadata = result.get('metadata') or {}
+            header = f"\n{i + 1}. {metadata.get('title', 'Unknown Title')}\n"
+            header += f"   Source: {metadata.get('content_type', 'unknown').upper()}\n"
+            footer = f"   URL: {metadata.get('url', 'N/A')}\n"
+            header += "   Content: "
+            share = left // (len(results) - i) - count_tokens(header + footer)
+            if share < MIN_CHUNK_TOKENS:
+                break
+            entry = f"{header}{truncate_tokens(result['content'], share)}\n{footer}"
+            entries.append(entry)
+            left -= count_tokens(entry)
+        self.stats['chunks'] = len(entries)
+        self.stats['dropped_chunks'] = len(results) - len(entries)
+        if not entries:
+            return ""
+        context = heading + "".join(entries)
+        self.stats['knowledge'] = count_tokens(context)
+        self.remaining -= self.stats['knowledge']
+        return context
+
+    def log(self, prompt: str):
+        """Record the final prompt's size and print this request's prompt statistics."""
+        stats = self.stats
+        stats['total'] = stats['system'] + count_tokens(prompt)
+        print(f"Prompt tokens: {stats['total']}/{stats['budget']} "
+              f"(system {stats['system']}, question {stats['question']}, "
+              f"history {stats['history']}/{stats['history_budget']} with {stats['messages']} messages, "
+              f"{stats['condensed']} condensed, {stats['dropped_messages']} dropped, "
+              f"knowledge {stats['knowledge']}/{stats['knowledge_budget']} with {stats['chunks']} chunks, "
+              f"{stats['duplicates']} duplicates, {stats['dropped_chunks']} dropped)")
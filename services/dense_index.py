@@ -0,0 +1,391 @@
+"""In-process vector indexes: quantized storage with exact re-ranking, and flat brute-force search"""
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+QUANTIZATIONS = ('int8', 'float16')
+# Rows scored per matrix product, bounding the float32 temporaries of a scan
+SCAN_BLOCK_ROWS = 65536
+
+
+def write_rows(file_path: str, rows: Sequence[int], values: np.ndarray):
+    """Write fixed-size rows of a raw array file in place, growing the file as needed."""
+    mode = 'r+b' if os.path.exists(file_path) else 'w+b'
+    row_bytes = values.shape[1] * values.itemsize
+    with open(file_path, mode) as f:
+        for row, value in zip(rows, values):
+            f.seek(int(row) * row_bytes)
+            f.write(value.tobytes())
+
+
+class DenseIndex:
+    def __init__(self, path: str, quantization: str = 'int8', rerank_factor: int = 4):
+        """
+        Initialize a quantized vector index stored in a directory.
+
+        Quantized codes (one byte per dimension for int8, two for float16) are
+        kept in memory and scanned for every query. The original float32
+        vectors stay on disk and are memory-mapped, so only the rows of the
+        top candidates are read to re-rank them exactly.
+
+        Args:
+            path: Directory holding the index files
+            quantization: 'int8' (per-vector symmetric scale) or 'float16'
+            rerank_factor: Candidates re-ranked per requested result
+        """
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unsupported quantization: {quantization}")
+        self.path = path
+        self.quantization = quantization
+        self.rerank_factor = max(1, rerank_factor)
+        self._lock = threading.Lock()
+        self._vectors = None
+
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    @property
+    def _code_dtype(self):
+        return np.int8 if self.quantization == 'int8' else np.float16
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load(self):
+        """Read ids, labels and codes from disk (an empty index if there are none)."""
+        self.ids: List[str] = []
+        self.labels: List[str] = []
+        self.dim = 0
+        try:
+            with open(self._file('ids.json'), 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            if stored.get('quantization') != self.quantization:
+                raise ValueError(f"index was built with {stored.get('quantization')}")
+            self.ids = stored['ids']
+            self.labels = stored['labels']
+            self.dim = stored['dim']
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error loading dense index {self.path}, starting empty: {e}")
+            self.ids, self.labels, self.dim = [], [], 0
+
+        self._rows: Dict[str, int] = {doc_id: row for row, doc_id in enumerate(self.ids)}
+        if self.ids:
+            self.codes = np.fromfile(self._file('codes.bin'), dtype=self._code_dtype).reshape(len(self.ids), self.dim)
+            # Column 0: dequantization scale, column 1: squared norm of the original vector
+            self.stats = np.fromfile(self._file('stats.bin'), dtype=np.float32).reshape(len(self.ids), 2)
+        else:
+            self.codes = np.empty((0, 0), dtype=self._code_dtype)
+            self.stats = np.empty((0, 2), dtype=np.float32)
+
+    def _quantize(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (codes, scales) for float32 vectors."""
+        if self.quantization == 'float16':
+            return vectors.astype(np.float16), np.ones(len(vectors), dtype=np.float32)
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def _write_rows(self, name: str, rows: np.ndarray, values: np.ndarray):
+        write_rows(self._file(name), rows, values)
+
+    def _save_ids(self):
+        tmp_path = self._file('ids.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'quantization': self.quantization, 'dim': self.dim,
+                       'ids': self.ids, 'labels': self.labels}, f)
+        os.replace(tmp_path, self._file('ids.json'))
+
+    def _truncate(self, count: int):
+        """Drop rows past count from the row files after deletions."""
+        for name, row_bytes in (('codes.bin', self.dim * self.codes.itemsize),
+                                ('stats.bin', 2 * 4), ('vectors.bin', self.dim * 4)):
+            if os.path.exists(self._file(name)):
+                with open(self._file(name), 'r+b') as f:
+                    f.truncate(count * row_bytes)
+
+    def upsert(self, ids: Sequence[str], embeddings, labels: Optional[Sequence[str]] = None):
+        """
+        Insert or replace vectors.
+
+        Args:
+            ids: Document ids
+            embeddings: float32 vectors, one per id
+            labels: Optional label per id (e.g. content type) usable as a search filter
+        """
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if not len(ids):
+            return
+        if labels is None:
+            labels = [''] * len(ids)
+
+        with self._lock:
+            if not self.dim:
+                self.dim = vectors.shape[1]
+                self.codes = np.empty((0, self.dim), dtype=self._code_dtype)
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-dim vectors, got {vectors.shape[1]}")
+
+            codes, scales = self._quantize(vectors)
+            stats = np.column_stack([scales, np.einsum('ij,ij->i', vectors, vectors)]).astype(np.float32)
+
+            rows = []
+            for doc_id, label in zip(ids, labels):
+                row = self._rows.get(doc_id)
+                if row is None:
+                    row = self._rows[doc_id] = len(self.ids)
+                    self.ids.append(doc_id)
+                    self.labels.append(label)
+                else:
+                    self.labels[row] = label
+                rows.append(row)
+            rows = np.asarray(rows)
+
+            grow = len(self.ids) - len(self.codes)
+            if grow:
+                self.codes = np.concatenate([self.codes, np.zeros((grow, self.dim), dtype=self._code_dtype)])
+                self.stats = np.concatenate([self.stats, np.zeros((grow, 2), dtype=np.float32)])
+            self.codes[rows] = codes
+            self.stats[rows] = stats
+
+            # Release the memory map before its file grows (Windows refuses to resize mapped files)
+            self._vectors = None
+            self._write_rows('codes.bin', rows, codes)
+            self._write_rows('stats.bin', rows, stats)
+            self._write_rows('vectors.bin', rows, vectors)
+            self._save_ids()
+
+    def delete(self, ids: Sequence[str]):
+        """Remove vectors; the last rows are moved into the freed slots."""
+        with self._lock:
+            doomed = sorted((self._rows[doc_id] for doc_id in ids if doc_id in self._rows), reverse=True)
+            if not doomed:
+                return
+            vectors = self._read_vectors()
+            for row in doomed:
+                last = len(self.ids) - 1
+                del self._rows[self.ids[row]]
+                if row != last:
+                    moved = self.ids[last]
+                    self.ids[row], self.labels[row] = moved, self.labels[last]
+                    self._rows[moved] = row
+                    self.codes[row] = self.codes[last]
+                    self.stats[row] = self.stats[last]
+                    self._write_rows('codes.bin', [row], self.codes[last:last + 1])
+                    self._write_rows('stats.bin', [row], self.stats[last:last + 1])
+                    self._write_rows('vectors.bin', [row], np.array(vectors[last:last + 1]))
+                self.ids.pop()
+                self.labels.pop()
+                self.codes = self.codes[:last]
+                self.stats = self.stats[:last]
+            del vectors
+            self._vectors = None
+            self._truncate(len(self.ids))
+            self._save_ids()
+
+    def _read_vectors(self) -> np.ndarray:
+        """Memory-map the float32 vectors (opened lazily, reset after writes)."""
+        if self._vectors is None:
+            self._vectors = np.memmap(self._file('vectors.bin'), dtype=np.float32, mode='r',
+                                      shape=(len(self.ids), self.dim))
+        return self._vectors
+
+    def _approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        """Approximate squared L2 distance (up to the constant |q|^2) to every vector."""
+        dots = np.empty(len(self.codes), dtype=np.float32)
+        for start in range(0, len(self.codes), SCAN_BLOCK_ROWS):
+            block = self.codes[start:start + SCAN_BLOCK_ROWS]
+            dots[start:start + len(block)] = block.astype(np.float32) @ query
+        dots *= self.stats[:, 0]
+        return self.stats[:, 1] - 2.0 * dots
+
+    def search(self, query_embedding, k: int, labels: Optional[Sequence[str]] = None) -> List[Tuple[str, float]]:
+        """
+        Find the k nearest vectors by squared L2 distance.
+
+        Candidates are ranked on the quantized codes, then the best
+        k * rerank_factor of them are re-scored with their float32 vectors.
+
+        Args:
+            query_embedding: Query vector (or a 1-row matrix)
+            k: Number of results
+            labels: Only return vectors with one of these labels
+
+        Returns:
+            ``(id, distance)`` pairs, nearest first
+        """
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        with self._lock:
+            if not self.ids or k <= 0:
+                return []
+            scores = self._approximate_scores(query)
+            if labels is not None:
+                allowed = set(labels)
+                scores[[label not in allowed for label in self.labels]] = np.inf
+
+            candidates = min(len(scores), k * self.rerank_factor)
+            top = np.argpartition(scores, candidates - 1)[:candidates]
+            top = top[np.isfinite(scores[top])]
+            if not len(top):
+                return []
+
+            top.sort()  # Sequential reads from the memory map
+            vectors = np.asarray(self._read_vectors()[top])
+            distances = self.stats[top, 1] + float(query @ query) - 2.0 * (vectors @ query)
+            ids = [self.ids[row] for row in top]
+
+        order = np.argsort(distances, kind='stable')[:k]
+        return [(ids[i], float(max(distances[i], 0.0))) for i in order]
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def memory_bytes(self) -> int:
+        """Bytes of the in-memory codes and per-vector stats scanned by every query."""
+        return int(self.codes.nbytes + self.stats.nbytes)
+
+    def disk_bytes(self) -> int:
+        """Bytes of all index files on disk."""
+        return sum(os.path.getsize(self._file(name))
+                   for name in ('ids.json', 'codes.bin', 'stats.bin', 'vectors.bin')
+                   if os.path.exists(self._file(name)))
+
+
+class FlatIndex:
+    def __init__(self, path: str):
+        """
+        Initialize an exact brute-force index for a small collection.
+
+        Normalized float32 vectors live in one contiguous file that is
+        memory-mapped for search; ids, documents and metadata are kept in
+        memory, so a query is a single matrix-vector product plus
+        argpartition with no database round trip.
+
+        Args:
+            path: Directory holding the vector file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.ids: List[str] = []
+        self.labels: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[Dict] = []
+        self._rows: Dict[str, int] = {}
+        self.dim = 0
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+        os.makedirs(path, exist_ok=True)
+
+    @property
+    def _vectors_file(self) -> str:
+        return os.path.join(self.path, 'vectors.bin')
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _map(self):
+        """(Re)open the memory map after the vector file changed size."""
+        if self.ids:
+            self.matrix = np.memmap(self._vectors_file, dtype=np.float32, mode='r', shape=(len(self.ids), self.dim))
+        else:
+            self.matrix = np.empty((0, self.dim), dtype=np.float32)
+
+    def load(self, ids: Sequence[str], embeddings, documents: Sequence[str], metadatas: Sequence[Dict],
+             labels: Sequence[str]):
+        """Replace the whole index, e.g. with the rows read from Chroma."""
+        vectors = self._normalize(embeddings) if len(ids) else np.empty((0, self.dim), dtype=np.float32)
+        with self._lock:
+            self.matrix = None
+            with open(self._vectors_file, 'wb') as f:
+                f.write(vectors.tobytes())
+            self.ids, self.labels = list(ids), list(labels)
+            self.documents, self.metadatas = list(documents), list(metadatas)
+            self._rows = {doc_id: row for row, doc_id in enumerate(self.ids)}
+            self.dim = vectors.shape[1]
+            self._map()
+
+    def upsert(self, ids: Sequence[str], embeddings, documents: Sequence[str], metadatas: Sequence[Dict],
+               labels: Sequence[str]):
+        """Insert or replace rows."""
+        if not len(ids):
+            return
+        vectors = self._normalize(embeddings)
+        with self._lock:
+            if not self.dim:
+                self.dim = vectors.shape[1]
+            rows = []
+            for doc_id, document, metadata, label in zip(ids, documents, metadatas, labels):
+                row = self._rows.get(doc_id)
+                if row is None:
+                    row = self._rows[doc_id] = len(self.ids)
+                    self.ids.append(doc_id)
+                    self.labels.append(label)
+                    self.documents.append(document)
+                    self.metadatas.append(metadata)
+                else:
+                    self.labels[row], self.documents[row], self.metadatas[row] = label, document, metadata
+                rows.append(row)
+            # Release the memory map before its file grows
+            self.matrix = None
+            write_rows(self._vectors_file, rows, vectors)
+            self._map()
+
+    def delete(self, ids: Sequence[str]):
+        """Remove rows; the last rows are moved into the freed slots."""
+        with self._lock:
+            doomed = sorted((self._rows[doc_id] for doc_id in ids if doc_id in self._rows), reverse=True)
+            if not doomed:
+                return
+            vectors = np.array(self.matrix)
+            self.matrix = None
+            for row in doomed:
+                last = len(self.ids) - 1
+                del self._rows[self.ids[row]]
+                if row != last:
+                    for column in (self.ids, self.labels, self.documents, self.metadatas):
+                        column[row] = column[last]
+                    self._rows[self.ids[row]] = row
+                    vectors[row] = vectors[last]
+                    write_rows(self._vectors_file, [row], vectors[row:row + 1])
+                for column in (self.ids, self.labels, self.documents, self.metadatas):
+                    column.pop()
+            with open(self._vectors_file, 'r+b') as f:
+                f.truncate(len(self.ids) * self.dim * 4)
+            self._map()
+
+    def search(self, query_embedding, k: int,
+               labels: Optional[Sequence[str]] = None) -> List[Tuple[str, float, str, Dict]]:
+        """
+        Find the k most similar rows.
+
+        Distances are squared L2 between unit vectors (2 - 2 * cosine), the
+        same scale Chroma reports for normalized embeddings.
+
+        Returns:
+            ``(id, distance, document, metadata)`` tuples, nearest first
+        """
+        query = self._normalize(np.asarray(query_embedding, dtype=np.float32).reshape(1, -1))[0]
+        with self._lock:
+            if not self.ids or k <= 0:
+                return []
+            scores = self.matrix @ query
+            if labels is not None:
+                allowed = set(labels)
+                scores[[label not in allowed for label in self.labels]] = -np.inf
+
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [(self.ids[row], float(max(2.0 - 2.0 * scores[row], 0.0)), self.documents[row], self.metadatas[row])
+                    for row in top if np.isfinite(scores[row])]
+
+    def count(self) -> int:
+        return len(self.ids)
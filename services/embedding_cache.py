@@ -0,0 +1,149 @@
+"""Persistent embedding cache: memory-mapped float32 matrix with a SQLite hash index"""
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+
+class EmbeddingCache:
+    def __init__(self, cache_dir: str, model_name: str):
+        """
+        Initialize the on-disk embedding cache for one embedding model.
+
+        Args:
+            cache_dir: Directory holding the index database and vector matrices
+            model_name: Embedding model the cached vectors were produced by
+        """
+        self.cache_dir = cache_dir
+        self.model_name = model_name
+        self.db_path = os.path.join(cache_dir, "embedding_index.db")
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', model_name)
+        self.matrix_path = os.path.join(cache_dir, f"{safe_name}.f32")
+        self.dim = None
+        self._matrix = None
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._init_database()
+
+    def _init_database(self):
+        """Create the hash-to-row index tables."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS embeddings (
+                chunk_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                row INTEGER NOT NULL,
+                PRIMARY KEY (chunk_hash, model)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS models (
+                model TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute('SELECT dim FROM models WHERE model = ?', (self.model_name,))
+        row = cursor.fetchone()
+        if row:
+            self.dim = row[0]
+        conn.commit()
+        conn.close()
+
+    def _rows_on_disk(self) -> int:
+        """Number of complete vectors stored in the matrix file."""
+        if not self.dim or not os.path.exists(self.matrix_path):
+            return 0
+        return os.path.getsize(self.matrix_path) // (4 * self.dim)
+
+    def _get_matrix(self, min_rows: int):
+        """Return a read-only memmap covering at least min_rows rows."""
+        if self._matrix is None or self._matrix.shape[0] < min_rows:
+            rows = self._rows_on_disk()
+            if rows == 0:
+                return None
+            self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode='r', shape=(rows, self.dim))
+        return self._matrix
+
+    def get_many(self, hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Return cached vectors for the given chunk hashes that are present."""
+        if not hashes or not self.dim:
+            return {}
+
+        rows = {}
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        unique = list(dict.fromkeys(hashes))
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(unique), 500):
+            batch = unique[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            cursor.execute(
+                f"SELECT chunk_hash, row FROM embeddings WHERE model = ? AND chunk_hash IN ({placeholders})",
+                [self.model_name, *batch]
+            )
+            rows.update(cursor.fetchall())
+        conn.close()
+
+        if not rows:
+            return {}
+
+        with self._lock:
+            matrix = self._get_matrix(max(rows.values()) + 1)
+            if matrix is None:
+                return {}
+            return {
+                chunk_hash: np.array(matrix[row])
+                for chunk_hash, row in rows.items()
+                if row < matrix.shape[0]
+            }
+
+    def put_many(self, hashes: List[str], vectors: np.ndarray):
+        """Append vectors to the matrix and index them by chunk hash."""
+        if not hashes:
+            return
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+
+            if not self.dim:
+                self.dim = int(vectors.shape[1])
+                cursor.execute(
+                    'INSERT OR REPLACE INTO models (model, dim) VALUES (?, ?)',
+                    (self.model_name, self.dim)
+                )
+                conn.commit()
+            elif vectors.shape[1] != self.dim:
+                conn.close()
+                print(f"Skipping embedding cache write: expected dim {self.dim}, got {vectors.shape[1]}")
+                return
+
+            # Release the read mapping before growing the file (required on Windows)
+            self._matrix = None
+            start_row = self._rows_on_disk()
+            with open(self.matrix_path, 'ab') as f:
+                # Drop a partial row left by an interrupted write, so new rows land at their index
+                f.truncate(start_row * 4 * self.dim)
+                f.write(vectors.tobytes())
+
+            cursor.executemany(
+                'INSERT OR REPLACE INTO embeddings (chunk_hash, model, row) VALUES (?, ?, ?)',
+                [(chunk_hash, self.model_name, start_row + i) for i, chunk_hash in enumerate(hashes)]
+            )
+            conn.commit()
+            conn.close()
+
+    def count(self) -> int:
+        """Number of vectors indexed for this model."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM embeddings WHERE model = ?', (self.model_name,))
+        total = cursor.fetchone()[0]
+        conn.close()
+        return total
@@ -0,0 +1,132 @@
+"""Batched, deduplicated embedding generation on top of SentenceTransformer"""
+import hashlib
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+def content_hash(text: str) -> str:
+    """Return the sha256 hex digest used to identify a chunk of text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingEngine:
+    def __init__(self, model_name: str, batch_size: int = 32, cache_size: int = 10000, store=None):
+        """
+        Initialize the embedding engine.
+
+        Args:
+            model_name: Name of the SentenceTransformer model the vectors belong to
+            batch_size: Number of texts sent to the model per micro-batch
+            cache_size: Maximum number of embeddings kept in the in-memory cache
+            store: Optional persistent cache (e.g. EmbeddingCache) checked before encoding
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.store = store
+        self._cache = OrderedDict()
+
+    def _token_lengths(self, model, texts: List[str]) -> List[int]:
+        """Return the token length of each text, falling back to a word count."""
+        tokenizer = getattr(model, 'tokenizer', None)
+        if tokenizer is not None:
+            try:
+                encoded = tokenizer(texts, add_special_tokens=False)['input_ids']
+                return [len(ids) for ids in encoded]
+            except Exception:
+                pass
+        return [len(text.split()) for text in texts]
+
+    def _cache_get(self, key: str) -> Optional[np.ndarray]:
+        """Look up a cached embedding and mark it as recently used."""
+        vector = self._cache.get(key)
+        if vector is not None:
+            self._cache.move_to_end(key)
+        return vector
+
+    def _cache_put(self, key: str, vector: np.ndarray):
+        """Store an embedding, evicting the least recently used entries."""
+        self._cache[key] = vector
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _encode_missing(self, model, texts: List[str]) -> np.ndarray:
+        """Encode texts in length-sorted micro-batches and restore input order."""
+        lengths = self._token_lengths(model, texts)
+        order = sorted(range(len(texts)), key=lambda i: lengths[i])
+
+        vectors = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch_idx = order[start:start + self.batch_size]
+            batch = [texts[i] for i in batch_idx]
+            encoded = model.encode(
+                batch,
+                batch_size=len(batch),
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+            encoded = np.asarray(encoded, dtype=np.float32)
+            for row, i in enumerate(batch_idx):
+                vectors[i] = encoded[row]
+
+        return np.vstack(vectors)
+
+    def encode(self, model, texts: Sequence[str], use_store: bool = True) -> np.ndarray:
+        """
+        Embed texts, reusing cached vectors for texts seen before.
+
+        Args:
+            model: Loaded SentenceTransformer (or compatible) model
+            texts: Texts to embed
+            use_store: Whether to consult and fill the persistent cache
+
+        Returns:
+            float32 array of shape (len(texts), dim)
+        """
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        keys = [content_hash(text) for text in texts]
+        found = {}
+        missing = OrderedDict()
+        for key, text in zip(keys, texts):
+            if key in found or key in missing:
+                continue
+            vector = self._cache_get(key)
+            if vector is not None:
+                found[key] = vector
+            else:
+                missing[key] = text
+
+        store = self.store if use_store else None
+        if missing and store is not None:
+            try:
+                stored = store.get_many(list(missing.keys()))
+            except Exception as e:
+                print(f"Error reading embedding cache: {e}")
+                stored = {}
+            for key, vector in stored.items():
+                found[key] = vector
+                self._cache_put(key, vector)
+                del missing[key]
+
+        if missing:
+            encoded = self._encode_missing(model, list(missing.values()))
+            for key, vector in zip(missing.keys(), encoded):
+                found[key] = vector
+                self._cache_put(key, vector)
+            if store is not None:
+                try:
+                    store.put_many(list(missing.keys()), encoded)
+                except Exception as e:
+                    print(f"Error writing embedding cache: {e}")
+
+        return np.vstack([found[key] for key in keys]).astype(np.float32, copy=False)
+
+    def clear_cache(self):
+        """Drop all cached embeddings."""
+        self._cache.clear()
@@ -0,0 +1,95 @@
+"""Bounded thread pools that keep blocking work off the event loop"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Iterable
+
+# Threads for calls that mostly wait: Gemini requests, Chroma and SQLite reads/writes
+IO_WORKERS = int(os.getenv('PIXLY_IO_WORKERS', '16'))
+# Threads for CPU-heavy work: embedding, image decoding. Torch and NumPy release
+# the GIL, so threads scale without pickling the model into worker processes.
+CPU_WORKERS = int(os.getenv('PIXLY_CPU_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(kind: str, workers: int) -> ThreadPoolExecutor:
+    pool = _pools.get(kind)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(kind)
+            if pool is None:
+                pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix=f"pixly-{kind}")
+                _pools[kind] = pool
+    return pool
+
+
+def io_executor() -> ThreadPoolExecutor:
+    """Pool for I/O-bound blocking calls."""
+    return _get_pool('io', IO_WORKERS)
+
+
+def cpu_executor() -> ThreadPoolExecutor:
+    """Pool for CPU-bound blocking calls."""
+    return _get_pool('cpu', CPU_WORKERS)
+
+
+async def run_io(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking I/O-bound call in the I/O pool and await its result."""
+    return await asyncio.get_running_loop().run_in_executor(io_executor(), partial(func, *args, **kwargs))
+
+
+async def run_cpu(func: Callable, *args, **kwargs) -> Any:
+    """Run a CPU-bound call in the CPU pool and await its result."""
+    return await asyncio.get_running_loop().run_in_executor(cpu_executor(), partial(func, *args, **kwargs))
+
+
+async def stream_io(func: Callable[..., Iterable], *args, **kwargs) -> AsyncIterator[Any]:
+    """
+    Iterate a blocking iterator in the I/O pool, yielding its items as they arrive.
+
+    Args:
+        func: Callable returning the iterator (called in the pool as well)
+
+    If the consumer stops early, the worker stops after its current item.
+    """
+    loop = asyncio.get_running_loop()
+    items: asyncio.Queue = asyncio.Queue()
+    stopped = threading.Event()
+    done = object()
+
+    def produce():
+        try:
+            for item in func(*args, **kwargs):
+                if stopped.is_set():
+                    break
+                loop.call_soon_threadsafe(items.put_nowait, (item, None))
+        except BaseException as e:
+            loop.call_soon_threadsafe(items.put_nowait, (done, e))
+        else:
+            loop.call_soon_threadsafe(items.put_nowait, (done, None))
+
+    loop.run_in_executor(io_executor(), produce)
+    try:
+        while True:
+            item, error = await items.get()
+            if error is not None:
+                raise error
+            if item is done:
+                break
+            yield item
+    finally:
+        stopped.set()
+
+
+def shutdown_executors(wait: bool = False):
+    """Stop both pools; they are recreated on next use."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
@@ -0,0 +1,211 @@
+"""Pluggable HTML text extraction backends for scraped knowledge pages"""
+import os
+import re
+import threading
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    import lxml.etree
+except ImportError:  # pragma: no cover - lxml is a declared dependency
+    lxml = None
+
+HTML_PARSER = os.getenv('PIXLY_HTML_PARSER', 'lxml')
+
+# Elements whose text becomes its own paragraph, and cells kept apart by a space
+BLOCK_TAGS = (
+    'address', 'article', 'aside', 'blockquote', 'dd', 'div', 'dl', 'dt', 'figcaption', 'figure',
+    'footer', 'header', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'tr', 'ul'
+)
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+CELL_TAGS = ('td', 'th', 'br')
+
+# tag, tag.class, tag#id and tag[attr*="value"] - the selector forms the scrapers use
+_SIMPLE_SELECTOR_RE = re.compile(
+    r'^(?P<tag>[a-zA-Z][\w-]*|\*)?'
+    r'(?:\.(?P<cls>[\w-]+)|#(?P<id>[\w-]+)|\[(?P<attr>[\w-]+)\*="(?P<value>[^"]*)"\])?$'
+)
+
+
+def css_to_xpath(selector: str) -> str:
+    """
+    Translate a simple CSS selector into an XPath expression.
+
+    Only the forms used by the scrapers are supported: ``tag``, ``tag.class``,
+    ``tag#id`` and ``tag[attr*="value"]``.
+
+    Raises:
+        ValueError: If the selector uses any other syntax
+    """
+    match = _SIMPLE_SELECTOR_RE.match(selector.strip())
+    if not match:
+        raise ValueError(f"Unsupported selector: {selector}")
+    xpath = f"//{match.group('tag') or '*'}"
+    if match.group('cls'):
+        xpath += f"[contains(concat(' ', normalize-space(@class), ' '), ' {match.group('cls')} ')]"
+    elif match.group('id'):
+        xpath += f"[@id='{match.group('id')}']"
+    elif match.group('attr'):
+        xpath += f"[contains(@{match.group('attr')}, '{match.group('value')}')]"
+    return xpath
+
+
+class HtmlExtractor:
+    """Base class of HTML extraction backends."""
+
+    name = "base"
+
+    def extract(self, html: bytes, selectors: Sequence[str], all_matches: bool = False) -> Tuple[Optional[str], str]:
+        """
+        Extract the page title and the raw text of its main content.
+
+        Script and style elements are ignored. Block elements are separated by
+        blank lines and headings get markdown-style ``#`` prefixes, so the
+        chunker can see paragraphs and sections. The first selector that
+        matches wins; with all_matches=True the text of every element it
+        matches is joined, otherwise only the first element is used. Falls
+        back to the text of <body> when no selector matches.
+
+        Args:
+            html: Raw page bytes
+            selectors: Content selectors in priority order
+            all_matches: Join the text of all elements matched by the winning selector
+
+        Returns:
+            ``(title, text)``; title is None if the page has no <title>
+        """
+        raise NotImplementedError
+
+
+class LxmlExtractor(HtmlExtractor):
+    """Extractor using lxml's C parser with precompiled XPath selectors."""
+
+    name = "lxml"
+
+    def __init__(self):
+        # Compiled XPath objects must not be shared between the scraper's worker threads
+        self._local = threading.local()
+
+    def _xpath(self, selector: str):
+        compiled = getattr(self._local, 'compiled', None)
+        if compiled is None:
+            compiled = self._local.compiled = {}
+        xpath = compiled.get(selector)
+        if xpath is None:
+            xpath = compiled[selector] = lxml.etree.XPath(css_to_xpath(selector))
+        return xpath
+
+    def extract(self, html: bytes, selectors: Sequence[str], all_matches: bool = False) -> Tuple[Optional[str], str]:
+        root = lxml.html.document_fromstring(html)
+
+        # Drop script and style elements but keep the text that follows them
+        for element in root.xpath('//script | //style'):
+            element.drop_tree()
+
+        for element in root.iter(*BLOCK_TAGS):
+            element.text = "\n\n" + (element.text or "")
+            element.tail = "\n\n" + (element.tail or "")
+        for element in root.iter(*HEADING_TAGS):
+            element.text = "\n\n" + "#" * int(element.tag[1]) + " " + (element.text or "")
+            element.tail = "\n\n" + (element.tail or "")
+        for element in root.iter(*CELL_TAGS):
+            element.tail = " " + (element.tail or "")
+
+        title = root.find('.//title')
+        title_text = title.text_content().strip() if title is not None else None
+
+        content_text = ""
+        for selector in selectors:
+            matches = self._xpath(selector)(root)
+            if matches:
+                if all_matches:
+                    content_text = " ".join(element.text_content() for element in matches)
+                else:
+                    content_text = matches[0].text_content()
+                break
+
+        if not content_text:
+            body = root.find('body')
+            if body is not None:
+                content_text = body.text_content()
+
+        return title_text, content_text
+
+
+class BeautifulSoupExtractor(HtmlExtractor):
+    """Extractor using BeautifulSoup with the pure-Python html.parser."""
+
+    name = "bs4"
+
+    def extract(self, html: bytes, selectors: Sequence[str], all_matches: bool = False) -> Tuple[Optional[str], str]:
+        soup = BeautifulSoup(html, 'html.parser')
+
+        # Remove script and style elements
+        for script in soup(["script", "style"]):
+            script.decompose()
+
+        for tag in soup.find_all(BLOCK_TAGS):
+            tag.insert(0, "\n\n")
+            tag.insert_after("\n\n")
+        for tag in soup.find_all(HEADING_TAGS):
+            tag.insert(0, "\n\n" + "#" * int(tag.name[1]) + " ")
+            tag.insert_after("\n\n")
+        for tag in soup.find_all(CELL_TAGS):
+            tag.insert_after(" ")
+
+        title = soup.find('title')
+        title_text = title.get_text().strip() if title else None
+
+        content_text = ""
+        for selector in selectors:
+            if all_matches:
+                content_divs = soup.select(selector)
+                if content_divs:
+                    content_text = " ".join([div.get_text() for div in content_divs])
+                    break
+            else:
+                content_div = soup.select_one(selector)
+                if content_div:
+                    content_text = content_div.get_text()
+                    break
+
+        if not content_text:
+            # Fallback: get all text from body
+            body = soup.find('body')
+            if body:
+                content_text = body.get_text()
+
+        return title_text, content_text
+
+
+_EXTRACTORS: Dict[str, Callable[[], HtmlExtractor]] = {
+    BeautifulSoupExtractor.name: BeautifulSoupExtractor
+}
+if lxml is not None:
+    _EXTRACTORS[LxmlExtractor.name] = LxmlExtractor
+
+
+def register_extractor(name: str, factory: Callable[[], HtmlExtractor]):
+    """Register an extraction backend selectable via get_extractor / PIXLY_HTML_PARSER."""
+    _EXTRACTORS[name] = factory
+
+
+def available_extractors() -> Sequence[str]:
+    """Names of the registered extraction backends."""
+    return sorted(_EXTRACTORS)
+
+
+def get_extractor(name: Optional[str] = None) -> HtmlExtractor:
+    """
+    Create the named extraction backend (PIXLY_HTML_PARSER by default).
+
+    Unknown or unavailable backends fall back to BeautifulSoup.
+    """
+    name = name or HTML_PARSER
+    factory = _EXTRACTORS.get(name)
+    if factory is None:
+        print(f"HTML parser '{name}' not available, falling back to BeautifulSoup")
+        factory = BeautifulSoupExtractor
+    return factory()
@@ -0,0 +1,128 @@
+"""On-disk HTTP validator cache for scraped knowledge pages"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class ResponseCache:
+    def __init__(self, db_path: str, version: str = ""):
+        """
+        Initialize the response cache.
+
+        Each URL maps to the ETag / Last-Modified validators of its last full
+        download and the page extracted from it, so an unchanged page can be
+        revalidated with a conditional request instead of downloaded and parsed.
+        Entries stored under another version (e.g. by an older extractor) are
+        misses, so their pages are downloaded and extracted again.
+
+        Args:
+            db_path: Path of the SQLite database file (created on first write)
+            version: Format of the extracted pages stored
+        """
+        self.db_path = db_path
+        self.version = version
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating the table on first use."""
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path)
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    page TEXT,
+                    fetched_at REAL NOT NULL,
+                    version TEXT
+                )
+            ''')
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(responses)')]
+            if 'version' not in columns:
+                # Caches written before pages were versioned
+                conn.execute('ALTER TABLE responses ADD COLUMN version TEXT')
+            conn.commit()
+            self._initialized = True
+            return conn
+        return sqlite3.connect(self.db_path)
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        Return the cached entry for a URL.
+
+        Returns:
+            Dict with etag, last_modified and page (the extracted page or None
+            if the page had no useful content), or None if the URL is not
+            cached under this cache's version
+        """
+        if not self._initialized and not os.path.exists(self.db_path):
+            return None
+        try:
+            with self._lock:
+                conn = self._connect()
+                cursor = conn.cursor()
+                cursor.execute('SELECT etag, last_modified, page, version FROM responses WHERE url = ?', (url,))
+                row = cursor.fetchone()
+                conn.close()
+            if row is None or (row[3] or "") != self.version:
+                return None
+            return {
+                'etag': row[0],
+                'last_modified': row[1],
+                'page': json.loads(row[2]) if row[2] else None
+            }
+        except Exception as e:
+            print(f"Error reading response cache for {url}: {e}")
+            return None
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Return If-None-Match / If-Modified-Since headers for a cached URL."""
+        entry = self.get(url)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], page: Optional[Dict]):
+        """
+        Store the validators and extracted page of a full response.
+
+        Responses without any validator cannot be revalidated, so they are not stored.
+        """
+        if not isinstance(etag, str):
+            etag = None
+        if not isinstance(last_modified, str):
+            last_modified = None
+        if not etag and not last_modified:
+            return
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    'INSERT OR REPLACE INTO responses (url, etag, last_modified, page, fetched_at, version) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (url, etag, last_modified, json.dumps(page) if page else None, time.time(), self.version)
+                )
+                conn.commit()
+                conn.close()
+        except Exception as e:
+            print(f"Error writing response cache for {url}: {e}")
+
+    def delete(self, url: str):
+        """Forget a cached URL."""
+        if not self._initialized and not os.path.exists(self.db_path):
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+            conn.commit()
+            conn.close()
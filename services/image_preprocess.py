@@ -0,0 +1,157 @@
+"""Crop, downscale and re-encode screenshots before they are sent to the vision model"""
+import io
+import os
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+# Longest side sent to the model. Gemini splits larger images into 768px tiles,
+# so 1536 keeps a 16:9 frame within 2x2 tiles with HUD text still legible.
+VISION_MAX_SIDE = int(os.getenv('PIXLY_VISION_MAX_SIDE', '1536'))
+# 'WEBP', 'JPEG' or 'PNG'
+VISION_FORMAT = os.getenv('PIXLY_VISION_FORMAT', 'WEBP').upper()
+VISION_QUALITY = int(os.getenv('PIXLY_VISION_QUALITY', '80'))
+# WebP encoder effort, 0-6; on screenshots 1 is about 3x faster than Pillow's default 4 at the same size
+WEBP_METHOD = int(os.getenv('PIXLY_VISION_WEBP_METHOD', '1'))
+# Region of interest as "left,top,right,bottom" fractions of the frame, e.g. "0,0.5,1,1"
+# for the bottom half; empty sends the whole frame
+VISION_REGION = os.getenv('PIXLY_VISION_REGION', '')
+
+FORMATS = {'WEBP': 'image/webp', 'JPEG': 'image/jpeg', 'PNG': 'image/png'}
+
+Region = Tuple[float, float, float, float]
+
+
+class BufferReader(io.RawIOBase):
+    """Seekable read-only file over a bytes-like object, without copying it as io.BytesIO would for a bytearray."""
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast('B')
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        count = max(0, min(len(target), len(self._view) - self._position))
+        target[:count] = self._view[self._position:self._position + count]
+        self._position += count
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self):
+        self._view.release()
+        super().close()
+
+
+def parse_region(spec: Optional[str]) -> Optional[Region]:
+    """
+    Parse a "left,top,right,bottom" region of fractions.
+
+    Returns:
+        The region, or None for an empty or invalid spec
+    """
+    if not spec:
+        return None
+    try:
+        left, top, right, bottom = (float(part) for part in spec.split(','))
+    except ValueError:
+        print(f"Invalid vision region '{spec}', sending the whole frame")
+        return None
+    if not (0 <= left < right <= 1 and 0 <= top < bottom <= 1):
+        print(f"Invalid vision region '{spec}', sending the whole frame")
+        return None
+    return left, top, right, bottom
+
+
+def crop_region(image: Image.Image, region: Optional[Region]) -> Image.Image:
+    """Crop an image to a region given as fractions of its size."""
+    if not region:
+        return image
+    width, height = image.size
+    left, top, right, bottom = region
+    return image.crop((round(left * width), round(top * height), round(right * width), round(bottom * height)))
+
+
+def downscale(image: Image.Image, max_side: int) -> Image.Image:
+    """Shrink an image so its longest side is at most max_side, keeping the aspect ratio."""
+    if max_side <= 0 or max(image.size) <= max_side:
+        return image
+    image = image.copy()
+    # reducing_gap first halves the image with a cheap box filter, then resamples with Lanczos
+    image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS, reducing_gap=2.0)
+    return image
+
+
+def encode(image: Image.Image, fmt: str = VISION_FORMAT, quality: int = VISION_QUALITY) -> bytes:
+    """Encode an image as WebP, JPEG or PNG."""
+    fmt = fmt.upper()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported image format '{fmt}', expected one of {sorted(FORMATS)}")
+    if fmt == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA', 'L'):
+        image = image.convert('RGBA' if 'A' in image.mode else 'RGB')
+    buffer = io.BytesIO()
+    if fmt == 'PNG':
+        image.save(buffer, format='PNG', optimize=False)
+    elif fmt == 'WEBP':
+        image.save(buffer, format='WEBP', quality=quality, method=WEBP_METHOD)
+    else:
+        image.save(buffer, format='JPEG', quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def preprocess_image(image: Image.Image, max_side: int = VISION_MAX_SIDE, fmt: str = VISION_FORMAT,
+                     quality: int = VISION_QUALITY, region: Optional[Region] = None) -> Tuple[bytes, str]:
+    """
+    Crop, downscale and encode a screenshot for the vision model.
+
+    Args:
+        image: Captured frame
+        max_side: Longest side after downscaling (0 keeps the size)
+        fmt: 'WEBP', 'JPEG' or 'PNG'
+        quality: Lossy quality, 1-100
+        region: Region of interest as fractions; defaults to the whole frame
+
+    Returns:
+        The encoded bytes and their MIME type
+    """
+    image = downscale(crop_region(image, region), max_side)
+    return encode(image, fmt, quality), FORMATS[fmt.upper()]
+
+
+def prepare_vision_image(image_bytes: bytes, max_side: int = VISION_MAX_SIDE, fmt: str = VISION_FORMAT,
+                         quality: int = VISION_QUALITY, region: Optional[Region] = None) -> Dict:
+    """
+    Turn uploaded screenshot bytes into an image part for the model.
+
+    Images already within max_side (as sent by the overlay) are passed
+    through without decoding; larger ones, e.g. full-resolution PNGs from
+    older clients, are preprocessed here.
+
+    Args:
+        image_bytes: Encoded image as bytes, bytearray or memoryview; PIL
+            reads it in place and a passed-through upload is not copied
+
+    Returns:
+        {'mime_type': ..., 'data': ...}, accepted by Gemini as a content part
+    """
+    with BufferReader(image_bytes) as reader, Image.open(reader) as image:
+        if region is None and image.format in FORMATS and max(image.size) <= max_side:
+            return {'mime_type': FORMATS[image.format], 'data': image_bytes}
+        data, mime_type = preprocess_image(image, max_side, fmt, quality, region)
+    return {'mime_type': mime_type, 'data': data}
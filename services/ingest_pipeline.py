@@ -0,0 +1,266 @@
+"""Streaming knowledge ingestion: scrape -> chunk -> embed -> upsert over bounded queues"""
+import copy
+import queue
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+_DONE = object()
+
+
+class IngestPipeline:
+    def __init__(self, service, game_name: str, queue_size: int = 8, batch_size: int = 64,
+                 on_progress: Optional[Callable[[str, Dict], None]] = None):
+        """
+        Initialize a streaming ingestion run for one game.
+
+        Each stage runs on its own thread and hands work to the next one through
+        a bounded queue, so a slow stage blocks the ones before it (backpressure)
+        and only a few pages and embedding batches are held in memory at a time.
+        Vectors are upserted as soon as each batch is embedded.
+
+        Args:
+            service: VectorService providing collections, chunking and embeddings
+            game_name: Game whose knowledge is ingested
+            queue_size: Capacity of each queue between stages
+            batch_size: Number of chunks embedded and upserted together
+            on_progress: Optional callback ``(stage, snapshot)`` called on every progress update
+        """
+        self.service = service
+        self.game_name = game_name
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.on_progress = on_progress
+        self.state = 'pending'
+        self.error = None
+        self.progress = {
+            'scrape': {'pages': 0},
+            'chunk': {'pages': 0, 'chunks': 0, 'unchanged': 0},
+            'embed': {'batches': 0, 'chunks': 0, 'failed': 0},
+            'upsert': {'batches': 0, 'chunks': 0, 'deleted': 0}
+        }
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def snapshot(self) -> Dict:
+        """Return a copy of the per-stage progress counters."""
+        with self._lock:
+            return {'game': self.game_name, 'state': self.state, 'error': self.error,
+                    'stages': copy.deepcopy(self.progress)}
+
+    def _advance(self, stage: str, **counts):
+        """Add to a stage's counters and notify the progress callback."""
+        with self._lock:
+            for name, value in counts.items():
+                self.progress[stage][name] += value
+        if self.on_progress:
+            self.on_progress(stage, self.snapshot())
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        """Block until the next stage has room; False if the run was aborted."""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue):
+        """Block for the next item; returns the end marker once the run is aborted."""
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _scrape_stage(self, source: Iterable[Tuple[str, Dict]], pages: queue.Queue):
+        """Pull ``(content_type, entry)`` pages from the source."""
+        try:
+            for content_type, entry in source:
+                self._advance('scrape', pages=1)
+                if not self._put(pages, (content_type, entry)):
+                    break
+        finally:
+            close = getattr(source, 'close', None)
+            if close:
+                close()
+
+    def _chunk_stage(self, pages: queue.Queue, chunks: queue.Queue):
+        """Chunk pages and keep only chunks that are not stored yet."""
+        known = {}
+        while True:
+            item = self._get(pages)
+            if item is _DONE:
+                break
+            content_type, entry = item
+
+            if content_type not in known:
+                collection = self.service.get_or_create_collection(self.game_name, content_type)
+                ids_by_url = self.service._existing_ids_by_url(collection, content_type) if collection else {}
+                known[content_type] = (collection, ids_by_url)
+            collection, ids_by_url = known[content_type]
+            if collection is None:
+                continue
+
+            records, stale_ids, unchanged = self.service.plan_entry(
+                self.game_name, content_type, entry, ids_by_url.get(entry.get('url', ''), set())
+            )
+            self._advance('chunk', pages=1, chunks=len(records), unchanged=unchanged)
+            if records and not self._put(chunks, ('chunks', collection, records)):
+                break
+            # After the replacement chunks, so a page is never left without any
+            if stale_ids and not self._put(chunks, ('delete', collection, (entry.get('url', ''), stale_ids))):
+                break
+
+    def _embed_stage(self, chunks: queue.Queue, vectors: queue.Queue):
+        """
+        Embed chunks in batches; a partial batch is flushed when no input is waiting.
+
+        A page's stale-chunk deletion is passed on only after its new chunks,
+        and dropped if any of them failed to embed, so the page keeps its old chunks.
+        """
+        batch = []
+        failed_pages = set()
+
+        def flush() -> bool:
+            texts = [record['document'] for _, record in batch]
+            embeddings = self.service.generate_embeddings(texts, persist=True)
+            if len(embeddings):
+                self._advance('embed', batches=1, chunks=len(batch))
+                ok = self._put(vectors, ('upsert', list(batch), embeddings))
+            else:
+                print(f"Failed to generate embeddings for {len(batch)} chunks of {self.game_name}")
+                self._advance('embed', failed=len(batch))
+                failed_pages.update((id(collection), record['metadata']['url']) for collection, record in batch)
+                ok = True
+            batch.clear()
+            return ok
+
+        while True:
+            if batch:
+                try:
+                    item = chunks.get_nowait()
+                except queue.Empty:
+                    if not flush():
+                        return
+                    continue
+            else:
+                item = self._get(chunks)
+            if item is _DONE:
+                break
+
+            kind, collection, payload = item
+            if kind == 'delete':
+                # The page's new chunks are upserted before its stale ones are deleted
+                if batch and not flush():
+                    return
+                url, stale_ids = payload
+                if (id(collection), url) in failed_pages:
+                    continue
+                if not self._put(vectors, ('delete', collection, stale_ids)):
+                    return
+                continue
+            for record in payload:
+                batch.append((collection, record))
+                if len(batch) >= self.batch_size and not flush():
+                    return
+
+        if batch:
+            flush()
+
+    def _upsert_stage(self, vectors: queue.Queue):
+        """Write embedded batches and stale-chunk deletions to Chroma."""
+        while True:
+            item = self._get(vectors)
+            if item is _DONE:
+                break
+            kind, payload, extra = item
+
+            if kind == 'delete':
+                self.service.delete_chunks(self.game_name, payload, list(extra))
+                self._advance('upsert', deleted=len(extra))
+            else:
+                # A batch can span content types (and so collections)
+                groups = {}
+                for row, (collection, record) in enumerate(payload):
+                    groups.setdefault(id(collection), (collection, []))[1].append((row, record))
+                for collection, rows in groups.values():
+                    self.service.upsert_chunks(self.game_name, collection, [record for _, record in rows],
+                                               extra[[row for row, _ in rows]])
+                self._advance('upsert', batches=1, chunks=len(payload))
+            self.service.knowledge_changed(self.game_name)
+
+    def _prune_unlisted(self, listed_urls: Dict[str, set]):
+        """Delete stored chunks of pages no longer listed in the source."""
+        deleted = 0
+        for content_type, urls in listed_urls.items():
+            collection = self.service._get_existing_collection(
+                self.service.collection_name(self.game_name, content_type)
+            )
+            if collection is None:
+                continue
+            ids_by_url = self.service._existing_ids_by_url(collection, content_type)
+            stale_ids = sorted(doc_id for url, ids in ids_by_url.items() if url not in urls for doc_id in ids)
+            if stale_ids:
+                self.service.delete_chunks(self.game_name, collection, stale_ids)
+                self._advance('upsert', deleted=len(stale_ids))
+                deleted += len(stale_ids)
+        if deleted:
+            self.service.knowledge_changed(self.game_name)
+
+    def _run_stage(self, stage: str, target, args, output: Optional[queue.Queue]):
+        """Run a stage, aborting the pipeline on error and signalling the next stage when done."""
+        try:
+            target(*args)
+        except Exception as e:
+            print(f"Error in {stage} stage for {self.game_name}: {e}")
+            with self._lock:
+                self.error = f"{stage}: {e}"
+            self._stop.set()
+        finally:
+            if output is not None:
+                self._put(output, _DONE)
+
+    def run(self, source: Iterable[Tuple[str, Dict]], listed_urls: Optional[Dict[str, set]] = None) -> Dict:
+        """
+        Ingest a stream of ``(content_type, entry)`` pages and wait for completion.
+
+        Args:
+            source: Pages to ingest
+            listed_urls: Every URL the source lists per content type, including pages
+                that failed to fetch; after a successful run, stored chunks of other
+                URLs are deleted. None keeps them.
+
+        Returns:
+            Progress snapshot with per-stage counters, final state and error (if any)
+        """
+        pages = queue.Queue(maxsize=self.queue_size)
+        chunks = queue.Queue(maxsize=self.queue_size)
+        vectors = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self.state = 'running'
+
+        threads = [
+            threading.Thread(target=self._run_stage, name=f"ingest-{stage}", daemon=True,
+                             args=(stage, target, args, output))
+            for stage, target, args, output in (
+                ('scrape', self._scrape_stage, (source, pages), pages),
+                ('chunk', self._chunk_stage, (pages, chunks), chunks),
+                ('embed', self._embed_stage, (chunks, vectors), vectors)
+            )
+        ]
+        for thread in threads:
+            thread.start()
+        self._run_stage('upsert', self._upsert_stage, (vectors,), None)
+        # Unblock producers still waiting on a full queue after an error
+        self._stop.set()
+        for thread in threads:
+            thread.join()
+
+        if self.error is None and listed_urls is not None:
+            self._run_stage('prune', self._prune_unlisted, (listed_urls,), None)
+
+        with self._lock:
+            self.state = 'failed' if self.error else 'done'
+        return self.snapshot()
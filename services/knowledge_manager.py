@@ -1,11 +1,68 @@
 import os
-import pandas as pd
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 import re
+from functools import partial
 from urllib.parse import urlparse
-import time
+from .scraper import AsyncScraper
+from .http_cache import ResponseCache
+from .html_extractors import BeautifulSoupExtractor, get_extractor
+from .lazy import lazy_import
+
+pd = lazy_import('pandas')
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+SCRAPE_MAX_CONCURRENCY = int(os.getenv('PIXLY_SCRAPE_MAX_CONCURRENCY', '8'))
+SCRAPE_PER_HOST_CONCURRENCY = int(os.getenv('PIXLY_SCRAPE_PER_HOST_CONCURRENCY', '2'))
+SCRAPE_REQUESTS_PER_SECOND = float(os.getenv('PIXLY_SCRAPE_REQUESTS_PER_SECOND', '2'))
+SCRAPE_BURST = int(os.getenv('PIXLY_SCRAPE_BURST', '2'))
+HTTP_CACHE_ENABLED = os.getenv('PIXLY_HTTP_CACHE', '1') != '0'
+# Format of extracted pages in the HTTP cache; bump it when extraction or text
+# cleaning changes so pages cached by older code are parsed again
+PAGE_FORMAT_VERSION = 2
+
+# Main content selectors in priority order
+WIKI_CONTENT_SELECTORS = [
+    'div.mw-content-ltr',
+    'div.content',
+    'div.main-content',
+    'article',
+    'div#content',
+    'div#mw-content-text'
+]
+FORUM_CONTENT_SELECTORS = [
+    'div.post-content',
+    'div.entry-content',
+    'div.content',
+    'div.post',
+    'article',
+    'div[class*="post"]',
+    'div[class*="content"]'
+]
+
+# Text cleaning patterns, compiled once and applied in this order. The
+# case-insensitive boilerplate phrases are matched case-sensitively against a
+# lowercased copy of the text, which keeps the regex engine on its fast
+# literal-prefix search. Breadcrumb trails use [^>]* instead of a lazy .*?
+# (equivalent on whitespace-collapsed text, which has no newlines) so they
+# cannot backtrack.
+_BOILERPLATE_SOURCES = [
+    r'advertisement\s*',
+    r'cookie\s*policy\s*',
+    r'privacy\s*policy\s*',
+    r'terms\s*of\s*service\s*',
+]
+_BOILERPLATE_PATTERNS = [re.compile(source) for source in _BOILERPLATE_SOURCES]
+_BOILERPLATE_IGNORECASE_PATTERNS = [re.compile(source, re.IGNORECASE) for source in _BOILERPLATE_SOURCES]
+_NAVIGATION_PATTERNS = [
+    re.compile(r'Home\s*>[^>]*>\s*'),
+    re.compile(r'You are here:[^>]*>\s*'),
+]
+# Characters re.IGNORECASE matches to i or s that str.lower() does not map
+# there (U+0130 also lowercases to two characters, shifting offsets)
+_IGNORECASE_VARIANTS = ('\u0130', '\u0131', '\u017f')
+# Blank lines the extractors put between paragraphs
+_PARAGRAPH_SPLIT_RE = re.compile(r'\n\s*\n')
 
 class KnowledgeManager:
     def __init__(self, games_info_dir: str = "games_info"):
@@ -13,8 +70,22 @@ class KnowledgeManager:
         self.games_info_dir = games_info_dir
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            'User-Agent': USER_AGENT
         })
+        self.scraper = AsyncScraper(
+            headers={'User-Agent': USER_AGENT},
+            max_concurrency=SCRAPE_MAX_CONCURRENCY,
+            per_host_concurrency=SCRAPE_PER_HOST_CONCURRENCY,
+            requests_per_second=SCRAPE_REQUESTS_PER_SECOND,
+            burst=SCRAPE_BURST
+        )
+        # HTML parsing backend (lxml by default, PIXLY_HTML_PARSER=bs4 for BeautifulSoup)
+        self.extractor = get_extractor()
+        # ETag / Last-Modified validators and extracted pages of earlier downloads
+        self.response_cache = ResponseCache(
+            os.path.join(games_info_dir, '.cache', 'http_cache.db'),
+            version=f"{self.extractor.name}-{PAGE_FORMAT_VERSION}"
+        ) if HTTP_CACHE_ENABLED else None
         
         # Ensure games_info directory exists
         os.makedirs(games_info_dir, exist_ok=True)
@@ -28,7 +99,7 @@ class KnowledgeManager:
             print(f"Error getting available games: {e}")
             return []
     
-    def load_game_csv(self, game_name: str) -> Optional[pd.DataFrame]:
+    def load_game_csv(self, game_name: str) -> Optional["pd.DataFrame"]:
         """Load CSV file for a specific game."""
         try:
             csv_path = os.path.join(self.games_info_dir, f"{game_name}.csv")
@@ -56,137 +127,223 @@ class KnowledgeManager:
             if pd.isna(url) or not url or not isinstance(url, str):
                 return None
             
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # Extract title
-            title = soup.find('title')
-            title_text = title.get_text().strip() if title else "Unknown Title"
-            
-            # Extract main content - try different selectors
-            content_selectors = [
-                'div.mw-content-ltr',
-                'div.content',
-                'div.main-content',
-                'article',
-                'div#content',
-                'div#mw-content-text'
-            ]
-            
-            content_text = ""
-            for selector in content_selectors:
-                content_div = soup.select_one(selector)
-                if content_div:
-                    content_text = content_div.get_text()
-                    break
-            
-            if not content_text:
-                # Fallback: get all text from body
-                body = soup.find('body')
-                if body:
-                    content_text = body.get_text()
-            
-            # Clean up the text
-            content_text = self._clean_text(content_text)
-            
-            if len(content_text) < 50:  # Too short, probably not useful
-                return None
-            
-            return {
-                'title': title_text,
-                'content': content_text,
-                'url': url
-            }
+            response = self.session.get(url, headers=self._conditional_headers(url), timeout=10)
+            return self._parse_response(self.parse_wiki_html, url, response)
             
         except Exception as e:
             print(f"Error extracting wiki content from {url}: {e}")
             return None
     
+    def parse_wiki_html(self, html: bytes, url: str) -> Optional[Dict[str, str]]:
+        """Extract title and main content from a downloaded wiki page."""
+        try:
+            return self._build_page(html, url, WIKI_CONTENT_SELECTORS, all_matches=False)
+        except Exception as e:
+            print(f"Error parsing wiki content from {url}: {e}")
+            return None
+    
     def extract_forum_content(self, url: str) -> Optional[Dict[str, str]]:
         """Extract content from forum URLs."""
         try:
             if pd.isna(url) or not url or not isinstance(url, str):
                 return None
             
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # Extract title
-            title = soup.find('title')
-            title_text = title.get_text().strip() if title else "Unknown Title"
-            
-            # Extract forum content - try different selectors
-            content_selectors = [
-                'div.post-content',
-                'div.entry-content',
-                'div.content',
-                'div.post',
-                'article',
-                'div[class*="post"]',
-                'div[class*="content"]'
-            ]
-            
-            content_text = ""
-            for selector in content_selectors:
-                content_divs = soup.select(selector)
-                if content_divs:
-                    content_text = " ".join([div.get_text() for div in content_divs])
-                    break
-            
-            if not content_text:
-                # Fallback: get all text from body
-                body = soup.find('body')
-                if body:
-                    content_text = body.get_text()
-            
-            # Clean up the text
-            content_text = self._clean_text(content_text)
-            
-            if len(content_text) < 50:  # Too short, probably not useful
-                return None
-            
-            return {
-                'title': title_text,
-                'content': content_text,
-                'url': url
-            }
+            response = self.session.get(url, headers=self._conditional_headers(url), timeout=10)
+            return self._parse_response(self.parse_forum_html, url, response)
             
         except Exception as e:
             print(f"Error extracting forum content from {url}: {e}")
             return None
     
-    def _clean_text(self, text: str) -> str:
-        """Clean and normalize extracted text."""
+    def parse_forum_html(self, html: bytes, url: str) -> Optional[Dict[str, str]]:
+        """Extract title and post content from a downloaded forum page."""
+        try:
+            return self._build_page(html, url, FORUM_CONTENT_SELECTORS, all_matches=True)
+        except Exception as e:
+            print(f"Error parsing forum content from {url}: {e}")
+            return None
+    
+    def _build_page(self, html: bytes, url: str, selectors: List[str], all_matches: bool) -> Optional[Dict[str, str]]:
+        """Run the extractor over a page and clean its text; None if the page is too short."""
+        try:
+            title_text, content_text = self.extractor.extract(html, selectors, all_matches)
+        except Exception as e:
+            if isinstance(self.extractor, BeautifulSoupExtractor):
+                raise
+            # The fast parser rejected the page; BeautifulSoup is more forgiving
+            print(f"{self.extractor.name} extraction failed for {url} ({e}), retrying with BeautifulSoup")
+            title_text, content_text = BeautifulSoupExtractor().extract(html, selectors, all_matches)
+        
+        # Clean up the text
+        content_text = self._clean_text(content_text, keep_paragraphs=True)
+        
+        if len(content_text) < 50:  # Too short, probably not useful
+            return None
+        
+        return {
+            'title': title_text or "Unknown Title",
+            'content': content_text,
+            'url': url
+        }
+    
+    def _clean_text(self, text: str, keep_paragraphs: bool = False) -> str:
+        """
+        Clean and normalize extracted text.
+        
+        With keep_paragraphs=True, paragraphs (separated by blank lines) are
+        cleaned one by one and joined with blank lines for the chunker.
+        """
         if not text:
             return ""
         
+        if keep_paragraphs:
+            paragraphs = (self._clean_text(paragraph) for paragraph in _PARAGRAPH_SPLIT_RE.split(text))
+            return "\n\n".join(paragraph for paragraph in paragraphs if paragraph)
+        
         # Remove extra whitespace and newlines
-        text = re.sub(r'\s+', ' ', text)
+        text = " ".join(text.split())
         
         # Remove common unwanted patterns
-        text = re.sub(r'Advertisement\s*', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'Cookie\s*Policy\s*', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'Privacy\s*Policy\s*', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'Terms\s*of\s*Service\s*', '', text, flags=re.IGNORECASE)
+        if any(variant in text for variant in _IGNORECASE_VARIANTS):
+            for pattern in _BOILERPLATE_IGNORECASE_PATTERNS:
+                text = pattern.sub('', text)
+        else:
+            lowered = text.lower()
+            for pattern in _BOILERPLATE_PATTERNS:
+                text, lowered = self._remove_matches(pattern, text, lowered)
         
         # Remove navigation elements
-        text = re.sub(r'Home\s*>\s*.*?>\s*', '', text)
-        text = re.sub(r'You are here:\s*.*?>\s*', '', text)
+        for pattern in _NAVIGATION_PATTERNS:
+            text = pattern.sub('', text)
         
         return text.strip()
     
+    def _remove_matches(self, pattern, text: str, lowered: str) -> Tuple[str, str]:
+        """Cut the spans a pattern matches in ``lowered`` out of both strings."""
+        kept = []
+        last = 0
+        for match in pattern.finditer(lowered):
+            kept.append((last, match.start()))
+            last = match.end()
+        if not kept:
+            return text, lowered
+        kept.append((last, len(text)))
+        return ("".join(text[start:end] for start, end in kept),
+                "".join(lowered[start:end] for start, end in kept))
+    
+    def _conditional_headers(self, url: str) -> Dict[str, str]:
+        """Return revalidation headers for a URL downloaded before."""
+        if self.response_cache is None:
+            return {}
+        return self.response_cache.conditional_headers(url)
+    
+    def _parse_response(self, parser, url: str, response) -> Optional[Dict[str, str]]:
+        """
+        Check a fetched response and hand its body to a page parser.
+        
+        A 304 Not Modified answer reuses the page extracted from the cached
+        download; full responses are parsed and cached with their validators.
+        """
+        if response.status_code == 304:
+            cached = self.response_cache.get(url) if self.response_cache is not None else None
+            if cached is None:
+                raise ValueError(f"Not Modified response for {url} without a cached copy")
+            return cached['page']
+        response.raise_for_status()
+        page = parser(response.content, url)
+        if self.response_cache is not None:
+            self.response_cache.put(url, response.headers.get('ETag'), response.headers.get('Last-Modified'), page)
+        return page
+    
+    def _scrape_jobs(self, jobs: List[Tuple[str, str]]):
+        """Pair each ``(kind, url)`` job with the parser for its page kind."""
+        parsers = {'wiki': self.parse_wiki_html, 'forum': self.parse_forum_html}
+        return [(url, partial(self._parse_response, parsers[kind])) for kind, url in jobs]
+    
+    def fetch_pages(self, jobs: List[Tuple[str, str]]) -> List[Optional[Dict[str, str]]]:
+        """
+        Fetch and parse pages concurrently.
+        
+        Args:
+            jobs: ``(kind, url)`` pairs where kind is 'wiki' or 'forum'
+        
+        Returns:
+            Parsed page (title, content, url) or None per job, in job order
+        """
+        return self.scraper.scrape_all(self._scrape_jobs(jobs), headers_for=self._conditional_headers)
+    
+    def iter_pages(self, jobs: List[Tuple[str, str]], max_pending: int = 4) -> Iterator[Tuple[int, Optional[Dict[str, str]]]]:
+        """
+        Fetch and parse pages concurrently, yielding ``(job index, page)`` as they complete.
+        
+        At most ``max_pending`` pages are in flight or waiting to be consumed,
+        so a slow consumer pauses fetching instead of buffering the corpus.
+        """
+        return self.scraper.iter_scrape(self._scrape_jobs(jobs), headers_for=self._conditional_headers, max_pending=max_pending)
+    
+    def _page_jobs(self, df: "pd.DataFrame") -> List[Tuple[str, str, str]]:
+        """List the ``(kind, url, description)`` wiki and forum pages of a game CSV."""
+        pages = []
+        for kind, desc_column in (('wiki', 'wiki_desc'), ('forum', 'forum_desc')):
+            for idx, row in df.iterrows():
+                if not pd.isna(row[kind]) and row[kind]:
+                    description = row[desc_column] if not pd.isna(row[desc_column]) else ""
+                    pages.append((kind, row[kind], description))
+        return pages
+    
+    def _youtube_entries(self, df: "pd.DataFrame") -> List[Dict]:
+        """Build YouTube entries of a game CSV (just store descriptions)."""
+        entries = []
+        for idx, row in df.iterrows():
+            if not pd.isna(row['youtube']) and row['youtube']:
+                entries.append({
+                    'url': row['youtube'],
+                    'description': row['yt_desc'] if not pd.isna(row['yt_desc']) else "",
+                    'title': f"YouTube Video: {row['yt_desc'] if not pd.isna(row['yt_desc']) else 'Unknown'}"
+                })
+        return entries
+    
+    def list_source_urls(self, game_name: str) -> Optional[Dict[str, set]]:
+        """
+        URLs a game CSV lists per content type, or None if the CSV cannot be loaded.
+        
+        Ingestion deletes stored chunks of URLs no longer listed here.
+        """
+        df = self.load_game_csv(game_name)
+        if df is None:
+            return None
+        
+        urls = {'wiki': set(), 'youtube': {entry['url'] for entry in self._youtube_entries(df)}, 'forum': set()}
+        for kind, url, _ in self._page_jobs(df):
+            urls[kind].add(url)
+        return urls
+    
+    def iter_game_knowledge(self, game_name: str, max_pending: int = 4) -> Iterator[Tuple[str, Dict]]:
+        """
+        Stream a game's knowledge entries as ``(content_type, entry)`` pairs.
+        
+        YouTube entries come first since they need no download; wiki and forum
+        pages follow in completion order as soon as each one is parsed.
+        """
+        df = self.load_game_csv(game_name)
+        if df is None:
+            return
+        
+        for entry in self._youtube_entries(df):
+            yield 'youtube', entry
+        
+        pages = self._page_jobs(df)
+        print(f"Streaming {len(pages)} pages for {game_name}...")
+        for index, content in self.iter_pages([(kind, url) for kind, url, _ in pages], max_pending=max_pending):
+            if content:
+                kind, url, description = pages[index]
+                yield kind, {
+                    'url': url,
+                    'description': description,
+                    'title': content['title'],
+                    'content': content['content']
+                }
+    
     def process_game_knowledge(self, game_name: str) -> Dict[str, List[Dict]]:
         """Process all knowledge sources for a game."""
         df = self.load_game_csv(game_name)
@@ -201,42 +358,22 @@ class KnowledgeManager:
         
         print(f"Processing knowledge for {game_name}...")
         
-        # Process wiki entries
-        for idx, row in df.iterrows():
-            if not pd.isna(row['wiki']) and row['wiki']:
-                print(f"Processing wiki: {row['wiki']}")
-                wiki_content = self.extract_wiki_content(row['wiki'])
-                if wiki_content:
-                    processed_knowledge['wiki'].append({
-                        'url': row['wiki'],
-                        'description': row['wiki_desc'] if not pd.isna(row['wiki_desc']) else "",
-                        'title': wiki_content['title'],
-                        'content': wiki_content['content']
-                    })
-                time.sleep(1)  # Be respectful to servers
+        # Wiki and forum pages are fetched concurrently with per-host rate
+        # limits instead of one by one with a fixed sleep
+        pages = self._page_jobs(df)
+        print(f"Fetching {len(pages)} pages...")
+        fetched = self.fetch_pages([(kind, url) for kind, url, _ in pages])
         
-        # Process YouTube entries (just store descriptions)
-        for idx, row in df.iterrows():
-            if not pd.isna(row['youtube']) and row['youtube']:
-                processed_knowledge['youtube'].append({
-                    'url': row['youtube'],
-                    'description': row['yt_desc'] if not pd.isna(row['yt_desc']) else "",
-                    'title': f"YouTube Video: {row['yt_desc'] if not pd.isna(row['yt_desc']) else 'Unknown'}"
+        for (kind, url, description), content in zip(pages, fetched):
+            if content:
+                processed_knowledge[kind].append({
+                    'url': url,
+                    'description': description,
+                    'title': content['title'],
+                    'content': content['content']
                 })
         
-        # Process forum entries
-        for idx, row in df.iterrows():
-            if not pd.isna(row['forum']) and row['forum']:
-                print(f"Processing forum: {row['forum']}")
-                forum_content = self.extract_forum_content(row['forum'])
-                if forum_content:
-                    processed_knowledge['forum'].append({
-                        'url': row['forum'],
-                        'description': row['forum_desc'] if not pd.isna(row['forum_desc']) else "",
-                        'title': forum_content['title'],
-                        'content': forum_content['content']
-                    })
-                time.sleep(1)  # Be respectful to servers
+        processed_knowledge['youtube'] = self._youtube_entries(df)
         
         print(f"Processed {len(processed_knowledge['wiki'])} wiki entries, "
             f"{len(processed_knowledge['youtube'])} YouTube entries, "
@@ -274,6 +411,14 @@ def process_game_knowledge(game_name: str) -> Dict[str, List[Dict]]:
     """Process all knowledge sources for a game."""
     return knowledge_manager.process_game_knowledge(game_name)
 
+def iter_game_knowledge(game_name: str) -> Iterator[Tuple[str, Dict]]:
+    """Stream knowledge entries of a game as they are fetched."""
+    return knowledge_manager.iter_game_knowledge(game_name)
+
+def list_source_urls(game_name: str) -> Optional[Dict[str, set]]:
+    """URLs a game CSV lists per content type."""
+    return knowledge_manager.list_source_urls(game_name)
+
 def validate_csv_structure(game_name: str) -> Tuple[bool, List[str]]:
     """Validate CSV structure for a game."""
     return knowledge_manager.validate_csv_structure(game_name)
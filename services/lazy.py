@@ -0,0 +1,165 @@
+"""Lazily built singletons with background warm-up and readiness reporting"""
+import asyncio
+import importlib
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+_MISSING = object()
+# Singletons started by start_warmup() and reported by readiness()
+_registry: Dict[str, "LazyObject"] = {}
+
+
+class LazyObject:
+    """
+    Proxy for an object that is built on first use.
+
+    Attribute access, assignment, deletion and calls are forwarded to the
+    target, so a LazyObject can stand in for a module-level instance or an
+    imported module (and unittest.mock.patch works through it). Building
+    happens once, under a lock; concurrent users wait for the same build.
+    """
+
+    __slots__ = ('_lazy_name', '_lazy_factory', '_lazy_target', '_lazy_lock', '_lazy_done',
+                 '_lazy_state', '_lazy_error', '_lazy_started_at', '_lazy_seconds')
+
+    def __init__(self, name: str, factory: Callable[[], Any], warm_up: bool = True):
+        """
+        Initialize the proxy.
+
+        Args:
+            name: Name reported by readiness()
+            factory: Zero-argument callable building the target
+            warm_up: Register the object so start_warmup() builds it in the background
+        """
+        object.__setattr__(self, '_lazy_name', name)
+        object.__setattr__(self, '_lazy_factory', factory)
+        object.__setattr__(self, '_lazy_target', _MISSING)
+        object.__setattr__(self, '_lazy_lock', threading.Lock())
+        object.__setattr__(self, '_lazy_done', threading.Event())
+        object.__setattr__(self, '_lazy_state', 'cold')
+        object.__setattr__(self, '_lazy_error', None)
+        object.__setattr__(self, '_lazy_started_at', None)
+        object.__setattr__(self, '_lazy_seconds', None)
+        if warm_up:
+            _registry[name] = self
+
+    def _lazy_get(self) -> Any:
+        """Return the target, building it if needed."""
+        target = object.__getattribute__(self, '_lazy_target')
+        if target is not _MISSING:
+            return target
+
+        with object.__getattribute__(self, '_lazy_lock'):
+            target = object.__getattribute__(self, '_lazy_target')
+            if target is not _MISSING:
+                return target
+            started_at = time.time()
+            object.__setattr__(self, '_lazy_state', 'warming')
+            object.__setattr__(self, '_lazy_started_at', started_at)
+            try:
+                target = object.__getattribute__(self, '_lazy_factory')()
+            except Exception as e:
+                # Left unbuilt so the next use retries
+                object.__setattr__(self, '_lazy_state', 'failed')
+                object.__setattr__(self, '_lazy_error', str(e))
+                object.__getattribute__(self, '_lazy_done').set()
+                raise
+            object.__setattr__(self, '_lazy_target', target)
+            object.__setattr__(self, '_lazy_state', 'ready')
+            object.__setattr__(self, '_lazy_error', None)
+            object.__setattr__(self, '_lazy_seconds', time.time() - started_at)
+            object.__getattribute__(self, '_lazy_done').set()
+            return target
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._lazy_get(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._lazy_get(), name, value)
+
+    def __delattr__(self, name: str):
+        delattr(self._lazy_get(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._lazy_get()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"<LazyObject {object.__getattribute__(self, '_lazy_name')} ({lazy_status(self)['state']})>"
+
+
+def lazy_import(module_name: str, attribute: Optional[str] = None) -> LazyObject:
+    """Proxy for a module (or one of its attributes) that is imported on first use."""
+    def load():
+        module = importlib.import_module(module_name)
+        return getattr(module, attribute) if attribute else module
+    name = f"{module_name}.{attribute}" if attribute else module_name
+    return LazyObject(name, load, warm_up=False)
+
+
+def preload(obj: LazyObject, target: Any):
+    """Mark a lazy object as built with the given target, skipping its factory."""
+    with object.__getattribute__(obj, '_lazy_lock'):
+        object.__setattr__(obj, '_lazy_target', target)
+        object.__setattr__(obj, '_lazy_state', 'ready')
+        object.__setattr__(obj, '_lazy_error', None)
+        object.__getattribute__(obj, '_lazy_done').set()
+
+
+def lazy_status(obj: LazyObject) -> Dict[str, Any]:
+    """Warm-up state of a lazy object: cold, warming, ready or failed."""
+    state = object.__getattribute__(obj, '_lazy_state')
+    seconds = object.__getattribute__(obj, '_lazy_seconds')
+    started_at = object.__getattribute__(obj, '_lazy_started_at')
+    if state == 'warming' and started_at is not None:
+        seconds = time.time() - started_at
+    return {
+        'state': state,
+        'error': object.__getattribute__(obj, '_lazy_error'),
+        'seconds': round(seconds, 3) if seconds is not None else None
+    }
+
+
+def _warm(obj: LazyObject):
+    try:
+        obj._lazy_get()
+    except Exception as e:
+        print(f"Error warming up {object.__getattribute__(obj, '_lazy_name')}: {e}")
+
+
+def start_warmup(obj: Optional[LazyObject] = None):
+    """Build one lazy object (or every registered one) in background threads."""
+    targets = [obj] if obj is not None else list(_registry.values())
+    for target in targets:
+        if object.__getattribute__(target, '_lazy_state') == 'cold':
+            threading.Thread(target=_warm, args=(target,), daemon=True,
+                             name=f"warmup-{object.__getattribute__(target, '_lazy_name')}").start()
+
+
+async def wait_ready(obj: LazyObject, timeout: Optional[float] = None) -> bool:
+    """
+    Wait without blocking the event loop until a lazy object is built.
+
+    Starts its warm-up if nobody has yet. A failed build is retried once.
+    Objects that are not lazy (e.g. replaced at runtime) are always ready.
+
+    Returns:
+        True if the object is ready, False on timeout or failure
+    """
+    if not isinstance(obj, LazyObject) or object.__getattribute__(obj, '_lazy_state') == 'ready':
+        return True
+    if object.__getattribute__(obj, '_lazy_state') == 'failed':
+        await asyncio.to_thread(_warm, obj)
+    else:
+        start_warmup(obj)
+        await asyncio.to_thread(object.__getattribute__(obj, '_lazy_done').wait, timeout)
+    return object.__getattribute__(obj, '_lazy_state') == 'ready'
+
+
+def readiness() -> Dict[str, Any]:
+    """Warm-up state of every registered singleton, and whether all are ready."""
+    services = {name: lazy_status(obj) for name, obj in _registry.items()}
+    return {
+        'ready': all(status['state'] == 'ready' for status in services.values()),
+        'services': services
+    }
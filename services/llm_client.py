@@ -0,0 +1,319 @@
+"""Async calls to the chat model with deadlines, bounded concurrency, retries and a circuit breaker"""
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from typing import AsyncIterator, Callable, Dict, Optional
+
+from .executors import run_io, stream_io
+from .llm_provider import LLMProvider
+
+# Seconds a whole call may take, retries included; a stream must start within it and may not stall for longer
+LLM_TIMEOUT = float(os.getenv('PIXLY_LLM_TIMEOUT', '60'))
+LLM_MAX_CONCURRENCY = int(os.getenv('PIXLY_LLM_MAX_CONCURRENCY', '8'))
+LLM_MAX_RETRIES = int(os.getenv('PIXLY_LLM_MAX_RETRIES', '3'))
+# Retry n waits a random time up to min(max delay, base delay * 2**n)
+LLM_RETRY_BASE_DELAY = float(os.getenv('PIXLY_LLM_RETRY_BASE_DELAY', '0.5'))
+LLM_RETRY_MAX_DELAY = float(os.getenv('PIXLY_LLM_RETRY_MAX_DELAY', '8'))
+# Consecutive transient failures that open the circuit, and seconds until a trial call is let through
+LLM_BREAKER_FAILURES = int(os.getenv('PIXLY_LLM_BREAKER_FAILURES', '5'))
+LLM_BREAKER_RESET = float(os.getenv('PIXLY_LLM_BREAKER_RESET', '30'))
+
+# HTTP statuses of google.api_core errors worth retrying: rate limits and server-side failures
+_TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """A model call failed."""
+
+
+class LLMTimeoutError(LLMError, TimeoutError):
+    """A model call missed its deadline."""
+
+
+class CircuitOpenError(LLMError):
+    """Calls are failing fast after repeated transient failures."""
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether a failed call may succeed when retried."""
+    if isinstance(error, (TimeoutError, ConnectionError, asyncio.TimeoutError)):
+        return True
+    return getattr(error, 'code', None) in _TRANSIENT_STATUS
+
+
+def chunk_text(chunk) -> str:
+    """Text of a streamed chunk; chunks without text parts (e.g. the final one) give ''."""
+    try:
+        return chunk.text or ""
+    except ValueError:
+        return ""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES, reset_timeout: float = LLM_BREAKER_RESET):
+        """
+        Initialize a closed circuit breaker.
+
+        After failure_threshold consecutive failures the circuit opens and
+        calls fail fast. After reset_timeout seconds one trial call is let
+        through: success closes the circuit, failure opens it again.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Let a call through, or raise CircuitOpenError while the circuit is open."""
+        with self._lock:
+            if self.state == 'open':
+                wait = self.reset_timeout - (time.monotonic() - self.opened_at)
+                if wait > 0:
+                    raise CircuitOpenError(f"Chat model unavailable, retrying in {wait:.0f}s")
+                self.state = 'half_open'
+            if self.state == 'half_open':
+                if self._trial_running:
+                    raise CircuitOpenError("Chat model unavailable, trial call in progress")
+                self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.times_opened += 1
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+    def record_abandoned(self):
+        """A call ended without an outcome (e.g. it was cancelled); let the next one be the trial."""
+        with self._lock:
+            self._trial_running = False
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {'state': self.state, 'failures': self.failures, 'times_opened': self.times_opened}
+
+
+class LLMClient:
+    def __init__(self, get_model: Callable[[], LLMProvider], timeout: float = LLM_TIMEOUT,
+                 max_concurrency: int = LLM_MAX_CONCURRENCY, max_retries: int = LLM_MAX_RETRIES,
+                 base_delay: float = LLM_RETRY_BASE_DELAY, max_delay: float = LLM_RETRY_MAX_DELAY,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        Initialize the client.
+
+        Calls run the provider's blocking generate_content in the I/O pool,
+        at most max_concurrency at a time. Transient failures (timeouts,
+        connection errors, 429 and 5xx) are retried with jittered exponential
+        backoff while the deadline allows; other errors are raised at once.
+
+        Args:
+            get_model: Returns the provider to call, looked up on every call
+            timeout: Deadline in seconds of each call, retries included
+            max_concurrency: Calls in flight at once; further calls wait within their deadline
+            max_retries: Retries after the first attempt
+            base_delay: Backoff of the first retry, in seconds
+            max_delay: Backoff cap, in seconds
+            breaker: Circuit breaker; defaults to a new one
+        """
+        self.get_model = get_model
+        self.timeout = timeout
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        # asyncio semaphores belong to one event loop
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.calls = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+            return semaphore
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def _backoff(self, retry: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+    async def _within(self, awaitable, deadline: float):
+        """Await something before the deadline, raising LLMTimeoutError if it is missed."""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise LLMTimeoutError(f"Chat model call timed out after {self.timeout:g}s")
+        try:
+            return await asyncio.wait_for(awaitable, remaining)
+        except asyncio.TimeoutError:
+            raise LLMTimeoutError(f"Chat model call timed out after {self.timeout:g}s") from None
+
+    async def _retry_or_raise(self, error: BaseException, retry: int, deadline: float):
+        """Record a failed attempt, then wait before the next one or raise."""
+        transient = is_transient(error)
+        if transient:
+            self.breaker.record_failure()
+        else:
+            # The model answered, just not successfully
+            self.breaker.record_success()
+        if isinstance(error, LLMTimeoutError):
+            self._count('timeouts')
+        delay = self._backoff(retry)
+        if not transient or retry >= self.max_retries or time.monotonic() + delay >= deadline:
+            self._count('failures')
+            raise error
+        self._count('retries')
+        await asyncio.sleep(delay)
+
+    async def _acquire(self, deadline: float) -> asyncio.Semaphore:
+        semaphore = self._semaphore()
+        await self._within(semaphore.acquire(), deadline)
+        self._count('in_flight')
+        return semaphore
+
+    def _release(self, semaphore: asyncio.Semaphore):
+        self._count('in_flight', -1)
+        semaphore.release()
+
+    async def generate(self, content) -> str:
+        """
+        Generate a complete answer.
+
+        Args:
+            content: Prompt string, or list of prompt and images
+
+        Returns:
+            The answer text
+
+        Raises:
+            CircuitOpenError: While the circuit is open
+            LLMTimeoutError: If the deadline passes
+            Exception: The provider's error once retries are exhausted or it is not transient
+        """
+        self._count('calls')
+        deadline = time.monotonic() + self.timeout
+        semaphore = await self._acquire(deadline)
+        try:
+            retry = 0
+            while True:
+                self.breaker.before_call()
+                try:
+                    timeout = deadline - time.monotonic()
+                    response = await self._within(
+                        run_io(self.get_model().generate_content, content, timeout=timeout), deadline
+                    )
+                except asyncio.CancelledError:
+                    self.breaker.record_abandoned()
+                    raise
+                except Exception as e:
+                    await self._retry_or_raise(e, retry, deadline)
+                    retry += 1
+                    continue
+                self.breaker.record_success()
+                return response.text
+        finally:
+            self._release(semaphore)
+
+    async def stream(self, content) -> AsyncIterator[str]:
+        """
+        Generate an answer as text chunks.
+
+        Attempts are retried only until the first chunk arrives; after that an
+        error ends the stream. Each chunk must arrive before the deadline,
+        which restarts with every chunk.
+
+        Args:
+            content: Prompt string, or list of prompt and images
+
+        Raises:
+            The same errors as generate
+        """
+        self._count('calls')
+        deadline = time.monotonic() + self.timeout
+        semaphore = await self._acquire(deadline)
+        try:
+            retry = 0
+            started = False
+            while not started:
+                self.breaker.before_call()
+                timeout = deadline - time.monotonic()
+                chunks = stream_io(self.get_model().generate_content, content, stream=True, timeout=timeout)
+                try:
+                    first = await self._within(chunks.__anext__(), deadline)
+                    started = True
+                except StopAsyncIteration:
+                    self.breaker.record_success()
+                    return
+                except asyncio.CancelledError:
+                    self.breaker.record_abandoned()
+                    await chunks.aclose()
+                    raise
+                except Exception as e:
+                    await chunks.aclose()
+                    await self._retry_or_raise(e, retry, deadline)
+                    retry += 1
+            self.breaker.record_success()
+            try:
+                text = chunk_text(first)
+                if text:
+                    yield text
+                while True:
+                    try:
+                        chunk = await self._within(chunks.__anext__(), time.monotonic() + self.timeout)
+                    except StopAsyncIteration:
+                        break
+                    text = chunk_text(chunk)
+                    if text:
+                        yield text
+            except LLMTimeoutError:
+                self._count('timeouts')
+                self._count('failures')
+                raise
+            finally:
+                await chunks.aclose()
+        finally:
+            self._release(semaphore)
+
+    def snapshot(self) -> Dict:
+        """Call counters and circuit breaker state."""
+        with self._lock:
+            stats = {
+                'in_flight': self.in_flight,
+                'max_concurrency': self.max_concurrency,
+                'calls': self.calls,
+                'retries': self.retries,
+                'timeouts': self.timeouts,
+                'failures': self.failures
+            }
+        stats['breaker'] = self.breaker.snapshot()
+        return stats
@@ -0,0 +1,196 @@
+"""Chat model providers: Gemini, and a deterministic offline stand-in for tests and load tests"""
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional, Type
+from .lazy import lazy_import
+
+genai = lazy_import('google.generativeai')
+
+PROMPTS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "PROMPTS.txt")
+# 'gemini', or 'fake' for the offline stand-in
+LLM_PROVIDER = os.getenv('PIXLY_LLM', 'gemini')
+GEMINI_MODEL_NAME = os.getenv('PIXLY_GEMINI_MODEL', 'gemini-2.5-flash-lite')
+# Fake provider: seconds before the first token, output rate and answer length
+FAKE_LLM_LATENCY = float(os.getenv('PIXLY_FAKE_LLM_LATENCY', '0.2'))
+FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv('PIXLY_FAKE_LLM_TOKENS_PER_SECOND', '50'))
+FAKE_LLM_ANSWER_TOKENS = int(os.getenv('PIXLY_FAKE_LLM_ANSWER_TOKENS', '40'))
+# Fraction of fake calls that fail with a transient (connection) error
+FAKE_LLM_ERROR_RATE = float(os.getenv('PIXLY_FAKE_LLM_ERROR_RATE', '0'))
+
+_FILLER = ("Keep your distance, watch the wind-up, dodge through the attack and punish "
+           "the recovery. Upgrade your weapon and bring healing items.").split()
+
+
+def load_system_prompt(path: str = PROMPTS_PATH) -> str:
+    """Read the system prompt shared by all providers."""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class LLMResponse:
+    """Answer or streamed chunk, exposing ``text`` like a Gemini response."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class LLMProvider(ABC):
+    """
+    Chat model backend.
+
+    generate_content has the signature of Gemini's
+    GenerativeModel.generate_content: content is a prompt string or a list of
+    a prompt and PIL images, and the result (or, with stream=True, each
+    yielded chunk) has a ``text`` attribute. timeout bounds the request in
+    seconds. Subclasses that do not implement it cannot be instantiated.
+    """
+
+    name = ''
+
+    @abstractmethod
+    def generate_content(self, content, stream: bool = False, timeout: Optional[float] = None):
+        """Send content to the model and return its response."""
+
+
+class GeminiProvider(LLMProvider):
+    name = 'gemini'
+
+    def __init__(self, api_key: Optional[str] = None, model_name: str = GEMINI_MODEL_NAME,
+                 system_prompt: Optional[str] = None):
+        """
+        Configure the Gemini client and model.
+
+        Args:
+            api_key: Google API key; defaults to GOOGLE_API_KEY
+            model_name: Gemini model to use
+            system_prompt: System instruction; defaults to PROMPTS.txt
+        """
+        genai.configure(api_key=api_key or os.getenv('GOOGLE_API_KEY'))
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(
+            model_name=model_name,
+            system_instruction=system_prompt if system_prompt is not None else load_system_prompt()
+        )
+
+    @staticmethod
+    def _sdk_part(part):
+        """The SDK's protos take image data as bytes only, not bytearray or memoryview."""
+        if isinstance(part, dict) and isinstance(part.get('data'), (bytearray, memoryview)):
+            return {**part, 'data': bytes(part['data'])}
+        return part
+
+    def generate_content(self, content, stream: bool = False, timeout: Optional[float] = None):
+        request_options = {'timeout': timeout} if timeout is not None else None
+        if isinstance(content, list):
+            content = [self._sdk_part(part) for part in content]
+        return self.model.generate_content(content, stream=stream, request_options=request_options)
+
+
+class FakeProvider(LLMProvider):
+    name = 'fake'
+
+    def __init__(self, reply: Optional[str] = None, latency: float = FAKE_LLM_LATENCY,
+                 tokens_per_second: float = FAKE_LLM_TOKENS_PER_SECOND,
+                 answer_tokens: int = FAKE_LLM_ANSWER_TOKENS, tokens_per_chunk: int = 3,
+                 error_rate: float = FAKE_LLM_ERROR_RATE, fail_calls: int = 0, seed: Optional[int] = None):
+        """
+        Initialize a provider that answers deterministically without network access.
+
+        The answer echoes the prompt's first line, padded with fixed filler up to
+        answer_tokens words, so repeated prompts give identical answers. A token
+        here is a word.
+
+        Args:
+            reply: Fixed answer instead of the echo
+            latency: Seconds before the first token
+            tokens_per_second: Output rate after the first token (0 for no delay)
+            answer_tokens: Minimum answer length in tokens
+            tokens_per_chunk: Tokens per streamed chunk
+            error_rate: Fraction of calls failing with ConnectionError after the latency
+            fail_calls: Number of first calls that always fail that way
+            seed: Seed of the random failures, for repeatable runs
+        """
+        self.reply = reply
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.answer_tokens = answer_tokens
+        self.tokens_per_chunk = max(1, tokens_per_chunk)
+        self.error_rate = error_rate
+        self.fail_calls = fail_calls
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def answer(self, content) -> str:
+        """The full answer to a prompt."""
+        if self.reply is not None:
+            return self.reply
+        prompt = content[0] if isinstance(content, list) else content
+        first_line = next((line.strip() for line in str(prompt).splitlines() if line.strip()), "")
+        words = f"This is a fake answer to: {first_line}".split(" ")
+        while len(words) < self.answer_tokens:
+            words.append(_FILLER[len(words) % len(_FILLER)])
+        return " ".join(words)
+
+    def _chunks(self, text: str) -> List[str]:
+        words = text.split(" ")
+        size = self.tokens_per_chunk
+        return [" ".join(words[i:i + size]) + (" " if i + size < len(words) else "")
+                for i in range(0, len(words), size)]
+
+    def _token_delay(self, tokens: int) -> float:
+        return tokens / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _start(self, timeout: Optional[float]):
+        """Wait for the first token, like a request would: time out or fail as configured."""
+        with self._lock:
+            self.calls += 1
+            fails = self.calls <= self.fail_calls or self._random.random() < self.error_rate
+        if timeout is not None and self.latency > timeout:
+            time.sleep(max(0.0, timeout))
+            raise TimeoutError(f"Fake LLM did not answer within {timeout:.2f}s")
+        time.sleep(self.latency)
+        if fails:
+            raise ConnectionError("Fake LLM injected failure")
+
+    def _stream(self, chunks: List[str], timeout: Optional[float]) -> Iterator[LLMResponse]:
+        self._start(timeout)
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(self._token_delay(self.tokens_per_chunk))
+            yield LLMResponse(chunk)
+
+    def generate_content(self, content, stream: bool = False, timeout: Optional[float] = None):
+        text = self.answer(content)
+        chunks = self._chunks(text)
+        if stream:
+            return self._stream(chunks, timeout)
+        self._start(timeout)
+        time.sleep(self._token_delay(self.tokens_per_chunk) * (len(chunks) - 1))
+        return LLMResponse(text)
+
+
+PROVIDERS: Dict[str, Type[LLMProvider]] = {
+    GeminiProvider.name: GeminiProvider,
+    FakeProvider.name: FakeProvider,
+}
+
+
+def create_provider(name: Optional[str] = None, **kwargs) -> LLMProvider:
+    """
+    Build the configured provider.
+
+    Args:
+        name: Provider name; defaults to PIXLY_LLM
+        kwargs: Passed to the provider's constructor
+
+    Raises:
+        ValueError: For an unknown provider name
+    """
+    name = (name or LLM_PROVIDER).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider '{name}', expected one of {sorted(PROVIDERS)}")
+    return PROVIDERS[name](**kwargs)
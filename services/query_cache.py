@@ -0,0 +1,118 @@
+"""LRU cache for query embeddings and knowledge search results"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so trivially different phrasings share a cache entry."""
+    return " ".join((query or "").lower().split())
+
+
+class QueryCache:
+    def __init__(self, max_size: int = 256, ttl: float = 300):
+        """
+        Initialize the query cache.
+
+        Args:
+            max_size: Maximum number of entries kept in each of the embedding and result caches
+            ttl: Seconds an entry stays valid (0 disables expiry)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._embeddings = OrderedDict()
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self.embedding_hits = 0
+        self.embedding_misses = 0
+        self.result_hits = 0
+        self.result_misses = 0
+
+    def _get(self, store: OrderedDict, key):
+        """Return a live entry and mark it as recently used, dropping expired ones."""
+        entry = store.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if self.ttl and time.time() - stored_at > self.ttl:
+            del store[key]
+            return None
+        store.move_to_end(key)
+        return value
+
+    def _put(self, store: OrderedDict, key, value):
+        """Insert an entry, evicting the least recently used ones."""
+        store[key] = (time.time(), value)
+        store.move_to_end(key)
+        while len(store) > self.max_size:
+            store.popitem(last=False)
+
+    def _result_key(self, game_name: str, query: str, content_types: Sequence[str], limit: int, search_mode: str):
+        return (game_name.lower(), normalize_query(query), tuple(sorted(content_types)), limit, search_mode)
+
+    def get_embedding(self, query: str) -> Optional[np.ndarray]:
+        """Return the cached embedding of a query, if any."""
+        with self._lock:
+            value = self._get(self._embeddings, normalize_query(query))
+            if value is None:
+                self.embedding_misses += 1
+            else:
+                self.embedding_hits += 1
+            return value
+
+    def put_embedding(self, query: str, embedding: np.ndarray):
+        """Cache the embedding of a query."""
+        with self._lock:
+            self._put(self._embeddings, normalize_query(query), embedding)
+
+    def get_results(self, game_name: str, query: str, content_types: Sequence[str], limit: int,
+                    search_mode: str = 'vector') -> Optional[List[Dict]]:
+        """Return a copy of the cached top-k results for a query, if any."""
+        with self._lock:
+            value = self._get(self._results, self._result_key(game_name, query, content_types, limit, search_mode))
+            if value is None:
+                self.result_misses += 1
+                return None
+            self.result_hits += 1
+            return [dict(result) for result in value]
+
+    def put_results(self, game_name: str, query: str, content_types: Sequence[str], limit: int, results: List[Dict],
+                    search_mode: str = 'vector'):
+        """Cache the top-k results for a query."""
+        with self._lock:
+            key = self._result_key(game_name, query, content_types, limit, search_mode)
+            self._put(self._results, key, [dict(result) for result in results])
+
+    def invalidate_game(self, game_name: str):
+        """Drop every cached result set of a game."""
+        game_key = game_name.lower()
+        with self._lock:
+            for key in [key for key in self._results if key[0] == game_key]:
+                del self._results[key]
+
+    def clear(self):
+        """Drop all cached entries."""
+        with self._lock:
+            self._embeddings.clear()
+            self._results.clear()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and hit rates for both caches."""
+        with self._lock:
+            embedding_total = self.embedding_hits + self.embedding_misses
+            result_total = self.result_hits + self.result_misses
+            return {
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'embedding_entries': len(self._embeddings),
+                'embedding_hits': self.embedding_hits,
+                'embedding_misses': self.embedding_misses,
+                'embedding_hit_rate': self.embedding_hits / embedding_total if embedding_total else 0.0,
+                'result_entries': len(self._results),
+                'result_hits': self.result_hits,
+                'result_misses': self.result_misses,
+                'result_hit_rate': self.result_hits / result_total if result_total else 0.0
+            }
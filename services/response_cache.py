@@ -0,0 +1,119 @@
+"""Per-game cache of chat answers, looked up by query embedding similarity"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+from .query_cache import normalize_query
+
+
+def _unit(embedding) -> np.ndarray:
+    """Flatten an embedding to a unit-length float32 vector."""
+    vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+    norm = np.linalg.norm(vector)
+    if not norm:
+        raise ValueError("Cannot cache a zero embedding")
+    return vector / norm
+
+
+class ResponseCache:
+    def __init__(self, threshold: float = 0.9, max_size: int = 128, ttl: float = 3600):
+        """
+        Initialize the response cache.
+
+        Answers are grouped by game, so a question only ever matches earlier
+        questions about the same game, and a game's answers can be dropped
+        together when its knowledge changes.
+
+        Args:
+            threshold: Minimum cosine similarity between two queries for a hit
+            max_size: Maximum number of answers kept per game
+            ttl: Seconds an answer stays valid (0 disables expiry)
+        """
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl = ttl
+        # game -> OrderedDict of normalized query -> (stored_at, unit embedding, answer)
+        self._games: Dict[str, OrderedDict] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.last_similarity = None
+
+    def _live_entries(self, game_key: str) -> Optional[OrderedDict]:
+        """A game's entries with expired ones dropped."""
+        entries = self._games.get(game_key)
+        if entries and self.ttl:
+            now = time.time()
+            for key in [key for key, (stored_at, _, _) in entries.items() if now - stored_at > self.ttl]:
+                del entries[key]
+        return entries
+
+    def get(self, game_name: str, embedding) -> Optional[str]:
+        """
+        Return the answer to the most similar earlier question about a game.
+
+        Args:
+            game_name: Detected game
+            embedding: Embedding of the new question
+
+        Returns:
+            The cached answer, or None if no question is similar enough
+        """
+        query = _unit(embedding)
+        with self._lock:
+            entries = self._live_entries(game_name.lower())
+            if not entries:
+                self.misses += 1
+                return None
+            keys = list(entries)
+            similarities = np.stack([entries[key][1] for key in keys]) @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.last_similarity = float(similarities[best])
+            entries.move_to_end(keys[best])
+            return entries[keys[best]][2]
+
+    def put(self, game_name: str, query: str, embedding, answer: str):
+        """Cache the answer to a question, evicting the game's least recently used answers."""
+        vector = _unit(embedding)
+        with self._lock:
+            entries = self._games.setdefault(game_name.lower(), OrderedDict())
+            key = normalize_query(query)
+            entries[key] = (time.time(), vector, answer)
+            entries.move_to_end(key)
+            while len(entries) > self.max_size:
+                entries.popitem(last=False)
+
+    def invalidate_game(self, game_name: str):
+        """Drop every cached answer of a game."""
+        with self._lock:
+            if self._games.pop(game_name.lower(), None):
+                self.invalidations += 1
+
+    def clear(self):
+        """Drop all cached answers."""
+        with self._lock:
+            self._games.clear()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Return hit/miss counters, hit rate and entries per game."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'threshold': self.threshold,
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'entries': {game: len(entries) for game, entries in self._games.items()},
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'invalidations': self.invalidations,
+                'last_similarity': self.last_similarity
+            }
@@ -0,0 +1,211 @@
+"""Parallel, rate-limited async page fetching for knowledge ingestion"""
+import asyncio
+import queue
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+from urllib.parse import urlparse
+
+import httpx
+
+T = TypeVar('T')
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = 1):
+        """
+        Token bucket limiting how often requests may start.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """Wait until a token is available and consume it."""
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class AsyncScraper:
+    def __init__(self, headers: Optional[Dict[str, str]] = None, timeout: float = 10.0,
+                 max_concurrency: int = 8, per_host_concurrency: int = 2,
+                 requests_per_second: float = 2.0, burst: int = 2):
+        """
+        Initialize the async scraper.
+
+        Args:
+            headers: Headers sent with every request
+            timeout: Per-request timeout in seconds
+            max_concurrency: Maximum number of requests in flight overall
+            per_host_concurrency: Maximum number of requests in flight per host
+            requests_per_second: Sustained request rate allowed per host
+            burst: Number of requests a host may receive back to back
+        """
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+
+    async def fetch(self, client: httpx.AsyncClient, url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """Fetch a single URL."""
+        return await client.get(url, headers=headers)
+
+    async def scrape(self, jobs: Sequence[Tuple[str, Callable[[str, httpx.Response], T]]],
+                     headers_for: Optional[Callable[[str], Dict[str, str]]] = None,
+                     max_pending: Optional[int] = None
+                     ) -> AsyncIterator[Tuple[int, Optional[T]]]:
+        """
+        Fetch URLs concurrently and parse each response in a worker thread.
+
+        Parsing of a page overlaps with the fetching of the others. Results are
+        yielded as ``(index, result)`` in completion order; failed fetches or
+        parses yield ``None``.
+
+        Args:
+            jobs: ``(url, parse)`` pairs; ``parse(url, response)`` runs off the event loop
+            headers_for: Optional callable returning extra request headers per URL
+            max_pending: Maximum number of jobs started but not yet consumed, so a
+                slow consumer pauses fetching (None starts every job at once)
+        """
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+        host_limits = {}
+        host_buckets = {}
+
+        async def run(index: int, url: str, parse, client: httpx.AsyncClient):
+            host = urlparse(url).netloc.lower()
+            if host not in host_limits:
+                host_limits[host] = asyncio.Semaphore(self.per_host_concurrency)
+                host_buckets[host] = TokenBucket(self.requests_per_second, self.burst)
+            try:
+                # Wait for the host before taking a global slot, so jobs queued
+                # behind a busy host do not hold capacity other hosts could use
+                async with host_limits[host]:
+                    await host_buckets[host].acquire()
+                    async with global_limit:
+                        extra_headers = headers_for(url) if headers_for else None
+                        response = await self.fetch(client, url, extra_headers)
+                return index, await asyncio.to_thread(parse, url, response)
+            except Exception as e:
+                print(f"Error scraping {url}: {e}")
+                return index, None
+
+        window = max_pending or max(len(jobs), 1)
+        async with httpx.AsyncClient(headers=self.headers, timeout=self.timeout, follow_redirects=True) as client:
+            remaining = iter(enumerate(jobs))
+            pending = set()
+            try:
+                while True:
+                    for index, (url, parse) in remaining:
+                        pending.add(asyncio.create_task(run(index, url, parse, client)))
+                        if len(pending) >= window:
+                            break
+                    if not pending:
+                        break
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+            finally:
+                for task in pending:
+                    task.cancel()
+
+    def scrape_all(self, jobs: Sequence[Tuple[str, Callable[[str, httpx.Response], T]]],
+                   headers_for: Optional[Callable[[str], Dict[str, str]]] = None) -> List[Optional[T]]:
+        """Blocking helper returning parse results in the order of ``jobs``."""
+        async def collect():
+            results = [None] * len(jobs)
+            async for index, result in self.scrape(jobs, headers_for):
+                results[index] = result
+            return results
+
+        return run_coroutine(collect())
+
+    def iter_scrape(self, jobs: Sequence[Tuple[str, Callable[[str, httpx.Response], T]]],
+                    headers_for: Optional[Callable[[str], Dict[str, str]]] = None,
+                    max_pending: int = 4) -> Iterator[Tuple[int, Optional[T]]]:
+        """
+        Blocking generator yielding ``(index, result)`` as pages complete.
+
+        The event loop runs on a background thread and hands results over
+        through a bounded queue; while the consumer is busy, at most
+        ``max_pending`` jobs are in flight or waiting to be consumed.
+        """
+        results = queue.Queue(maxsize=max_pending)
+        stop = threading.Event()
+        done = object()
+
+        async def produce():
+            async for item in self.scrape(jobs, headers_for, max_pending=max_pending):
+                while not stop.is_set():
+                    try:
+                        results.put_nowait(item)
+                        break
+                    except queue.Full:
+                        await asyncio.sleep(0.01)
+                if stop.is_set():
+                    return
+
+        def target():
+            try:
+                asyncio.run(produce())
+            except BaseException as e:
+                print(f"Error scraping pages: {e}")
+            finally:
+                while not stop.is_set():
+                    try:
+                        results.put(done, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+
+        thread = threading.Thread(target=target, name="scraper-loop", daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = results.get()
+                if item is done:
+                    break
+                yield item
+        finally:
+            stop.set()
+            thread.join()
+
+
+def run_coroutine(coro):
+    """Run a coroutine to completion, even when called from inside a running event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # Called from async code: run on a separate thread with its own loop
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = asyncio.run(coro)
+        except BaseException as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join()
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome.get('result')
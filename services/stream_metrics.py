@@ -0,0 +1,57 @@
+"""Time-to-first-token and total time of streamed chat responses"""
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+
+def _percentile(values, fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class StreamMetrics:
+    def __init__(self, window: int = 200):
+        """
+        Initialize timing counters over the most recent streams.
+
+        Args:
+            window: Number of recent streams the percentiles are computed over
+        """
+        self._ttft = deque(maxlen=window)
+        self._total = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.streams = 0
+        self.errors = 0
+
+    def record(self, ttft: Optional[float], total: float, error: bool = False):
+        """
+        Record one finished stream.
+
+        Args:
+            ttft: Seconds until the first chunk was sent, None if none was
+            total: Seconds until the stream ended
+            error: Whether the stream ended with an error
+        """
+        with self._lock:
+            self.streams += 1
+            self.errors += int(error)
+            if ttft is not None:
+                self._ttft.append(ttft)
+            self._total.append(total)
+
+    def snapshot(self) -> Dict:
+        """Stream counts plus last / p50 / p95 milliseconds of TTFT and total time."""
+        with self._lock:
+            stats = {'streams': self.streams, 'errors': self.errors}
+            for name, values in (('ttft_ms', list(self._ttft)), ('total_ms', list(self._total))):
+                stats[name] = {
+                    'last': round(values[-1] * 1000, 1) if values else None,
+                    'p50': round(_percentile(values, 0.5) * 1000, 1) if values else None,
+                    'p95': round(_percentile(values, 0.95) * 1000, 1) if values else None
+                }
+            return stats
+
+
+stream_metrics = StreamMetrics()
@@ -1,235 +1,626 @@
 import os
-import chromadb
-from chromadb.config import Settings
-from typing import List, Dict, Optional
-import uuid
-from .knowledge_manager import process_game_knowledge
-from sentence_transformers import SentenceTransformer
+import shutil
+import threading
+from typing import Callable, List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .knowledge_manager import iter_game_knowledge, list_source_urls
+from .embedding_engine import EmbeddingEngine, content_hash
+from .embedding_cache import EmbeddingCache
+from .query_cache import QueryCache
+from .ingest_pipeline import IngestPipeline
+from .chunker import TextChunker
+from .dense_index import DenseIndex, FlatIndex, QUANTIZATIONS
+from .bm25 import BM25Index, reciprocal_rank_fusion
+from .lazy import LazyObject, lazy_import
+from .vector_store import get_store
+
+# Heavy imports are deferred until the service is first built
+chromadb = lazy_import('chromadb')
+SentenceTransformer = lazy_import('sentence_transformers', 'SentenceTransformer')
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBEDDING_BATCH_SIZE = int(os.getenv('PIXLY_EMBEDDING_BATCH_SIZE', '32'))
+EMBEDDING_CACHE_ENABLED = os.getenv('PIXLY_EMBEDDING_CACHE', '1') != '0'
+# Store all content types of a game in one collection filtered by metadata
+UNIFIED_COLLECTIONS = os.getenv('PIXLY_UNIFIED_COLLECTIONS', '0') == '1'
+CONTENT_TYPES = ['wiki', 'youtube', 'forum']
+QUERY_CACHE_SIZE = int(os.getenv('PIXLY_QUERY_CACHE_SIZE', '256'))
+QUERY_CACHE_TTL = float(os.getenv('PIXLY_QUERY_CACHE_TTL', '300'))
+INGEST_QUEUE_SIZE = int(os.getenv('PIXLY_INGEST_QUEUE_SIZE', '8'))
+INGEST_BATCH_SIZE = int(os.getenv('PIXLY_INGEST_BATCH_SIZE', '64'))
+# Chunk budget in model tokens; defaults to the model's max_seq_length minus [CLS]/[SEP]
+CHUNK_MAX_TOKENS = int(os.getenv('PIXLY_CHUNK_MAX_TOKENS', '0'))
+CHUNK_OVERLAP_TOKENS = int(os.getenv('PIXLY_CHUNK_OVERLAP_TOKENS', '32'))
+DEFAULT_CHUNK_TOKENS = 254
+# Store new knowledge collections' vectors as 'int8' or 'float16' codes outside Chroma
+VECTOR_QUANTIZATION = os.getenv('PIXLY_VECTOR_QUANTIZATION', '')
+QUANTIZED_RERANK_FACTOR = int(os.getenv('PIXLY_QUANTIZED_RERANK_FACTOR', '4'))
+# Collections up to this size are searched in-process with NumPy instead of Chroma (0 disables)
+BRUTE_FORCE_MAX_VECTORS = int(os.getenv('PIXLY_BRUTE_FORCE_MAX_VECTORS', '10000'))
+# 'vector' (embeddings only), 'keyword' (BM25 only) or 'hybrid' (both, merged by reciprocal-rank fusion)
+SEARCH_MODES = ('vector', 'keyword', 'hybrid')
+DEFAULT_SEARCH_MODE = os.getenv('PIXLY_SEARCH_MODE', 'vector')
+RRF_K = int(os.getenv('PIXLY_RRF_K', '60'))
+# Candidates each retriever contributes to hybrid fusion, per requested result
+HYBRID_CANDIDATE_FACTOR = 4
+
+# Called with a game name whenever that game's stored knowledge changes
+_knowledge_listeners: List[Callable[[str], None]] = []
+
+def add_knowledge_listener(callback: Callable[[str], None]):
+    """Register a callback run with the game name after a game's knowledge is added, updated or deleted."""
+    _knowledge_listeners.append(callback)
+
 class VectorService:
-    def __init__(self, vector_db_dir: str = "vector_db"):
-        """Initialize vector service with Chroma and SentenceTransformer embeddings."""
+    def __init__(self, vector_db_dir: str = "vector_db", unified_collections: bool = UNIFIED_COLLECTIONS,
+                 quantization: str = VECTOR_QUANTIZATION, brute_force_max_vectors: int = BRUTE_FORCE_MAX_VECTORS):
+        """Initialize vector service with Chroma and SentenceTransformer embeddings.
+        
+        With unified_collections=True every game keeps one ``{game}_knowledge``
+        collection and content types are selected with a metadata ``where`` filter,
+        so a search is a single ANN query. Otherwise each content type has its own
+        collection and searches fan out to them concurrently.
+        
+        With quantization set to 'int8' or 'float16', newly created collections keep
+        documents and metadata in Chroma but their vectors in a DenseIndex, which
+        scans quantized codes and re-ranks the best candidates exactly. Existing
+        collections keep the mode they were created with.
+        
+        Float32 collections with at most brute_force_max_vectors chunks are copied
+        into a FlatIndex on first search and answered with one matrix-vector
+        product; larger ones are queried through Chroma's HNSW index.
+        """
+        if quantization and quantization not in QUANTIZATIONS:
+            print(f"Unknown vector quantization '{quantization}', storing float32 vectors")
+            quantization = ''
         self.vector_db_dir = vector_db_dir
+        self.unified_collections = unified_collections
+        self.quantization = quantization
+        self.dense_indexes = {}
+        self.brute_force_max_vectors = brute_force_max_vectors
+        self.flat_indexes = {}
+        self._flat_lock = threading.Lock()
+        self.keyword_index = None
+        self._keyword_synced = set()
         self.embedding_model = None
+        self.store = None
         self.chroma_client = None
         self.collections = {}
+        # Fans multi-collection searches out; threads start on first use
+        self._search_pool = ThreadPoolExecutor(max_workers=len(CONTENT_TYPES), thread_name_prefix="knowledge-search")
+        self.query_cache = QueryCache(max_size=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL)
+        self.ingest_runs = {}
+        self._chunker = None
         
         # Ensure vector_db directory exists
         os.makedirs(vector_db_dir, exist_ok=True)
         
+        # Initialize embedding engine with the persistent cache in front of the model
+        self._init_embedding_engine()
+        
         # Initialize Chroma client
         self._init_chroma_client()
         
+        # Initialize the BM25 keyword index kept next to the collections
+        self._init_keyword_index()
+        
         # Initialize embedding client
         self._init_embedding_model()
     
     def _init_chroma_client(self):
         """Initialize Chroma client."""
         try:
-            self.chroma_client = chromadb.PersistentClient(
-                path=self.vector_db_dir,
-                settings=Settings(
-                    anonymized_telemetry=False,
-                    allow_reset=True
-                )
-            )
+            self.store = get_store(self.vector_db_dir)
+            self.chroma_client = self.store.client
+            # Registry of every collection in the directory, shared with its other users
+            self.collections = self.store.collections
             print("Chroma client initialized successfully")
         except Exception as e:
             print(f"Error initializing Chroma client: {e}")
             self.chroma_client = None
     
+    def _init_keyword_index(self):
+        """Initialize the BM25 keyword index."""
+        try:
+            self.keyword_index = BM25Index(os.path.join(self.vector_db_dir, "bm25_index.db"))
+        except Exception as e:
+            print(f"Error initializing keyword index: {e}")
+            self.keyword_index = None
+    
+    def _init_embedding_engine(self):
+        """Initialize the embedding engine and its on-disk cache."""
+        store = None
+        if EMBEDDING_CACHE_ENABLED:
+            try:
+                store = EmbeddingCache(os.path.join(self.vector_db_dir, "embedding_cache"), EMBEDDING_MODEL_NAME)
+            except Exception as e:
+                print(f"Error initializing embedding cache: {e}")
+        self.embedding_engine = EmbeddingEngine(
+            EMBEDDING_MODEL_NAME,
+            batch_size=EMBEDDING_BATCH_SIZE,
+            store=store
+        )
+    
     def _init_embedding_model(self):
         """Initialize the sentence transformer embedder"""
         try:
             # api_key = os.getenv('MISTRAL_API_KEY')
-            self.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+            self.embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
             print("Embedding model initialized successfully")
         except Exception as e:
             print(f"Error initializing embedding model: {e}")
             self.embedding_model = None
     
-    def get_or_create_collection(self, game_name: str, content_type: str) -> Optional[chromadb.Collection]:
+    def collection_name(self, game_name: str, content_type: str) -> str:
+        """Name of the collection holding a game's content of the given type."""
+        if self.unified_collections:
+            return f"{game_name.lower()}_knowledge"
+        return f"{game_name.lower()}_{content_type.lower()}"
+    
+    def get_or_create_collection(self, game_name: str, content_type: str) -> Optional["chromadb.Collection"]:
         """Get or create a Chroma collection for a specific game and content type."""
         if not self.chroma_client:
             return None
         
-        collection_name = f"{game_name.lower()}_{content_type.lower()}"
+        collection_name = self.collection_name(game_name, content_type)
+        collection = self._get_existing_collection(collection_name)
+        if collection is not None:
+            return collection
         
         try:
-            # Try to get existing collection
-            collection = self.chroma_client.get_collection(collection_name)
-            self.collections[collection_name] = collection
-            return collection
-        except Exception:
-            # Collection doesn't exist, create it
-            try:
-                collection = self.chroma_client.create_collection(
-                    name=collection_name.lower(),
-                    metadata={"game": game_name, "content_type": content_type}
-                )
-                self.collections[collection_name] = collection
-                return collection
-            except Exception as e:
-                print(f"Error creating collection {collection_name}: {e}")
-                return None
+            metadata = {
+                "game": game_name,
+                "content_type": "all" if self.unified_collections else content_type
+            }
+            if self.quantization:
+                metadata["quantization"] = self.quantization
+            return self.store.get_or_create_collection(collection_name, metadata=metadata)
+        except Exception as e:
+            print(f"Error creating collection {collection_name}: {e}")
+            return None
     
-    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for a list of texts."""
+    def generate_embeddings(self, texts: List[str], persist: bool = False) -> np.ndarray:
+        """Generate float32 embeddings for a list of texts (empty array on failure).
+        
+        With persist=True the on-disk embedding cache is checked and filled, which
+        is what ingestion uses; one-off query embeddings stay in memory only.
+        """
         if not self.embedding_model:
-            return []
+            return np.empty((0, 0), dtype=np.float32)
         
         try:
-            embeddings = self.embedding_model.encode(texts)
-            return embeddings.tolist()
+            return self.embedding_engine.encode(self.embedding_model, texts, use_store=persist)
         except Exception as e:
             print(f"Error generating embeddings: {e}")
-            return []
+            return np.empty((0, 0), dtype=np.float32)
     
-    def chunk_text(self, text: str, max_length: int = 512) -> List[str]:
-        """Split text into chunks for better embedding."""
-        if not text:
-            return []
+    @property
+    def chunker(self) -> TextChunker:
+        """Chunker sized to the embedding model's token window, built on first use."""
+        if self._chunker is None:
+            tokenizer = getattr(self.embedding_model, 'tokenizer', None)
+            max_seq_length = getattr(self.embedding_model, 'max_seq_length', None)
+            max_tokens = max_seq_length - 2 if isinstance(max_seq_length, int) else DEFAULT_CHUNK_TOKENS
+            if CHUNK_MAX_TOKENS > 0:
+                max_tokens = min(max_tokens, CHUNK_MAX_TOKENS)
+            self._chunker = TextChunker(
+                # Offset mappings need a fast (Rust) tokenizer; otherwise tokens are approximated
+                tokenizer=tokenizer if getattr(tokenizer, 'is_fast', False) is True else None,
+                max_tokens=max_tokens,
+                overlap_tokens=CHUNK_OVERLAP_TOKENS
+            )
+        return self._chunker
+    
+    def chunk_text(self, text: str, max_tokens: Optional[int] = None) -> List[str]:
+        """Split text into chunks that fit the embedding model's token window.
+        
+        Paragraph and heading boundaries are kept where possible; see TextChunker.
+        """
+        if max_tokens is None:
+            return self.chunker.chunk(text)
+        chunker = TextChunker(self.chunker.tokenizer, max_tokens, self.chunker.overlap_tokens)
+        return chunker.chunk(text)
+    
+    def chunk_id(self, content_type: str, url: str, chunk: str) -> str:
+        """Deterministic, content-addressed id for a chunk of a source page."""
+        digest = content_hash(url + "\n" + chunk)
+        return f"{content_type}_{digest[:32]}"
+    
+    def _existing_ids_by_url(self, collection, content_type: str) -> Dict[str, set]:
+        """Map each source url of a content type to the chunk ids stored for it."""
+        existing = collection.get(where={'content_type': content_type}, include=['metadatas'])
+        ids_by_url = {}
+        for doc_id, metadata in zip(existing['ids'], existing['metadatas'] or []):
+            url = (metadata or {}).get('url', '')
+            ids_by_url.setdefault(url, set()).add(doc_id)
+        return ids_by_url
+    
+    def plan_entry(self, game_name: str, content_type: str, entry: Dict, existing_ids: set) -> Tuple[List[Dict], List[str], int]:
+        """Chunk one page and diff it against the chunk ids already stored for its url.
         
-        # Simple chunking by sentences
-        sentences = text.split('. ')
-        chunks = []
-        current_chunk = ""
+        Returns:
+            ``(records, stale_ids, unchanged)`` where records (id, document, metadata)
+            are the chunks that still need embedding, stale_ids the stored chunks that
+            disappeared from the page and unchanged the number of chunks left as is
+        """
+        # Chunk the content
+        content = entry.get('content', '')
+        if not content:
+            content = entry.get('description', '')
+        url = entry.get('url', '')
         
-        for sentence in sentences:
-            if len(current_chunk) + len(sentence) < max_length:
-                current_chunk += sentence + ". "
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = sentence + ". "
+        chunks = [chunk for chunk in self.chunk_text(content) if chunk.strip()]
+        page_ids = set()
+        records = []
+        unchanged = 0
         
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        for i, chunk in enumerate(chunks):
+            doc_id = self.chunk_id(content_type, url, chunk)
+            if doc_id in page_ids:
+                continue
+            page_ids.add(doc_id)
+            
+            if doc_id in existing_ids:
+                unchanged += 1
+                continue
+            
+            records.append({
+                'id': doc_id,
+                'document': chunk,
+                'metadata': {
+                    'game': game_name,
+                    'content_type': content_type,
+                    'url': url,
+                    'title': entry.get('title', ''),
+                    'description': entry.get('description', ''),
+                    'chunk_index': i,
+                    'total_chunks': len(chunks)
+                }
+            })
+        
+        return records, sorted(existing_ids - page_ids), unchanged
+    
+    def dense_index(self, collection) -> Optional[DenseIndex]:
+        """The quantized index holding a collection's vectors, or None if Chroma holds them."""
+        metadata = collection.metadata
+        quantization = metadata.get('quantization') if isinstance(metadata, dict) else None
+        if not quantization:
+            return None
+        index = self.dense_indexes.get(collection.name)
+        if index is None:
+            index = DenseIndex(os.path.join(self.vector_db_dir, "dense", collection.name),
+                               quantization, rerank_factor=QUANTIZED_RERANK_FACTOR)
+            self.dense_indexes[collection.name] = index
+        return index
+    
+    def flat_index(self, collection) -> Optional[FlatIndex]:
+        """In-process copy of a small float32 collection, or None if Chroma should answer its queries."""
+        # Built copies are read without the lock, so searches do not wait for writes
+        if collection.name in self.flat_indexes:
+            return self.flat_indexes.get(collection.name)
+        with self._flat_lock:
+            if collection.name in self.flat_indexes:
+                return self.flat_indexes[collection.name]
+            
+            index = None
+            if (self.brute_force_max_vectors > 0 and self.dense_index(collection) is None
+                    and self.store.count(collection.name) <= self.brute_force_max_vectors):
+                stored = collection.get(include=['embeddings', 'documents', 'metadatas'])
+                index = FlatIndex(os.path.join(self.vector_db_dir, "flat", collection.name))
+                index.load(stored['ids'], stored['embeddings'], stored['documents'], stored['metadatas'],
+                           [(metadata or {}).get('content_type', '') for metadata in stored['metadatas']])
+            self.flat_indexes[collection.name] = index
+            return index
+    
+    def _drop_flat_index(self, collection_name: str):
+        """Forget a collection's in-process copy and remove its vector file."""
+        self.flat_indexes.pop(collection_name, None)
+        shutil.rmtree(os.path.join(self.vector_db_dir, "flat", collection_name), ignore_errors=True)
+    
+    def upsert_chunks(self, game_name: str, collection, records: List[Dict], embeddings: np.ndarray):
+        """Store embedded chunk records in a collection, its in-process index and the keyword index."""
+        ids = [record['id'] for record in records]
+        documents = [record['document'] for record in records]
+        metadatas = [record['metadata'] for record in records]
+        labels = [metadata['content_type'] for metadata in metadatas]
         
-        return chunks
+        index = self.dense_index(collection)
+        if index is not None:
+            index.upsert(ids, embeddings, labels)
+            # Chroma requires an embedding per row; a 1-d placeholder keeps its HNSW index trivial
+            embeddings = [[0.0]] * len(records)
+        # Chroma and the in-process copy change together under the lock, so a copy
+        # a search builds meanwhile either already holds these rows or receives them
+        with self._flat_lock:
+            collection.upsert(
+                documents=documents,
+                metadatas=metadatas,
+                ids=ids,
+                embeddings=embeddings
+            )
+            flat = self.flat_indexes.get(collection.name) if index is None else None
+            if flat is not None:
+                flat.upsert(ids, embeddings, documents, metadatas, labels)
+                if flat.count() > self.brute_force_max_vectors:
+                    # Grew past the brute-force size: later searches go to Chroma
+                    self._drop_flat_index(collection.name)
+                    self.flat_indexes[collection.name] = None
+        self.store.mark_written(collection.name)
+        if self.keyword_index is not None:
+            self.keyword_index.add(game_name, list(zip(ids, documents, labels)))
+    
+    def delete_chunks(self, game_name: str, collection, ids: List[str]):
+        """Delete chunks from a collection, its in-process index and the keyword index."""
+        index = self.dense_index(collection)
+        if index is not None:
+            index.delete(ids)
+        # Like upsert_chunks, so a copy being built cannot keep the deleted rows
+        with self._flat_lock:
+            collection.delete(ids=ids)
+            flat = self.flat_indexes.get(collection.name) if index is None else None
+            if flat is not None:
+                flat.delete(ids)
+        self.store.mark_written(collection.name)
+        if self.keyword_index is not None:
+            self.keyword_index.remove(game_name, ids)
+    
+    def _game_collections(self, game_name: str) -> List:
+        """Existing collections holding a game's knowledge."""
+        names = {self.collection_name(game_name, content_type) for content_type in CONTENT_TYPES}
+        collections = [self._get_existing_collection(name) for name in sorted(names)]
+        return [collection for collection in collections if collection is not None]
     
-    def add_game_knowledge(self, game_name: str) -> bool:
-        """Add all knowledge for a game to the vector database."""
+    def _sync_keyword_index(self, game_name: str):
+        """Index a game's stored chunks once if they predate the keyword index."""
+        game_key = game_name.lower()
+        if self.keyword_index is None or game_key in self._keyword_synced:
+            return
+        if self.keyword_index.count(game_name) == 0:
+            for collection in self._game_collections(game_name):
+                # Chunks without a stored content type take the one their collection is named after
+                fallback = '' if self.unified_collections else collection.name.rsplit('_', 1)[-1]
+                stored = collection.get(include=['documents', 'metadatas'])
+                self.keyword_index.add(game_name, [
+                    (doc_id, document, (metadata or {}).get('content_type', fallback))
+                    for doc_id, document, metadata in zip(stored['ids'], stored['documents'], stored['metadatas'])
+                ])
+        self._keyword_synced.add(game_key)
+    
+    def add_game_knowledge(self, game_name: str, on_progress: Optional[Callable[[str, Dict], None]] = None) -> bool:
+        """Add all knowledge for a game to the vector database.
+        
+        Pages stream through a bounded scrape -> chunk -> embed -> upsert pipeline,
+        so vectors land while later pages are still downloading. Re-running this is
+        idempotent: only chunks of changed pages are embedded and upserted, and
+        chunks that disappeared from a page, or whose page is no longer listed
+        in the game's CSV, are deleted.
+        """
         if not self.chroma_client or not self.embedding_model:
             print("Chroma client or embedding model not initialized")
             return False
         
         try:
-            # Process knowledge from CSV
-            knowledge = process_game_knowledge(game_name)
-            
-            # Process each content type
-            for content_type, entries in knowledge.items():
-                if not entries:
-                    continue
-                
-                collection = self.get_or_create_collection(game_name, content_type)
-                if not collection:
-                    continue
-                
-                # Prepare data for Chroma
-                documents = []
-                metadatas = []
-                ids = []
-                
-                for entry in entries:
-                    # Chunk the content
-                    content = entry.get('content', '')
-                    if not content:
-                        content = entry.get('description', '')
-                    
-                    chunks = self.chunk_text(content)
-                    
-                    for i, chunk in enumerate(chunks):
-                        if not chunk.strip():
-                            continue
-                        
-                        doc_id = f"{game_name}_{content_type}_{uuid.uuid4().hex[:8]}_{i}"
-                        documents.append(chunk)
-                        metadatas.append({
-                            'game': game_name,
-                            'content_type': content_type,
-                            'url': entry.get('url', ''),
-                            'title': entry.get('title', ''),
-                            'description': entry.get('description', ''),
-                            'chunk_index': i,
-                            'total_chunks': len(chunks)
-                        })
-                        ids.append(doc_id)
-                
-                if documents:
-                    # Generate embeddings
-                    embeddings = self.generate_embeddings(documents)
-                    
-                    if embeddings:
-                        # Add to collection
-                        collection.add(
-                            documents=documents,
-                            metadatas=metadatas,
-                            ids=ids,
-                            embeddings=embeddings
-                        )
-                        print(f"Added {len(documents)} chunks for {game_name} {content_type}")
-                    else:
-                        print(f"Failed to generate embeddings for {game_name} {content_type}")
+            self._sync_keyword_index(game_name)
+            pipeline = IngestPipeline(self, game_name, queue_size=INGEST_QUEUE_SIZE,
+                                      batch_size=INGEST_BATCH_SIZE, on_progress=on_progress)
+            self.ingest_runs[game_name.lower()] = pipeline
+            result = pipeline.run(iter_game_knowledge(game_name), listed_urls=list_source_urls(game_name))
             
-            return True
+            stages = result['stages']
+            print(f"Synced {game_name}: {stages['upsert']['chunks']} added, "
+                  f"{stages['upsert']['deleted']} removed, {stages['chunk']['unchanged']} unchanged")
+            return result['error'] is None
             
         except Exception as e:
             print(f"Error adding game knowledge for {game_name}: {e}")
             return False
     
+    def get_ingest_progress(self, game_name: str) -> Optional[Dict]:
+        """Per-stage progress of the latest ingestion run of a game, if any."""
+        pipeline = self.ingest_runs.get(game_name.lower())
+        return pipeline.snapshot() if pipeline else None
+    
+    def _get_existing_collection(self, collection_name: str):
+        """Return a collection handle from the registry, or None if it does not exist."""
+        return self.collections.get(collection_name)
+    
+    def _query_dense_index(self, index: DenseIndex, collection, query_embedding, limit: int,
+                           content_types: Optional[List[str]]) -> Dict:
+        """Search a quantized index and fetch the hits' documents from Chroma, shaped like a query result."""
+        hits = index.search(query_embedding, limit, labels=content_types)
+        if not hits:
+            return {'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
+        stored = collection.get(ids=[doc_id for doc_id, _ in hits], include=['documents', 'metadatas'])
+        rows = {doc_id: (doc, metadata)
+                for doc_id, doc, metadata in zip(stored['ids'], stored['documents'], stored['metadatas'])}
+        hits = [(doc_id, distance) for doc_id, distance in hits if doc_id in rows]
+        return {
+            'documents': [[rows[doc_id][0] for doc_id, _ in hits]],
+            'metadatas': [[rows[doc_id][1] for doc_id, _ in hits]],
+            'distances': [[distance for _, distance in hits]]
+        }
+    
+    def _query_collection(self, collection, query_embedding, limit: int, content_types: Optional[List[str]] = None,
+                          content_type: Optional[str] = None) -> List[Dict]:
+        """Run one ANN query (optionally filtered by content type) and flatten the results."""
+        index = self.dense_index(collection)
+        flat = self.flat_index(collection) if index is None else None
+        if index is not None:
+            results = self._query_dense_index(index, collection, query_embedding, limit, content_types)
+        elif flat is not None:
+            hits = flat.search(query_embedding, limit, labels=content_types)
+            results = {
+                'documents': [[document for _, _, document, _ in hits]],
+                'metadatas': [[metadata for _, _, _, metadata in hits]],
+                'distances': [[distance for _, distance, _, _ in hits]]
+            }
+        else:
+            results = collection.query(
+                query_embeddings=query_embedding,
+                n_results=limit,
+                where={'content_type': {'$in': list(content_types)}} if content_types is not None else None,
+                include=['documents', 'metadatas', 'distances']
+            )
+        
+        hits = []
+        if results['documents'] and results['documents'][0]:
+            for i, doc in enumerate(results['documents'][0]):
+                metadata = results['metadatas'][0][i]
+                hits.append({
+                    'content': doc,
+                    'metadata': metadata,
+                    'distance': results['distances'][0][i],
+                    'content_type': content_type or (metadata or {}).get('content_type', 'unknown')
+                })
+        return hits
+    
     def search_knowledge(self, game_name: str, query: str, content_types: List[str] = None, 
-                        limit: int = 5) -> List[Dict]:
-        """Search knowledge base for relevant information."""
+                        limit: int = 5, search_mode: Optional[str] = None) -> List[Dict]:
+        """Search knowledge base for relevant information.
+        
+        search_mode picks the retriever: 'vector' (embedding similarity),
+        'keyword' (BM25 over exact terms) or 'hybrid' (both, merged with
+        reciprocal-rank fusion). Defaults to PIXLY_SEARCH_MODE. Keyword and
+        hybrid hits carry a 'score' (higher is better); keyword-only hits
+        have no 'distance'.
+        """
         if not self.chroma_client or not self.embedding_model:
             return []
         
         if content_types is None:
-            content_types = ['wiki', 'youtube', 'forum']
+            content_types = CONTENT_TYPES
+        search_mode = search_mode or DEFAULT_SEARCH_MODE
+        if search_mode not in SEARCH_MODES:
+            print(f"Unknown search mode '{search_mode}', using vector search")
+            search_mode = 'vector'
+        
+        cached = self.query_cache.get_results(game_name, query, content_types, limit, search_mode)
+        if cached is not None:
+            return cached
         
         try:
-            # Generate query embedding
-            query_embedding = self.generate_embeddings([query])
-            if not query_embedding:
-                return []
-            
-            all_results = []
-            
-            # Search each content type
-            for content_type in content_types:
-                collection_name = f"{game_name.lower()}_{content_type.lower()}"
-                
-                if collection_name in self.collections:
-                    collection = self.collections[collection_name]
-                else:
-                    collection = self.chroma_client.get_collection(collection_name)
-                    self.collections[collection_name] = collection
-                
-                # Search collection
-                results = collection.query(
-                    query_embeddings=query_embedding,
-                    n_results=limit,
-                    include=['documents', 'metadatas', 'distances']
-                )
-                
-                # Process results
-                if results['documents'] and results['documents'][0]:
-                    for i, doc in enumerate(results['documents'][0]):
-                        all_results.append({
-                            'content': doc,
-                            'metadata': results['metadatas'][0][i],
-                            'distance': results['distances'][0][i],
-                            'content_type': content_type
-                        })
-            
-            # Sort by distance (lower is better)
-            all_results.sort(key=lambda x: x['distance'])
-            
-            return all_results[:limit]
-            
+            if search_mode == 'vector':
+                results = self._search_collections(game_name, query, content_types, limit)
+            elif search_mode == 'keyword':
+                results = self._search_keywords(game_name, query, content_types, limit)
+            else:
+                results = self._search_hybrid(game_name, query, content_types, limit)
         except Exception as e:
             print(f"Error searching knowledge for {game_name}: {e}")
             return []
+        
+        self.query_cache.put_results(game_name, query, content_types, limit, results, search_mode)
+        return results
+    
+    def _search_keywords(self, game_name: str, query: str, content_types: List[str], limit: int) -> List[Dict]:
+        """Rank chunks with BM25 and fetch their documents from Chroma."""
+        if self.keyword_index is None:
+            return []
+        self._sync_keyword_index(game_name)
+        ranked = self.keyword_index.search(game_name, query, limit, labels=content_types)
+        if not ranked:
+            return []
+        
+        # Each chunk was indexed with its content type, which names the collection holding it
+        labels = self.keyword_index.labels(game_name, [doc_id for doc_id, _ in ranked])
+        ids_by_collection = {}
+        for doc_id, _ in ranked:
+            name = self.collection_name(game_name, labels.get(doc_id, ''))
+            ids_by_collection.setdefault(name, []).append(doc_id)
+        rows = {}
+        for name, ids in ids_by_collection.items():
+            collection = self._get_existing_collection(name)
+            if collection is None:
+                continue
+            stored = collection.get(ids=ids, include=['documents', 'metadatas'])
+            for doc_id, document, metadata in zip(stored['ids'], stored['documents'], stored['metadatas']):
+                rows[doc_id] = (document, metadata)
+        
+        hits = []
+        for doc_id, score in ranked:
+            if doc_id in rows:
+                document, metadata = rows[doc_id]
+                hits.append({
+                    'content': document,
+                    'metadata': metadata,
+                    'distance': None,
+                    'score': score,
+                    'content_type': (metadata or {}).get('content_type', labels.get(doc_id, ''))
+                })
+        return hits
+    
+    def _search_hybrid(self, game_name: str, query: str, content_types: List[str], limit: int) -> List[Dict]:
+        """Run vector and BM25 retrieval and merge them with reciprocal-rank fusion."""
+        candidates = limit * HYBRID_CANDIDATE_FACTOR
+        vector_hits = self._search_collections(game_name, query, content_types, candidates)
+        keyword_hits = self._search_keywords(game_name, query, content_types, candidates)
+        
+        hits_by_id = {}
+        rankings = []
+        for hits in (vector_hits, keyword_hits):
+            ranking = []
+            for hit in hits:
+                doc_id = self.chunk_id(hit['content_type'], (hit['metadata'] or {}).get('url', ''), hit['content'])
+                # Prefer the vector hit, which carries the distance
+                hits_by_id.setdefault(doc_id, hit)
+                ranking.append(doc_id)
+            rankings.append(ranking)
+        
+        results = []
+        for doc_id, score in reciprocal_rank_fusion(rankings, k=RRF_K)[:limit]:
+            hit = dict(hits_by_id[doc_id])
+            hit['score'] = score
+            results.append(hit)
+        return results
+    
+    def embed_query(self, query: str) -> Optional[np.ndarray]:
+        """Embed a query as a (1, dim) array, reusing cached embeddings; None if embedding fails."""
+        query_embedding = self.query_cache.get_embedding(query)
+        if query_embedding is None:
+            query_embedding = self.generate_embeddings([query])
+            if not len(query_embedding):
+                return None
+            self.query_cache.put_embedding(query, query_embedding)
+        return query_embedding
+    
+    def _search_collections(self, game_name: str, query: str, content_types: List[str], limit: int) -> List[Dict]:
+        """Embed the query (reusing cached embeddings) and run the ANN search."""
+        query_embedding = self.embed_query(query)
+        if query_embedding is None:
+            return []
+        
+        if self.unified_collections:
+            # One ANN query over the game's collection, filtered by content type
+            collection = self._get_existing_collection(self.collection_name(game_name, ''))
+            if collection is None:
+                return []
+            return self._query_collection(collection, query_embedding, limit, content_types=list(content_types))
+        
+        # Search each content type's collection concurrently
+        targets = []
+        for content_type in content_types:
+            collection = self._get_existing_collection(self.collection_name(game_name, content_type))
+            if collection is not None:
+                targets.append((content_type, collection))
+        
+        if not targets:
+            return []
+        if len(targets) == 1:
+            content_type, collection = targets[0]
+            all_results = self._query_collection(collection, query_embedding, limit, content_type=content_type)
+        else:
+            futures = [
+                self._search_pool.submit(self._query_collection, collection, query_embedding, limit,
+                                         None, content_type)
+                for content_type, collection in targets
+            ]
+            all_results = [hit for future in futures for hit in future.result()]
+        
+        # Sort by distance (lower is better)
+        all_results.sort(key=lambda x: x['distance'])
+        
+        return all_results[:limit]
     
     def get_game_stats(self, game_name: str) -> Dict[str, int]:
         """Get statistics for a game's knowledge base."""
@@ -237,14 +628,12 @@ class VectorService:
             return {}
         
         stats = {}
-        content_types = ['wiki', 'youtube', 'forum']
         
-        for content_type in content_types:
-            collection_name = f"{game_name}_{content_type}"
+        for content_type in CONTENT_TYPES:
+            collection_name = self.collection_name(game_name, content_type)
+            where = {'content_type': content_type} if self.unified_collections else None
             try:
-                collection = self.chroma_client.get_collection(collection_name)
-                count = collection.count()
-                stats[content_type] = count
+                stats[content_type] = self.store.count(collection_name, where)
             except Exception:
                 stats[content_type] = 0
         
@@ -256,32 +645,45 @@ class VectorService:
             return False
         
         try:
-            content_types = ['wiki', 'youtube', 'forum']
-            for content_type in content_types:
-                collection_name = f"{game_name}_{content_type}"
-                try:
-                    self.chroma_client.delete_collection(collection_name)
-                    if collection_name in self.collections:
-                        del self.collections[collection_name]
-                except Exception:
-                    pass  # Collection might not exist
+            collection_names = {self.collection_name(game_name, content_type) for content_type in CONTENT_TYPES}
+            for collection_name in sorted(collection_names):
+                self.store.delete_collection(collection_name)
+                self.dense_indexes.pop(collection_name, None)
+                shutil.rmtree(os.path.join(self.vector_db_dir, "dense", collection_name), ignore_errors=True)
+                with self._flat_lock:
+                    self._drop_flat_index(collection_name)
             
+            self.knowledge_changed(game_name)
+            if self.keyword_index is not None:
+                self.keyword_index.drop_game(game_name)
+            self._keyword_synced.discard(game_name.lower())
             return True
         except Exception as e:
             print(f"Error deleting game knowledge for {game_name}: {e}")
             return False
     
+    def knowledge_changed(self, game_name: str):
+        """Drop cached search results of a game and notify the knowledge listeners."""
+        self.query_cache.invalidate_game(game_name)
+        for callback in _knowledge_listeners:
+            try:
+                callback(game_name)
+            except Exception as e:
+                print(f"Error notifying knowledge listener for {game_name}: {e}")
+    
+    def get_cache_stats(self) -> Dict[str, float]:
+        """Get hit/miss counters of the query cache."""
+        return self.query_cache.get_stats()
+    
     def list_available_games(self) -> List[str]:
         """List all games with knowledge in the vector database."""
         if not self.chroma_client:
             return []
         
         try:
-            collections = self.chroma_client.list_collections()
             games = set()
             
-            for collection in collections:
-                name = collection.name
+            for name in list(self.collections):
                 if '_' in name:
                     game_name = name.split('_')[0]
                     games.add(game_name)
@@ -291,7 +693,10 @@ class VectorService:
             print(f"Error listing available games: {e}")
             return []
 
-# Global instance
-vector_service = VectorService()
-def search_knowledge(game_name: str, query: str, content_types: List[str] = None, limit: int = 5) -> List[Dict]:
-    return vector_service.search_knowledge(game_name, query, content_types, limit)
\ No newline at end of file
+# Global instance, built on first use or by the startup warm-up
+vector_service = LazyObject('vector_service', VectorService)
+def search_knowledge(game_name: str, query: str, content_types: List[str] = None, limit: int = 5,
+                     search_mode: Optional[str] = None) -> List[Dict]:
+    return vector_service.search_knowledge(game_name, query, content_types, limit, search_mode)
+def embed_query(query: str) -> Optional[np.ndarray]:
+    return vector_service.embed_query(query)
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""Process-wide registry of Chroma clients and their collection handles"""
+import os
+import threading
+from typing import Dict, Optional, Tuple
+from .lazy import lazy_import
+
+chromadb = lazy_import('chromadb')
+Settings = lazy_import('chromadb.config', 'Settings')
+
+
+class VectorStore:
+    def __init__(self, path: str):
+        """
+        Open the Chroma database in a directory.
+
+        Use get_store() instead of creating stores directly: Chroma refuses a
+        second client on the same directory with different settings, and every
+        user of the directory should share one client and one set of handles.
+
+        Args:
+            path: Directory of the persistent Chroma database
+        """
+        self.path = path
+        self.client = chromadb.PersistentClient(
+            path=path,
+            settings=Settings(
+                anonymized_telemetry=False,
+                allow_reset=True
+            )
+        )
+        # Registry of every collection in the directory, by name. Loaded once
+        # here and kept in sync by create/delete, so lookups and misses need
+        # no round-trip to Chroma.
+        self.collections: Dict[str, "chromadb.Collection"] = {}
+        # Cached document counts by (name, where filter), dropped on writes
+        self.counts: Dict[Tuple[str, Tuple], int] = {}
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        """Reload the registry from the database (e.g. after another process changed it)."""
+        with self._lock:
+            collections = {}
+            for collection in self.client.list_collections():
+                # Chroma 0.6 lists names instead of collections
+                if isinstance(collection, str):
+                    collection = self.client.get_collection(name=collection)
+                collections[collection.name] = collection
+            self.collections.clear()
+            self.collections.update(collections)
+            self.counts.clear()
+
+    def get_collection(self, name: str) -> Optional["chromadb.Collection"]:
+        """Return the handle of a collection, or None if it does not exist."""
+        return self.collections.get(name)
+
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict] = None) -> "chromadb.Collection":
+        """Return the shared handle of a collection, creating the collection if needed."""
+        collection = self.collections.get(name)
+        if collection is not None:
+            return collection
+        with self._lock:
+            collection = self.collections.get(name)
+            if collection is None:
+                collection = self.client.get_or_create_collection(name=name, metadata=metadata)
+                self.collections[name] = collection
+            return collection
+
+    def delete_collection(self, name: str) -> bool:
+        """
+        Delete a collection and forget its handle.
+
+        Returns:
+            False if the collection did not exist
+        """
+        with self._lock:
+            if self.collections.pop(name, None) is None:
+                return False
+            self._forget_counts(name)
+            self.client.delete_collection(name=name)
+            return True
+
+    def count(self, name: str, where: Optional[Dict] = None) -> int:
+        """
+        Number of documents in a collection (optionally matching a metadata
+        filter), cached until the collection is next written.
+        """
+        collection = self.collections.get(name)
+        if collection is None:
+            return 0
+        key = (name, tuple(sorted((where or {}).items())))
+        count = self.counts.get(key)
+        if count is None:
+            if where:
+                count = len(collection.get(where=where, include=[])['ids'])
+            else:
+                count = collection.count()
+            self.counts[key] = count
+        return count
+
+    def mark_written(self, name: str):
+        """Drop the cached counts of a collection after adding or deleting documents."""
+        with self._lock:
+            self._forget_counts(name)
+
+    def _forget_counts(self, name: str):
+        for key in [key for key in self.counts if key[0] == name]:
+            del self.counts[key]
+
+
+_stores: Dict[str, VectorStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path: str = "vector_db") -> VectorStore:
+    """Return the process-wide store of a directory, opening it on first use."""
+    key = os.path.realpath(path)
+    store = _stores.get(key)
+    if store is not None:
+        return store
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = VectorStore(path)
+            _stores[key] = store
+        return store
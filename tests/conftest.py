@@ -12,8 +12,9 @@ import shutil
 import sqlite3
 import pytest
 import asyncio
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 from typing import Dict, List, Any
+import numpy as np
 import pandas as pd
 from fastapi.testclient import TestClient
 from PIL import Image
@@ -230,6 +231,9 @@ def mock_chroma_collection():
     """Mock ChromaDB collection for testing."""
     collection = Mock()
     collection.add = Mock()
+    collection.upsert = Mock()
+    collection.delete = Mock()
+    collection.get = Mock(return_value={'ids': [], 'metadatas': []})
     collection.query = Mock(return_value={
         'documents': [['Test document content']],
         'metadatas': [[{'title': 'Test', 'content_type': 'wiki'}]],
@@ -257,10 +261,11 @@ def mock_chroma_client(mock_chroma_collection):
 def mock_embedding_model():
     """Mock sentence transformer model for testing."""
     model = Mock()
-    # Return an object with a tolist() method to match production behavior
-    encode_result = Mock()
-    encode_result.tolist.return_value = [[0.1, 0.2, 0.3, 0.4, 0.5]]
-    model.encode = Mock(return_value=encode_result)
+    model.tokenizer = None
+    # Return one float32 row per input text to match production behavior
+    model.encode = Mock(side_effect=lambda texts, **kwargs: np.tile(
+        np.array([0.1, 0.2, 0.3, 0.4, 0.5], dtype=np.float32), (len(texts), 1)
+    ))
     return model
 
 
@@ -282,6 +287,58 @@ def mock_requests_session():
     return session
 
 
+@pytest.fixture
+def stub_scraper_fetch():
+    """Return a helper that stubs a KnowledgeManager's async page fetches."""
+    def apply(manager, content=b'<html><body><h1>Test Content</h1></body></html>'):
+        response = Mock()
+        response.status_code = 200
+        response.headers = {}
+        response.content = content
+        response.raise_for_status = Mock()
+        manager.scraper.fetch = AsyncMock(return_value=response)
+        # No politeness delay needed against a stub
+        manager.scraper.requests_per_second = 10000
+        manager.scraper.burst = 10000
+        return manager.scraper.fetch
+    return apply
+
+
+@pytest.fixture
+def chat_history():
+    """Chat history manager stand-in without earlier exchanges."""
+    manager = Mock()
+    manager.get_history_context.return_value = ""
+    manager.get_recent_history.return_value = []
+    return manager
+
+
+@pytest.fixture
+def chat_model():
+    """Offline fake model with a fixed reply; generate_content records its calls."""
+    from services.llm_provider import FakeProvider
+    provider = FakeProvider(reply="Parry Margit's delayed swings and punish with a jump attack.",
+                            latency=0, tokens_per_second=0, tokens_per_chunk=2)
+    with patch.object(provider, 'generate_content', wraps=provider.generate_content):
+        yield provider
+
+
+@pytest.fixture
+def chat_client(chat_history, chat_model):
+    """Chat router with ready services, the fake model, fresh stream metrics and no game detected."""
+    from fastapi import FastAPI
+    from routers import chat
+    from services.stream_metrics import StreamMetrics
+    chat_app = FastAPI()
+    chat_app.include_router(chat.router)
+    with patch('routers.health.wait_ready', AsyncMock(return_value=True)), \
+         patch('routers.chat.chat_history_manager', chat_history), \
+         patch('routers.chat.stream_metrics', StreamMetrics()), \
+         patch('services.chatbot.model', chat_model), \
+         patch('services.chatbot.detect_current_game', return_value=None):
+        yield TestClient(chat_app)
+
+
 @pytest.fixture
 def test_client():
     """Create a test client for FastAPI app."""
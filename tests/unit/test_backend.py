@@ -355,7 +355,7 @@ class TestBackendAPI:
             assert data["game_name"] == "minecraft"
             assert "results" in data
             assert len(data["results"]) == 2
-            mock_search.assert_called_once_with(game_name="minecraft", query="How do I craft items?", content_types=None, limit=5)
+            mock_search.assert_called_once_with(game_name="minecraft", query="How do I craft items?", content_types=None, limit=5, search_mode=None)
     
     @pytest.mark.unit
     @pytest.mark.api
@@ -372,7 +372,23 @@ class TestBackendAPI:
             data = response.json()
             assert data["status"] == "ok"
             assert "results" in data
-            mock_search.assert_called_once_with(game_name="minecraft", query="How do I craft items?", content_types=["wiki", "forum"], limit=3)
+            mock_search.assert_called_once_with(game_name="minecraft", query="How do I craft items?", content_types=["wiki", "forum"], limit=3, search_mode=None)
+    
+    @pytest.mark.unit
+    @pytest.mark.api
+    def test_knowledge_search_endpoint_with_search_mode(self, client, mock_vector_search_results):
+        """Test search knowledge endpoint passes the search mode through and validates it."""
+        with patch('services.vector_service.search_knowledge', return_value=mock_vector_search_results) as mock_search:
+            response = client.post("/games/minecraft/knowledge/search", json={
+                "query": "Malenia",
+                "search_mode": "hybrid"
+            })
+            
+            assert response.status_code == 200
+            mock_search.assert_called_once_with(game_name="minecraft", query="Malenia", content_types=None, limit=5, search_mode="hybrid")
+        
+        response = client.post("/games/minecraft/knowledge/search", json={"query": "Malenia", "search_mode": "fuzzy"})
+        assert response.status_code == 422
     
     @pytest.mark.unit
     @pytest.mark.api
@@ -0,0 +1,127 @@
+"""
+Test suite for the BM25 keyword index and reciprocal-rank fusion.
+
+This module tests tokenization, BM25 ranking, incremental updates,
+label filters and the fusion of ranked lists.
+"""
+
+import pytest
+import os
+import sys
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from services.bm25 import BM25Index, reciprocal_rank_fusion, tokenize
+except ImportError as e:
+    pytest.skip(f"BM25 module not available: {e}", allow_module_level=True)
+
+
+DOCS = [
+    ('wiki_1', "Malenia, Blade of Miquella is an optional boss in the Haligtree.", 'wiki'),
+    ('wiki_2', "The Haligtree is reached through the Consecrated Snowfield.", 'wiki'),
+    ('forum_1', "How do I beat Malenia? Her Waterfowl Dance keeps killing me.", 'forum'),
+    ('forum_2', "Best strength build for the early game.", 'forum'),
+]
+
+
+@pytest.fixture
+def index(temp_dir):
+    index = BM25Index(os.path.join(temp_dir, 'bm25.db'))
+    index.add('Elden Ring', DOCS)
+    return index
+
+
+class TestTokenize:
+    """Test cases for query and document tokenization."""
+
+    @pytest.mark.unit
+    def test_lowercases_and_drops_stopwords(self):
+        """Test tokens are lowercase words without stopwords or punctuation."""
+        assert tokenize("How do I beat Malenia?") == ['beat', 'malenia']
+        assert tokenize("## Boss: Margit's HP") == ['boss', 'margit', 's', 'hp']
+        assert tokenize("") == []
+
+
+class TestSearch:
+    """Test cases for BM25 ranking."""
+
+    @pytest.mark.unit
+    def test_exact_term_ranks_first(self, index):
+        """Test documents containing rare query terms rank highest."""
+        results = index.search('elden ring', 'Malenia waterfowl', 5)
+
+        assert [doc_id for doc_id, _ in results] == ['forum_1', 'wiki_1']
+        assert results[0][1] > results[1][1] > 0
+
+    @pytest.mark.unit
+    def test_no_matching_terms(self, index):
+        """Test queries sharing no term with any document return nothing."""
+        assert index.search('Elden Ring', 'the of and', 5) == []
+        assert index.search('Elden Ring', 'rune arc', 5) == []
+        assert index.search('Other Game', 'Malenia', 5) == []
+
+    @pytest.mark.unit
+    def test_label_filter(self, index):
+        """Test only documents with an allowed label are ranked."""
+        results = index.search('Elden Ring', 'Malenia', 5, labels=['wiki'])
+        assert [doc_id for doc_id, _ in results] == ['wiki_1']
+
+    @pytest.mark.unit
+    def test_labels(self, index):
+        """Test stored labels are looked up by document id."""
+        assert index.labels('Elden Ring', ['forum_1', 'wiki_2', 'missing']) == {'forum_1': 'forum', 'wiki_2': 'wiki'}
+        assert index.labels('Other Game', ['forum_1']) == {}
+
+    @pytest.mark.unit
+    def test_limit(self, index):
+        """Test at most k results are returned."""
+        assert len(index.search('Elden Ring', 'Malenia Haligtree', 1)) == 1
+
+
+class TestIncrementalUpdates:
+    """Test cases for adding, replacing and removing documents."""
+
+    @pytest.mark.unit
+    def test_reindexing_replaces_postings(self, index):
+        """Test re-adding a document drops its old terms."""
+        index.add('Elden Ring', [('forum_2', "Malenia cheese strategy.", 'forum')])
+
+        assert index.count('Elden Ring') == 4
+        assert index.search('Elden Ring', 'strength', 5) == []
+        assert 'forum_2' in [doc_id for doc_id, _ in index.search('Elden Ring', 'cheese', 5)]
+
+    @pytest.mark.unit
+    def test_remove_and_drop_game(self, index):
+        """Test removed documents and dropped games are no longer found."""
+        index.remove('Elden Ring', ['forum_1'])
+        assert [doc_id for doc_id, _ in index.search('Elden Ring', 'Malenia', 5)] == ['wiki_1']
+
+        index.drop_game('elden ring')
+        assert index.count('Elden Ring') == 0
+
+    @pytest.mark.unit
+    def test_index_persists(self, index, temp_dir):
+        """Test a reopened index returns the same ranking."""
+        reopened = BM25Index(os.path.join(temp_dir, 'bm25.db'))
+        assert reopened.search('Elden Ring', 'Malenia', 5) == index.search('Elden Ring', 'Malenia', 5)
+
+
+class TestReciprocalRankFusion:
+    """Test cases for merging ranked lists."""
+
+    @pytest.mark.unit
+    def test_documents_in_both_lists_win(self):
+        """Test ids ranked by both retrievers beat ids ranked by one."""
+        fused = reciprocal_rank_fusion([['a', 'b', 'c'], ['c', 'd']], k=60)
+
+        assert [doc_id for doc_id, _ in fused] == ['c', 'a', 'b', 'd']
+        assert fused[0][1] == pytest.approx(1 / 61 + 1 / 63)
+
+    @pytest.mark.unit
+    def test_empty_rankings(self):
+        """Test fusing nothing yields nothing."""
+        assert reciprocal_rank_fusion([[], []]) == []
@@ -0,0 +1,127 @@
+"""
+Test suite for raw screenshot uploads.
+
+This module tests the /chat/image and /chat/stream/image endpoints, which
+take the screenshot as the request body instead of base64 in JSON, and
+reading uploaded bytes in place with PIL. The chat router client and fake
+model come from the shared fixtures in conftest.py.
+"""
+
+import pytest
+import io
+import os
+import sys
+from unittest.mock import patch
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from PIL import Image
+    from routers import chat
+    from services.image_preprocess import BufferReader, prepare_vision_image
+except ImportError as e:
+    pytest.skip(f"Chat upload modules not available: {e}", allow_module_level=True)
+
+
+def webp_bytes(size=(64, 36)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 40, 40)).save(buffer, format='WEBP')
+    return buffer.getvalue()
+
+
+def sent_image(chat_model):
+    """The image part of the prompt the model received."""
+    content = chat_model.generate_content.call_args.args[0]
+    return content[1]
+
+
+class TestChatImage:
+    """Test cases for the raw upload endpoints."""
+
+    @pytest.mark.unit
+    def test_chat_image(self, chat_client, chat_model, chat_history):
+        """Test a raw WebP body reaches the model unchanged and the answer is remembered."""
+        image = webp_bytes()
+
+        response = chat_client.post("/chat/image", params={"message": "What now?"}, content=image,
+                               headers={"Content-Type": "image/webp"})
+
+        assert response.status_code == 200
+        assert response.json()["response"] == chat_model.reply
+        assert sent_image(chat_model) == {'mime_type': 'image/webp', 'data': image}
+        chat_history.add_message.assert_called_once()
+
+    @pytest.mark.unit
+    def test_stream_image(self, chat_client, chat_model):
+        """Test the streaming endpoint takes the same raw body."""
+        image = webp_bytes()
+
+        response = chat_client.post("/chat/stream/image", params={"message": "What now?"}, content=image)
+
+        assert response.status_code == 200
+        assert "event: done" in response.text
+        assert sent_image(chat_model)['data'] == image
+
+    @pytest.mark.unit
+    def test_chunked_upload_without_length(self, chat_client, chat_model):
+        """Test a body sent in chunks without Content-Length is still read whole."""
+        image = webp_bytes()
+        chunks = (image[i:i + 100] for i in range(0, len(image), 100))
+
+        response = chat_client.post("/chat/image", params={"message": "What now?"}, content=chunks)
+
+        assert response.status_code == 200
+        assert sent_image(chat_model)['data'] == image
+
+    @pytest.mark.unit
+    def test_too_large(self, chat_client, chat_model):
+        """Test bodies over the limit are rejected before reaching the model."""
+        with patch('routers.chat.MAX_IMAGE_BYTES', 10):
+            response = chat_client.post("/chat/image", params={"message": "What now?"}, content=webp_bytes())
+
+        assert response.status_code == 413
+        chat_model.generate_content.assert_not_called()
+
+    @pytest.mark.unit
+    def test_empty_body(self, chat_client):
+        """Test an upload without an image is rejected."""
+        response = chat_client.post("/chat/image", params={"message": "What now?"}, content=b"")
+
+        assert response.status_code == 400
+
+
+class TestBufferReader:
+    """Test cases for reading uploads in place."""
+
+    @pytest.mark.unit
+    def test_reads_and_seeks(self):
+        """Test reads, seeks and tell behave like a file."""
+        reader = BufferReader(bytearray(b"0123456789"))
+
+        assert reader.read(4) == b"0123"
+        assert reader.seek(-2, io.SEEK_END) == 8
+        assert reader.read() == b"89"
+        assert reader.read(1) == b""
+        reader.seek(3)
+        assert reader.tell() == 3
+
+    @pytest.mark.unit
+    def test_pil_opens_bytearray(self):
+        """Test PIL decodes an image from a bytearray through the reader."""
+        with Image.open(BufferReader(bytearray(webp_bytes((40, 20))))) as image:
+            image.load()
+            assert image.size == (40, 20)
+
+    @pytest.mark.unit
+    def test_prepare_passes_upload_through(self):
+        """Test uploads that fit are passed through without a copy and large ones are downscaled."""
+        image = bytearray(webp_bytes((64, 36)))
+
+        small = prepare_vision_image(image, max_side=100)
+        large = prepare_vision_image(image, max_side=32)
+
+        assert small['data'] is image
+        assert Image.open(io.BytesIO(large['data'])).size == (32, 18)
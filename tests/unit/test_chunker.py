@@ -0,0 +1,174 @@
+"""
+Test suite for the token-aware text chunker.
+
+This module tests the token budget, overlap between chunks, heading and
+paragraph boundaries, splitting of oversized sentences and the
+approximate tokenizer fallback.
+"""
+
+import pytest
+import os
+import re
+import sys
+import time
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from services.chunker import TextChunker
+except ImportError as e:
+    pytest.skip(f"Chunker module not available: {e}", allow_module_level=True)
+
+
+class FakeTokenizer:
+    """Fast-tokenizer stand-in: every whitespace-separated word is one token."""
+
+    is_fast = True
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, texts, add_special_tokens=False, return_offsets_mapping=False):
+        self.calls += 1
+        return {'offset_mapping': [[m.span() for m in re.finditer(r'\S+', text)] for text in texts]}
+
+
+def words(count, word="word"):
+    return " ".join([word] * count)
+
+
+class TestTokenBudget:
+    """Test cases for chunk sizes."""
+
+    @pytest.mark.unit
+    def test_empty_text(self):
+        """Test empty input yields no chunks."""
+        chunker = TextChunker(FakeTokenizer())
+        assert chunker.chunk("") == []
+        assert chunker.chunk(None) == []
+        assert chunker.chunk("\n\n  \n\n") == []
+
+    @pytest.mark.unit
+    def test_short_text_is_one_chunk(self):
+        """Test text under the budget is returned unchanged."""
+        chunker = TextChunker(FakeTokenizer(), max_tokens=50)
+        assert chunker.chunk("First paragraph.\n\nSecond paragraph.") == ["First paragraph.\n\nSecond paragraph."]
+
+    @pytest.mark.unit
+    def test_chunks_respect_token_budget(self):
+        """Test no chunk exceeds max_tokens and every paragraph is kept."""
+        tokenizer = FakeTokenizer()
+        chunker = TextChunker(tokenizer, max_tokens=20, overlap_tokens=0)
+        paragraphs = [f"Paragraph {i} " + words(i % 15 + 1) + "." for i in range(30)]
+
+        chunks = chunker.chunk("\n\n".join(paragraphs))
+
+        assert all(chunker.count_tokens(chunk) <= 20 for chunk in chunks)
+        joined = "\n\n".join(chunks)
+        assert all(paragraph in joined for paragraph in paragraphs)
+
+    @pytest.mark.unit
+    def test_long_paragraph_splits_at_sentences(self):
+        """Test an oversized paragraph is split between sentences."""
+        chunker = TextChunker(FakeTokenizer(), max_tokens=10, overlap_tokens=0)
+        text = "One two three four five six. Seven eight nine ten eleven twelve."
+
+        assert chunker.chunk(text) == ["One two three four five six.", "Seven eight nine ten eleven twelve."]
+
+    @pytest.mark.unit
+    def test_long_sentence_splits_at_token_windows(self):
+        """Test a sentence longer than the budget is cut at token boundaries."""
+        chunker = TextChunker(FakeTokenizer(), max_tokens=10, overlap_tokens=0)
+
+        chunks = chunker.chunk(words(25))
+
+        assert [chunker.count_tokens(chunk) for chunk in chunks] == [10, 10, 5]
+        assert " ".join(chunks) == words(25)
+
+    @pytest.mark.unit
+    def test_tokenizes_once_per_chunk_call(self):
+        """Test all paragraphs are tokenized in a single batched call."""
+        tokenizer = FakeTokenizer()
+        chunker = TextChunker(tokenizer, max_tokens=20)
+
+        chunker.chunk("\n\n".join(words(5) for _ in range(100)))
+
+        assert tokenizer.calls == 1
+
+    @pytest.mark.unit
+    def test_chunking_scales_linearly(self):
+        """Test doubling the input roughly doubles the chunking time."""
+        chunker = TextChunker(max_tokens=64)
+        text = "\n\n".join(f"Sentence {i} about the boss. " * 20 for i in range(500))
+
+        start = time.perf_counter()
+        small = chunker.chunk(text)
+        small_time = time.perf_counter() - start
+        start = time.perf_counter()
+        large = chunker.chunk(text + "\n\n" + text)
+        large_time = time.perf_counter() - start
+
+        assert len(large) >= 2 * len(small) - 1
+        assert large_time < small_time * 5
+
+
+class TestStructure:
+    """Test cases for overlap, paragraphs and headings."""
+
+    @pytest.mark.unit
+    def test_overlap_repeats_trailing_sentences(self):
+        """Test the last sentences of a chunk start the next one."""
+        chunker = TextChunker(FakeTokenizer(), max_tokens=12, overlap_tokens=4)
+        text = "Alpha beta gamma delta. Epsilon zeta eta theta. Iota kappa lambda mu. Nu xi omicron pi."
+
+        chunks = chunker.chunk(text)
+
+        assert chunks[0] == "Alpha beta gamma delta. Epsilon zeta eta theta. Iota kappa lambda mu."
+        assert chunks[1] == "Iota kappa lambda mu. Nu xi omicron pi."
+
+    @pytest.mark.unit
+    def test_overlap_never_repeats_whole_chunk(self):
+        """Test a chunk is not carried over in full when the next unit is large."""
+        chunker = TextChunker(FakeTokenizer(), max_tokens=10, overlap_tokens=5)
+
+        chunks = chunker.chunk("Short intro.\n\n" + words(9) + ".")
+
+        assert chunks == ["Short intro.", words(9) + "."]
+
+    @pytest.mark.unit
+    def test_heading_starts_new_chunk(self):
+        """Test a heading closes the previous section without overlap."""
+        chunker = TextChunker(FakeTokenizer(), max_tokens=100, overlap_tokens=10)
+        text = "# Weapons\n\nSwords are fast.\n\n## Armor\n\nPlate is heavy.\n\nLeather is light."
+
+        chunks = chunker.chunk(text)
+
+        assert chunks == ["# Weapons\n\nSwords are fast.", "## Armor\n\nPlate is heavy.\n\nLeather is light."]
+
+    @pytest.mark.unit
+    def test_consecutive_headings_stay_together(self):
+        """Test a heading directly followed by a sub-heading is not left alone."""
+        chunker = TextChunker(FakeTokenizer(), max_tokens=100)
+
+        chunks = chunker.chunk("# Bosses\n\n## Margit\n\nUse spirit ashes.")
+
+        assert chunks == ["# Bosses\n\n## Margit\n\nUse spirit ashes."]
+
+    @pytest.mark.unit
+    def test_approximate_tokens_without_tokenizer(self):
+        """Test words and punctuation are counted when no tokenizer is given."""
+        chunker = TextChunker()
+        assert chunker.count_tokens("Margit's HP: 4,174.") == 9
+        assert chunker.count_tokens("") == 0
+
+    @pytest.mark.unit
+    def test_tokenizer_error_falls_back_to_approximation(self):
+        """Test a failing tokenizer does not break chunking."""
+        def broken(*args, **kwargs):
+            raise RuntimeError("no offsets")
+
+        chunker = TextChunker(broken, max_tokens=50)
+        assert chunker.chunk("Some text.") == ["Some text."]
@@ -0,0 +1,141 @@
+"""
+Test suite for the prompt context budget.
+
+This module tests token counting and truncation, history fitting,
+deduplication of knowledge chunks and how the budget is split between
+history and knowledge.
+"""
+
+import pytest
+import os
+import sys
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from services.context_budget import (
+        ContextBudget,
+        count_tokens,
+        dedupe_chunks,
+        system_prompt_tokens,
+        truncate_tokens
+    )
+except ImportError as e:
+    pytest.skip(f"Context budget module not available: {e}", allow_module_level=True)
+
+
+def exchange(i, answer_words=5):
+    return {
+        'user_message': f"Question {i}?",
+        'assistant_response': " ".join(["answer"] * answer_words),
+        'timestamp': f"2025-01-01T12:{i:02d}:00.123456"
+    }
+
+
+def result(content, title="Page"):
+    return {'content': content, 'metadata': {'title': title, 'content_type': 'wiki', 'url': 'https://wiki'}}
+
+
+class TestTokens:
+    """Test cases for token counting and truncation."""
+
+    @pytest.mark.unit
+    def test_count_and_truncate(self):
+        """Test words and punctuation count as tokens and cuts are marked."""
+        assert count_tokens("Beat Margit, then rest.") == 6
+        assert count_tokens("") == 0
+        assert truncate_tokens("one two three four five six", 5) == "one two..."
+        assert truncate_tokens("one two", 2) == "one two"
+        assert truncate_tokens("one two three", 2) == ""
+
+    @pytest.mark.unit
+    def test_system_prompt_is_counted(self):
+        """Test the system prompt's tokens are known."""
+        assert system_prompt_tokens() > 0
+
+
+class TestHistory:
+    """Test cases for fitting history into its share of the budget."""
+
+    @pytest.mark.unit
+    def test_short_history_kept_in_full(self):
+        """Test history that fits keeps every exchange in the stored format."""
+        budget = ContextBudget("Hi", total_tokens=1000, system_tokens=0)
+
+        context = budget.history([exchange(1), exchange(2)])
+
+        assert context.splitlines() == [
+            "Previous conversation history:",
+            "[2025-01-01 12:01] User: Question 1?",
+            "[2025-01-01 12:01] Assistant: answer answer answer answer answer",
+            "[2025-01-01 12:02] User: Question 2?",
+            "[2025-01-01 12:02] Assistant: answer answer answer answer answer",
+        ]
+        assert budget.stats['messages'] == 2
+        assert budget.stats['history'] == count_tokens(context)
+
+    @pytest.mark.unit
+    def test_long_history_condensed_then_dropped(self):
+        """Test older long answers are condensed and the oldest dropped to stay within budget."""
+        budget = ContextBudget("Hi", total_tokens=600, history_share=0.5, system_tokens=0)
+        history = [exchange(i, answer_words=150) for i in range(5)]
+
+        context = budget.history(history)
+
+        assert budget.stats['history'] <= budget.stats['history_budget']
+        assert budget.stats['condensed'] >= 1
+        assert budget.stats['dropped_messages'] >= 1
+        assert "Question 4?" in context
+        assert "Question 0?" not in context
+
+    @pytest.mark.unit
+    def test_no_room_for_history(self):
+        """Test a budget used up by the question leaves history out."""
+        budget = ContextBudget("word " * 100, total_tokens=50, system_tokens=0)
+
+        assert budget.history([exchange(1)]) == ""
+        assert budget.stats['dropped_messages'] == 1
+
+
+class TestKnowledge:
+    """Test cases for deduplicating and fitting knowledge results."""
+
+    @pytest.mark.unit
+    def test_dedupe_overlapping_chunks(self):
+        """Test chunks mostly repeating better-ranked ones are dropped."""
+        first = "Margit is weak to bleed and jump attacks after his delayed swings in phase one."
+        overlapping = "jump attacks after his delayed swings in phase one. Rest now."
+        distinct = "Godrick grafts dragon arms in phase two of the fight at Stormveil Castle."
+
+        kept, dropped = dedupe_chunks([result(first), result(overlapping), result(distinct), result("")])
+
+        assert [r['content'] for r in kept] == [first, distinct]
+        assert dropped == 2
+
+    @pytest.mark.unit
+    def test_knowledge_uses_what_history_left(self):
+        """Test knowledge gets the remaining tokens and long chunks are trimmed to fit."""
+        budget = ContextBudget("Hi", total_tokens=400, history_share=0.5, system_tokens=0)
+        budget.history([exchange(1)])
+        chunks = [result(" ".join([f"word{i}"] * 300), title=f"Page {i}") for i in range(3)]
+
+        context = budget.knowledge(chunks)
+
+        assert budget.stats['knowledge_budget'] > 0.5 * (400 - 32)
+        assert budget.stats['knowledge'] <= budget.stats['knowledge_budget']
+        assert context.startswith("\n\nRELEVANT KNOWLEDGE FROM GAME DATABASE:\n")
+        assert "Page 0" in context and "..." in context
+        assert budget.stats['chunks'] + budget.stats['dropped_chunks'] == 3
+
+    @pytest.mark.unit
+    def test_log_records_total(self, capsys):
+        """Test logging records the final prompt size and prints the statistics."""
+        budget = ContextBudget("How do I beat Margit?", system_tokens=10)
+
+        budget.log("How do I beat Margit?")
+
+        assert budget.stats['total'] == 10 + 6
+        assert "Prompt tokens: 16/" in capsys.readouterr().out
@@ -0,0 +1,198 @@
+"""
+Test suite for the in-process vector indexes.
+
+This module tests int8 / float16 quantization, exact re-ranking,
+upserts, deletions, label filters and persistence, and the flat
+brute-force index used for small collections.
+"""
+
+import pytest
+import os
+import sys
+import numpy as np
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from services.dense_index import DenseIndex, FlatIndex
+except ImportError as e:
+    pytest.skip(f"Dense index module not available: {e}", allow_module_level=True)
+
+
+def random_vectors(count, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_neighbours(vectors, query, k):
+    distances = ((vectors - query) ** 2).sum(axis=1)
+    return list(np.argsort(distances)[:k]), distances
+
+
+class TestSearch:
+    """Test cases for quantized search with re-ranking."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("quantization", ['int8', 'float16'])
+    def test_matches_exact_search(self, temp_dir, quantization):
+        """Test results and distances match a float32 brute-force search."""
+        vectors = random_vectors(500)
+        index = DenseIndex(os.path.join(temp_dir, 'index'), quantization)
+        index.upsert([f'id{i}' for i in range(500)], vectors)
+
+        hits = 0
+        for query in random_vectors(20, seed=1):
+            expected, distances = exact_neighbours(vectors, query, 5)
+            results = index.search(query, 5)
+            hits += len({f'id{i}' for i in expected} & {doc_id for doc_id, _ in results})
+            for doc_id, distance in results:
+                assert distance == pytest.approx(distances[int(doc_id[2:])], abs=1e-4)
+
+        assert hits / (20 * 5) >= 0.95
+
+    @pytest.mark.unit
+    def test_int8_uses_a_quarter_of_the_memory(self, temp_dir):
+        """Test the scanned codes are much smaller than float32 vectors."""
+        vectors = random_vectors(1000, dim=384)
+        index = DenseIndex(os.path.join(temp_dir, 'index'), 'int8')
+        index.upsert([str(i) for i in range(1000)], vectors)
+
+        assert index.memory_bytes() < vectors.nbytes * 0.3
+
+    @pytest.mark.unit
+    def test_label_filter(self, temp_dir):
+        """Test only vectors with an allowed label are returned."""
+        vectors = random_vectors(10)
+        index = DenseIndex(os.path.join(temp_dir, 'index'))
+        index.upsert([str(i) for i in range(10)], vectors, ['wiki' if i % 2 else 'forum' for i in range(10)])
+
+        results = index.search(vectors[0], 10, labels=['wiki'])
+
+        assert {doc_id for doc_id, _ in results} == {'1', '3', '5', '7', '9'}
+
+    @pytest.mark.unit
+    def test_empty_index(self, temp_dir):
+        """Test searching an empty index returns nothing."""
+        index = DenseIndex(os.path.join(temp_dir, 'index'))
+        assert index.search(random_vectors(1)[0], 5) == []
+
+    @pytest.mark.unit
+    def test_unsupported_quantization(self, temp_dir):
+        """Test unknown quantization modes are rejected."""
+        with pytest.raises(ValueError):
+            DenseIndex(os.path.join(temp_dir, 'index'), 'int4')
+
+
+class TestUpdates:
+    """Test cases for upserts, deletions and persistence."""
+
+    @pytest.mark.unit
+    def test_upsert_replaces_vector(self, temp_dir):
+        """Test upserting an existing id replaces its vector."""
+        vectors = random_vectors(3)
+        index = DenseIndex(os.path.join(temp_dir, 'index'))
+        index.upsert(['a', 'b'], vectors[:2])
+        index.upsert(['a'], vectors[2:])
+
+        assert index.count() == 2
+        assert index.search(vectors[2], 1)[0][0] == 'a'
+
+    @pytest.mark.unit
+    def test_delete_keeps_remaining_vectors_searchable(self, temp_dir):
+        """Test deleting ids compacts the index without corrupting other rows."""
+        vectors = random_vectors(6)
+        index = DenseIndex(os.path.join(temp_dir, 'index'))
+        index.upsert([str(i) for i in range(6)], vectors)
+
+        index.delete(['1', '3', 'missing'])
+
+        assert index.count() == 4
+        for i in (0, 2, 4, 5):
+            doc_id, distance = index.search(vectors[i], 1)[0]
+            assert doc_id == str(i)
+            assert distance == pytest.approx(0.0, abs=1e-5)
+
+    @pytest.mark.unit
+    def test_index_persists_across_instances(self, temp_dir):
+        """Test a reopened index returns the same results."""
+        path = os.path.join(temp_dir, 'index')
+        vectors = random_vectors(50)
+        index = DenseIndex(path)
+        index.upsert([str(i) for i in range(50)], vectors)
+        index.delete(['7'])
+        expected = index.search(vectors[3], 5)
+
+        reopened = DenseIndex(path)
+
+        assert reopened.count() == 49
+        assert reopened.search(vectors[3], 5) == expected
+        assert reopened.disk_bytes() > 0
+
+    @pytest.mark.unit
+    def test_mismatched_quantization_starts_empty(self, temp_dir):
+        """Test an index is not read back with a different quantization."""
+        path = os.path.join(temp_dir, 'index')
+        DenseIndex(path, 'int8').upsert(['a'], random_vectors(1))
+
+        assert DenseIndex(path, 'float16').count() == 0
+
+
+class TestFlatIndex:
+    """Test cases for the brute-force index of small collections."""
+
+    def make_index(self, temp_dir, count=20):
+        vectors = random_vectors(count)
+        index = FlatIndex(os.path.join(temp_dir, 'flat'))
+        index.load([str(i) for i in range(count)], vectors, [f'doc {i}' for i in range(count)],
+                   [{'n': i} for i in range(count)], ['wiki' if i % 2 else 'forum' for i in range(count)])
+        return index, vectors
+
+    @pytest.mark.unit
+    def test_matches_exact_cosine_search(self, temp_dir):
+        """Test results are the exact nearest rows with 2 - 2cos distances."""
+        index, vectors = self.make_index(temp_dir)
+        query = random_vectors(1, seed=3)[0]
+
+        results = index.search(query, 5)
+
+        expected, distances = exact_neighbours(vectors, query, 5)
+        assert [doc_id for doc_id, _, _, _ in results] == [str(i) for i in expected]
+        assert [distance for _, distance, _, _ in results] == pytest.approx(list(distances[expected]), abs=1e-5)
+        assert results[0][2] == f'doc {expected[0]}'
+        assert results[0][3] == {'n': expected[0]}
+
+    @pytest.mark.unit
+    def test_label_filter_and_small_k(self, temp_dir):
+        """Test filtering by label and asking for more rows than match."""
+        index, vectors = self.make_index(temp_dir, count=6)
+
+        results = index.search(vectors[0], 10, labels=['wiki'])
+
+        assert sorted(doc_id for doc_id, _, _, _ in results) == ['1', '3', '5']
+
+    @pytest.mark.unit
+    def test_upsert_and_delete(self, temp_dir):
+        """Test rows can be replaced, added and removed."""
+        index, vectors = self.make_index(temp_dir, count=4)
+        extra = random_vectors(2, seed=5)
+
+        index.upsert(['0', 'new'], extra, ['replaced', 'added'], [{}, {}], ['wiki', 'wiki'])
+        index.delete(['1', '2'])
+
+        assert index.count() == 3
+        doc_id, _, document, _ = index.search(extra[0], 1)[0]
+        assert (doc_id, document) == ('0', 'replaced')
+        assert index.search(extra[1], 1)[0][0] == 'new'
+        assert index.search(vectors[3], 1)[0][0] == '3'
+
+    @pytest.mark.unit
+    def test_empty_index(self, temp_dir):
+        """Test an empty collection loads and searches."""
+        index = FlatIndex(os.path.join(temp_dir, 'flat'))
+        index.load([], [], [], [], [])
+
+        assert index.search(random_vectors(1)[0], 3) == []
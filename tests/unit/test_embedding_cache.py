@@ -0,0 +1,120 @@
+"""
+Test suite for the persistent embedding cache module.
+
+This module tests storing and loading vectors through the SQLite index
+and memory-mapped matrix, model isolation and engine integration.
+"""
+
+import pytest
+import os
+import sys
+import numpy as np
+from unittest.mock import Mock
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from services.embedding_cache import EmbeddingCache
+    from services.embedding_engine import EmbeddingEngine, content_hash
+except ImportError as e:
+    pytest.skip(f"Embedding cache module not available: {e}", allow_module_level=True)
+
+
+class TestEmbeddingCache:
+    """Test cases for the EmbeddingCache class."""
+
+    @pytest.mark.unit
+    def test_put_and_get_roundtrip(self, temp_dir):
+        """Test vectors written to the cache are read back unchanged."""
+        cache = EmbeddingCache(temp_dir, "test-model")
+        vectors = np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]], dtype=np.float32)
+
+        cache.put_many(["h1", "h2"], vectors)
+        result = cache.get_many(["h2", "h1", "missing"])
+
+        assert set(result) == {"h1", "h2"}
+        assert np.array_equal(result["h1"], vectors[0])
+        assert np.array_equal(result["h2"], vectors[1])
+        assert cache.count() == 2
+
+    @pytest.mark.unit
+    def test_cache_persists_across_instances(self, temp_dir):
+        """Test a new cache instance sees vectors written by a previous one."""
+        first = EmbeddingCache(temp_dir, "test-model")
+        first.put_many(["h1"], np.ones((1, 4), dtype=np.float32))
+        first.put_many(["h2"], np.full((1, 4), 2.0, dtype=np.float32))
+
+        second = EmbeddingCache(temp_dir, "test-model")
+        result = second.get_many(["h1", "h2"])
+
+        assert second.dim == 4
+        assert np.array_equal(result["h2"], np.full(4, 2.0, dtype=np.float32))
+
+    @pytest.mark.unit
+    def test_partial_trailing_row_is_overwritten(self, temp_dir):
+        """Test rows appended after an interrupted write are read back at their own index."""
+        cache = EmbeddingCache(temp_dir, "test-model")
+        cache.put_many(["h1"], np.ones((1, 4), dtype=np.float32))
+        with open(cache.matrix_path, 'ab') as f:
+            f.write(b"\x00" * 6)
+
+        cache.put_many(["h2"], np.full((1, 4), 2.0, dtype=np.float32))
+        result = EmbeddingCache(temp_dir, "test-model").get_many(["h1", "h2"])
+
+        assert os.path.getsize(cache.matrix_path) == 2 * 4 * 4
+        assert np.array_equal(result["h1"], np.ones(4, dtype=np.float32))
+        assert np.array_equal(result["h2"], np.full(4, 2.0, dtype=np.float32))
+
+    @pytest.mark.unit
+    def test_cache_is_scoped_by_model(self, temp_dir):
+        """Test switching the model name does not return stale vectors."""
+        EmbeddingCache(temp_dir, "model-a").put_many(["h1"], np.ones((1, 3), dtype=np.float32))
+
+        other = EmbeddingCache(temp_dir, "model-b")
+
+        assert other.get_many(["h1"]) == {}
+
+    @pytest.mark.unit
+    def test_put_with_wrong_dimension_is_ignored(self, temp_dir):
+        """Test vectors of a different dimension are not appended."""
+        cache = EmbeddingCache(temp_dir, "test-model")
+        cache.put_many(["h1"], np.ones((1, 3), dtype=np.float32))
+
+        cache.put_many(["h2"], np.ones((1, 5), dtype=np.float32))
+
+        assert cache.get_many(["h2"]) == {}
+        assert cache.count() == 1
+
+
+class TestEmbeddingEngineWithCache:
+    """Test cases for the engine reading through the persistent cache."""
+
+    @pytest.mark.unit
+    def test_engine_skips_model_for_persisted_chunks(self, temp_dir):
+        """Test a fresh engine reuses vectors persisted by an earlier run."""
+        model = Mock()
+        model.tokenizer = None
+        model.encode = Mock(side_effect=lambda texts, **kwargs: np.ones((len(texts), 3), dtype=np.float32))
+
+        EmbeddingEngine("test-model", store=EmbeddingCache(temp_dir, "test-model")).encode(model, ["chunk"])
+        fresh = EmbeddingEngine("test-model", store=EmbeddingCache(temp_dir, "test-model"))
+        result = fresh.encode(model, ["chunk", "new chunk"])
+
+        assert result.shape == (2, 3)
+        assert model.encode.call_count == 2
+        assert model.encode.call_args.args[0] == ["new chunk"]
+
+    @pytest.mark.unit
+    def test_engine_can_bypass_store(self, temp_dir):
+        """Test use_store=False keeps embeddings out of the persistent cache."""
+        model = Mock()
+        model.tokenizer = None
+        model.encode = Mock(side_effect=lambda texts, **kwargs: np.ones((len(texts), 3), dtype=np.float32))
+        store = EmbeddingCache(temp_dir, "test-model")
+
+        EmbeddingEngine("test-model", store=store).encode(model, ["query"], use_store=False)
+
+        assert store.get_many([content_hash("query")]) == {}
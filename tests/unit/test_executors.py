@@ -0,0 +1,139 @@
+"""
+Test suite for the executor pools used by async endpoints.
+
+This module tests that blocking calls run off the event loop in the
+right bounded pool, overlap with each other and surface their errors.
+"""
+
+import pytest
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from services import executors
+    from services.executors import cpu_executor, io_executor, run_cpu, run_io, shutdown_executors, stream_io
+except ImportError as e:
+    pytest.skip(f"Executors module not available: {e}", allow_module_level=True)
+
+
+def thread_name():
+    return threading.current_thread().name
+
+
+class TestRunInPools:
+    """Test cases for run_io and run_cpu."""
+
+    @pytest.mark.unit
+    def test_calls_run_in_their_pools(self):
+        """Test I/O and CPU calls run on the matching worker threads."""
+        async def main():
+            return await run_io(thread_name), await run_cpu(thread_name), thread_name()
+
+        io_thread, cpu_thread, loop_thread = asyncio.run(main())
+
+        assert io_thread.startswith('pixly-io')
+        assert cpu_thread.startswith('pixly-cpu')
+        assert loop_thread == threading.current_thread().name
+
+    @pytest.mark.unit
+    def test_blocking_calls_overlap(self):
+        """Test blocking calls run concurrently while the loop stays free."""
+        async def main():
+            start = time.perf_counter()
+            ticks = 0
+            calls = asyncio.gather(*(run_io(time.sleep, 0.2) for _ in range(5)))
+            while not calls.done():
+                ticks += 1
+                await asyncio.sleep(0.01)
+            await calls
+            return time.perf_counter() - start, ticks
+
+        elapsed, ticks = asyncio.run(main())
+
+        assert elapsed < 0.6
+        assert ticks > 5
+
+    @pytest.mark.unit
+    def test_arguments_and_errors(self):
+        """Test keyword arguments are passed and exceptions reach the caller."""
+        async def main():
+            assert await run_io(int, '10', base=2) == 2
+            await run_cpu(int, 'not a number')
+
+        with pytest.raises(ValueError):
+            asyncio.run(main())
+
+
+class TestPools:
+    """Test cases for pool sizing and shutdown."""
+
+    @pytest.mark.unit
+    def test_pools_are_bounded_and_recreated(self, monkeypatch):
+        """Test pools use the configured sizes and come back after shutdown."""
+        shutdown_executors(wait=True)
+        monkeypatch.setattr(executors, 'IO_WORKERS', 3)
+        monkeypatch.setattr(executors, 'CPU_WORKERS', 0)
+
+        pool = io_executor()
+        assert pool._max_workers == 3
+        assert io_executor() is pool
+        assert cpu_executor()._max_workers == 1
+
+        shutdown_executors(wait=True)
+        assert io_executor() is not pool
+        shutdown_executors(wait=True)
+
+
+class TestStreamIo:
+    """Test cases for iterating blocking iterators off the event loop."""
+
+    @pytest.mark.unit
+    def test_items_arrive_in_order(self):
+        """Test every item is yielded in order from a pool thread."""
+        def produce(count):
+            for i in range(count):
+                yield i, thread_name()
+
+        async def main():
+            return [item async for item in stream_io(produce, 5)]
+
+        items = asyncio.run(main())
+
+        assert [i for i, _ in items] == list(range(5))
+        assert all(name.startswith('pixly-io') for _, name in items)
+
+    @pytest.mark.unit
+    def test_errors_and_early_stop(self):
+        """Test iterator errors reach the consumer and breaking out stops the worker."""
+        produced = []
+
+        def produce():
+            for i in range(100):
+                produced.append(i)
+                time.sleep(0.01)
+                yield i
+
+        def failing():
+            yield 1
+            raise RuntimeError("stream broke")
+
+        async def main():
+            async for item in stream_io(produce):
+                if item == 2:
+                    break
+            with pytest.raises(RuntimeError):
+                async for _ in stream_io(failing):
+                    pass
+
+        asyncio.run(main())
+        time.sleep(0.05)
+
+        assert len(produced) < 10
@@ -0,0 +1,210 @@
+"""
+Test suite for the HTTP response cache module.
+
+This module tests storing validators and extracted pages, conditional
+request headers, and revalidation of knowledge pages against a local
+stand-in server that answers 304 Not Modified.
+"""
+
+import pytest
+import os
+import sys
+import sqlite3
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import patch
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from services.http_cache import ResponseCache
+    from services.knowledge_manager import KnowledgeManager
+except ImportError as e:
+    pytest.skip(f"HTTP cache module not available: {e}", allow_module_level=True)
+
+
+PAGE = {'title': 'Swords', 'content': 'Swords are melee weapons. ' * 5, 'url': 'https://example.com/wiki'}
+
+WIKI_HTML = (
+    b"<html><head><title>Swords</title></head><body><div class='mw-content-ltr'>"
+    + b"Swords are melee weapons used for close combat in the game. " * 3
+    + b"</div></body></html>"
+)
+
+
+class ValidatingHandler(BaseHTTPRequestHandler):
+    """Serves one page with an ETag and honours If-None-Match."""
+
+    def do_GET(self):
+        server = self.server
+        etag = f'"v{server.version}"'
+        if self.headers.get('If-None-Match') == etag:
+            server.not_modified += 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        server.full_downloads += 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', 'Wed, 01 Oct 2025 10:00:00 GMT')
+        self.send_header('Content-Length', str(len(WIKI_HTML)))
+        self.end_headers()
+        self.wfile.write(WIKI_HTML)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def validating_server():
+    """Start a local server supporting conditional requests."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ValidatingHandler)
+    server.version = 1
+    server.full_downloads = 0
+    server.not_modified = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestResponseCache:
+    """Test cases for the ResponseCache class."""
+
+    @pytest.mark.unit
+    def test_put_and_get_roundtrip(self, temp_dir):
+        """Test validators and the extracted page are stored per URL."""
+        cache = ResponseCache(os.path.join(temp_dir, 'http_cache.db'))
+        cache.put(PAGE['url'], '"abc"', 'Wed, 01 Oct 2025 10:00:00 GMT', PAGE)
+
+        entry = ResponseCache(cache.db_path).get(PAGE['url'])
+
+        assert entry == {'etag': '"abc"', 'last_modified': 'Wed, 01 Oct 2025 10:00:00 GMT', 'page': PAGE}
+
+    @pytest.mark.unit
+    def test_conditional_headers(self, temp_dir):
+        """Test cached validators become revalidation headers."""
+        cache = ResponseCache(os.path.join(temp_dir, 'http_cache.db'))
+        cache.put(PAGE['url'], '"abc"', None, PAGE)
+
+        assert cache.conditional_headers(PAGE['url']) == {'If-None-Match': '"abc"'}
+        assert cache.conditional_headers('https://example.com/other') == {}
+
+    @pytest.mark.unit
+    def test_response_without_validators_is_not_stored(self, temp_dir):
+        """Test pages that cannot be revalidated are not cached."""
+        cache = ResponseCache(os.path.join(temp_dir, 'http_cache.db'))
+        cache.put(PAGE['url'], None, None, PAGE)
+
+        assert cache.get(PAGE['url']) is None
+        assert not os.path.exists(cache.db_path)
+
+    @pytest.mark.unit
+    def test_page_without_content_is_remembered(self, temp_dir):
+        """Test an unchanged page that had no useful content stays None."""
+        cache = ResponseCache(os.path.join(temp_dir, 'http_cache.db'))
+        cache.put(PAGE['url'], '"abc"', None, None)
+
+        entry = cache.get(PAGE['url'])
+
+        assert entry is not None
+        assert entry['page'] is None
+
+    @pytest.mark.unit
+    def test_other_version_is_a_miss(self, temp_dir):
+        """Test pages stored by another extractor version are not reused or revalidated."""
+        old = ResponseCache(os.path.join(temp_dir, 'http_cache.db'), version='bs4-1')
+        old.put(PAGE['url'], '"abc"', None, PAGE)
+
+        cache = ResponseCache(old.db_path, version='lxml-2')
+
+        assert cache.get(PAGE['url']) is None
+        assert cache.conditional_headers(PAGE['url']) == {}
+        assert old.get(PAGE['url'])['page'] == PAGE
+
+    @pytest.mark.unit
+    def test_unversioned_cache_is_upgraded(self, temp_dir):
+        """Test a cache written before pages were versioned gains the column and misses."""
+        db_path = os.path.join(temp_dir, 'http_cache.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute('CREATE TABLE responses (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, '
+                     'page TEXT, fetched_at REAL NOT NULL)')
+        conn.execute('INSERT INTO responses VALUES (?, ?, ?, ?, ?)', (PAGE['url'], '"abc"', None, None, 0))
+        conn.commit()
+        conn.close()
+
+        cache = ResponseCache(db_path, version='lxml-2')
+        cache.put('https://example.com/new', '"def"', None, PAGE)
+
+        assert cache.get(PAGE['url']) is None
+        assert cache.get('https://example.com/new')['page'] == PAGE
+
+
+class TestKnowledgeRevalidation:
+    """Test cases for conditional fetching of knowledge pages."""
+
+    @pytest.mark.unit
+    def test_second_run_revalidates_instead_of_downloading(self, temp_dir, validating_server):
+        """Test an unchanged page is answered with 304 and not parsed again."""
+        manager = KnowledgeManager(temp_dir)
+        manager.scraper.requests_per_second = 1000
+        url = f"http://127.0.0.1:{validating_server.server_address[1]}/wiki/Swords"
+
+        first = manager.fetch_pages([('wiki', url)])
+        with patch.object(manager, 'parse_wiki_html', wraps=manager.parse_wiki_html) as mock_parse:
+            second = manager.fetch_pages([('wiki', url)])
+
+        assert first[0] is not None
+        assert second == first
+        assert validating_server.full_downloads == 1
+        assert validating_server.not_modified == 1
+        mock_parse.assert_not_called()
+
+    @pytest.mark.unit
+    def test_changed_page_is_downloaded_again(self, temp_dir, validating_server):
+        """Test a new ETag leads to a full download and a fresh parse."""
+        manager = KnowledgeManager(temp_dir)
+        manager.scraper.requests_per_second = 1000
+        url = f"http://127.0.0.1:{validating_server.server_address[1]}/wiki/Swords"
+
+        manager.fetch_pages([('wiki', url)])
+        validating_server.version = 2
+        manager.fetch_pages([('wiki', url)])
+
+        assert validating_server.full_downloads == 2
+        assert manager.response_cache.get(url)['etag'] == '"v2"'
+
+    @pytest.mark.unit
+    def test_page_format_change_downloads_again(self, temp_dir, validating_server):
+        """Test pages cached under an older page format are downloaded and parsed again."""
+        manager = KnowledgeManager(temp_dir)
+        manager.scraper.requests_per_second = 1000
+        url = f"http://127.0.0.1:{validating_server.server_address[1]}/wiki/Swords"
+        manager.fetch_pages([('wiki', url)])
+
+        with patch('services.knowledge_manager.PAGE_FORMAT_VERSION', 999):
+            upgraded = KnowledgeManager(temp_dir)
+        upgraded.scraper.requests_per_second = 1000
+        upgraded.fetch_pages([('wiki', url)])
+
+        assert validating_server.full_downloads == 2
+        assert validating_server.not_modified == 0
+
+    @pytest.mark.unit
+    def test_sync_extract_uses_conditional_request(self, temp_dir, validating_server):
+        """Test extract_wiki_content also reuses the cached extraction on 304."""
+        manager = KnowledgeManager(temp_dir)
+        url = f"http://127.0.0.1:{validating_server.server_address[1]}/wiki/Swords"
+
+        first = manager.extract_wiki_content(url)
+        second = manager.extract_wiki_content(url)
+
+        assert first is not None
+        assert second == first
+        assert validating_server.not_modified == 1
@@ -0,0 +1,114 @@
+"""
+Test suite for screenshot preprocessing.
+
+This module tests region parsing and cropping, downscaling, WebP / JPEG
+encoding and the server-side pass-through of already prepared images.
+"""
+
+import pytest
+import io
+import os
+import sys
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from PIL import Image
+    from services.image_preprocess import (
+        crop_region,
+        downscale,
+        encode,
+        parse_region,
+        prepare_vision_image,
+        preprocess_image
+    )
+except ImportError as e:
+    pytest.skip(f"Image preprocessing module not available: {e}", allow_module_level=True)
+
+
+def frame(width=3840, height=2160, mode='RGB'):
+    return Image.new(mode, (width, height), (30, 120, 200) if mode == 'RGB' else (30, 120, 200, 255))
+
+
+def png_bytes(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class TestRegions:
+    """Test cases for regions of interest."""
+
+    @pytest.mark.unit
+    def test_parse_region(self):
+        """Test valid specs parse and invalid ones fall back to the whole frame."""
+        assert parse_region("0, 0.5, 1, 1") == (0.0, 0.5, 1.0, 1.0)
+        assert parse_region("") is None
+        assert parse_region("0,0,1") is None
+        assert parse_region("0.5,0,0.2,1") is None
+
+    @pytest.mark.unit
+    def test_crop_region(self):
+        """Test regions are fractions of the frame size."""
+        cropped = crop_region(frame(1920, 1080), (0.5, 0.5, 1, 1))
+
+        assert cropped.size == (960, 540)
+        assert crop_region(frame(100, 100), None).size == (100, 100)
+
+
+class TestPreprocess:
+    """Test cases for downscaling and encoding."""
+
+    @pytest.mark.unit
+    def test_downscale_keeps_aspect_ratio(self):
+        """Test large frames shrink to the longest side and small ones are untouched."""
+        image = frame()
+
+        assert downscale(image, 1536).size == (1536, 864)
+        assert image.size == (3840, 2160)
+        small = frame(800, 600)
+        assert downscale(small, 1536) is small
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("fmt,mime", [("WEBP", "image/webp"), ("jpeg", "image/jpeg")])
+    def test_preprocess_image(self, fmt, mime):
+        """Test frames are cropped, downscaled and encoded in the requested format."""
+        data, mime_type = preprocess_image(frame(mode='RGBA'), max_side=1000, fmt=fmt, region=(0, 0, 0.5, 1))
+
+        image = Image.open(io.BytesIO(data))
+        assert mime_type == mime
+        assert image.format == fmt.upper()
+        assert image.size == (889, 1000)
+
+    @pytest.mark.unit
+    def test_unknown_format(self):
+        """Test unsupported formats are rejected."""
+        with pytest.raises(ValueError):
+            encode(frame(10, 10), 'GIF')
+
+
+class TestPrepareVisionImage:
+    """Test cases for preparing uploaded screenshots on the server."""
+
+    @pytest.mark.unit
+    def test_prepared_image_passes_through(self):
+        """Test an image the overlay already prepared is sent as is."""
+        data, _ = preprocess_image(frame(), max_side=1536, fmt='JPEG')
+
+        part = prepare_vision_image(data, max_side=1536)
+
+        assert part == {'mime_type': 'image/jpeg', 'data': data}
+
+    @pytest.mark.unit
+    def test_full_size_png_is_reduced(self):
+        """Test a full-resolution PNG from an older client is downscaled and re-encoded."""
+        data = png_bytes(frame())
+
+        part = prepare_vision_image(data, max_side=1536, fmt='WEBP')
+
+        assert part['mime_type'] == 'image/webp'
+        assert len(part['data']) < len(data)
+        assert Image.open(io.BytesIO(part['data'])).size == (1536, 864)
@@ -7,9 +7,10 @@ and knowledge management functionality.
 
 import pytest
 import os
+import re
 import sys
 import pandas as pd
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 
 # Add project root to path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -24,10 +25,25 @@ try:
         validate_csv_structure,
         knowledge_manager
     )
+    from services.html_extractors import BeautifulSoupExtractor
 except ImportError as e:
     pytest.skip(f"Knowledge manager module not available: {e}", allow_module_level=True)
 
 
+def legacy_clean_text(text):
+    """Original regex-chain implementation of KnowledgeManager._clean_text."""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'Advertisement\s*', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'Cookie\s*Policy\s*', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'Privacy\s*Policy\s*', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'Terms\s*of\s*Service\s*', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'Home\s*>\s*.*?>\s*', '', text)
+    text = re.sub(r'You are here:\s*.*?>\s*', '', text)
+    return text.strip()
+
+
 class TestKnowledgeManager:
     """Test cases for the KnowledgeManager class."""
     
@@ -258,17 +274,49 @@ class TestKnowledgeManager:
             assert result == ""
     
     @pytest.mark.unit
-    def test_process_game_knowledge_success(self, temp_games_info_dir, mock_requests_session):
+    def test_clean_text_matches_legacy_on_fixtures(self):
+        """Test the precompiled cleaner matches the original regex chain on saved pages."""
+        manager = KnowledgeManager()
+        fixtures_dir = os.path.join(project_root, 'tests', 'fixtures', 'html')
+        
+        for filename in sorted(os.listdir(fixtures_dir)):
+            with open(os.path.join(fixtures_dir, filename), 'rb') as f:
+                raw_text = BeautifulSoupExtractor().extract(f.read(), [])[1]
+            assert manager._clean_text(raw_text) == legacy_clean_text(raw_text)
+    
+    @pytest.mark.unit
+    def test_clean_text_matches_legacy_on_edge_cases(self):
+        """Test parity where removals splice text or case folding is unusual."""
+        manager = KnowledgeManager()
+        
+        test_cases = [
+            "Cookie Advertisement Policy stays removed",
+            "CookAdvertisementie Policy",
+            "ADVERTISEMENT\n\nText  after Terms  of  Service",
+            "Advert\u0131sement with dotless i and Terms of \u017fervice",
+            "\u0130stanbul Advertisement guide",
+            "Home > Wiki > Bosses > Malenia",
+            "You are here: Home > Gaming > Guides",
+            "Home without any closing bracket " * 50,
+            "home > lowercase is kept >",
+        ]
+        
+        for input_text in test_cases:
+            assert manager._clean_text(input_text) == legacy_clean_text(input_text), input_text
+    
+    @pytest.mark.unit
+    def test_process_game_knowledge_success(self, temp_games_info_dir, mock_requests_session, stub_scraper_fetch):
         """Test successful game knowledge processing."""
         manager = KnowledgeManager(games_info_dir=temp_games_info_dir)
         manager.session = mock_requests_session
+        stub_scraper_fetch(manager)
         
-        with patch.object(manager, 'extract_wiki_content', return_value={
+        with patch.object(manager, 'parse_wiki_html', return_value={
             'title': 'Test Wiki',
             'content': 'Test wiki content',
             'url': 'https://example.com/wiki'
         }), \
-        patch.object(manager, 'extract_forum_content', return_value={
+        patch.object(manager, 'parse_forum_html', return_value={
             'title': 'Test Forum',
             'content': 'Test forum content',
             'url': 'https://example.com/forum'
@@ -283,6 +331,34 @@ class TestKnowledgeManager:
             assert len(result['youtube']) == 2  # 2 youtube entries in test data
             assert len(result['forum']) == 2  # 2 forum entries in test data
     
+    @pytest.mark.unit
+    def test_iter_game_knowledge_streams_entries(self, temp_games_info_dir, stub_scraper_fetch):
+        """Test knowledge entries are streamed with YouTube entries first."""
+        manager = KnowledgeManager(games_info_dir=temp_games_info_dir)
+        stub_scraper_fetch(manager)
+
+        with patch.object(manager, 'parse_wiki_html', return_value={'title': 'Wiki', 'content': 'Wiki content'}), \
+             patch.object(manager, 'parse_forum_html', return_value=None):
+            entries = list(manager.iter_game_knowledge('test_game'))
+
+        assert [content_type for content_type, _ in entries] == ['youtube', 'youtube', 'wiki', 'wiki']
+        assert all(entry['content'] == 'Wiki content' for content_type, entry in entries if content_type == 'wiki')
+        assert list(manager.iter_game_knowledge('nonexistent_game')) == []
+
+    @pytest.mark.unit
+    def test_list_source_urls(self, temp_games_info_dir):
+        """Test every URL of the CSV is listed per content type."""
+        manager = KnowledgeManager(games_info_dir=temp_games_info_dir)
+
+        urls = manager.list_source_urls('test_game')
+
+        assert urls == {
+            'wiki': {'https://example.com/wiki1', 'https://example.com/wiki2'},
+            'youtube': {'https://youtube.com/watch?v=1', 'https://youtube.com/watch?v=2'},
+            'forum': {'https://forum.com/thread1', 'https://forum.com/thread2'}
+        }
+        assert manager.list_source_urls('nonexistent_game') is None
+
     @pytest.mark.unit
     def test_process_game_knowledge_no_csv(self, temp_games_info_dir):
         """Test processing game knowledge with no CSV file."""
@@ -293,13 +369,14 @@ class TestKnowledgeManager:
         assert result == {'wiki': [], 'youtube': [], 'forum': []}
     
     @pytest.mark.unit
-    def test_process_game_knowledge_with_failed_extractions(self, temp_games_info_dir, mock_requests_session):
+    def test_process_game_knowledge_with_failed_extractions(self, temp_games_info_dir, mock_requests_session, stub_scraper_fetch):
         """Test processing game knowledge with failed content extractions."""
         manager = KnowledgeManager(games_info_dir=temp_games_info_dir)
         manager.session = mock_requests_session
+        stub_scraper_fetch(manager)
         
-        with patch.object(manager, 'extract_wiki_content', return_value=None), \
-        patch.object(manager, 'extract_forum_content', return_value=None):
+        with patch.object(manager, 'parse_wiki_html', return_value=None), \
+        patch.object(manager, 'parse_forum_html', return_value=None):
             
             result = manager.process_game_knowledge('test_game')
             
@@ -409,18 +486,19 @@ class TestKnowledgeManagerIntegration:
     """Integration tests for knowledge manager functionality."""
     
     @pytest.mark.integration
-    def test_full_knowledge_processing_workflow(self, temp_games_info_dir, mock_requests_session):
+    def test_full_knowledge_processing_workflow(self, temp_games_info_dir, mock_requests_session, stub_scraper_fetch):
         """Test complete knowledge processing workflow."""
         manager = KnowledgeManager(games_info_dir=temp_games_info_dir)
         manager.session = mock_requests_session
+        stub_scraper_fetch(manager)
         
         # Mock successful content extractions
-        with patch.object(manager, 'extract_wiki_content', return_value={
+        with patch.object(manager, 'parse_wiki_html', return_value={
             'title': 'Test Wiki Page',
             'content': 'This is comprehensive wiki content about the game with lots of useful information.',
             'url': 'https://example.com/wiki'
         }), \
-        patch.object(manager, 'extract_forum_content', return_value={
+        patch.object(manager, 'parse_forum_html', return_value={
             'title': 'Test Forum Thread',
             'content': 'This is comprehensive forum content about the game with lots of useful information.',
             'url': 'https://example.com/forum'
@@ -467,13 +545,14 @@ class TestKnowledgeManagerIntegration:
                 assert 'description' in forum_entry
     
     @pytest.mark.integration
-    def test_knowledge_processing_with_mixed_success(self, temp_games_info_dir, mock_requests_session):
+    def test_knowledge_processing_with_mixed_success(self, temp_games_info_dir, mock_requests_session, stub_scraper_fetch):
         """Test knowledge processing with mixed success/failure scenarios."""
         manager = KnowledgeManager(games_info_dir=temp_games_info_dir)
         manager.session = mock_requests_session
+        stub_scraper_fetch(manager)
         
         # Mock mixed results (some successful, some failed)
-        def mock_extract_wiki_content(url):
+        def mock_parse_wiki_html(html, url):
             if 'wiki1' in url:
                 return {
                     'title': 'Successful Wiki',
@@ -483,7 +562,7 @@ class TestKnowledgeManagerIntegration:
             else:
                 return None  # Simulate failure
         
-        def mock_extract_forum_content(url):
+        def mock_parse_forum_html(html, url):
             if 'thread1' in url:
                 return {
                     'title': 'Successful Forum',
@@ -493,8 +572,8 @@ class TestKnowledgeManagerIntegration:
             else:
                 return None  # Simulate failure
         
-        with patch.object(manager, 'extract_wiki_content', side_effect=mock_extract_wiki_content), \
-        patch.object(manager, 'extract_forum_content', side_effect=mock_extract_forum_content):
+        with patch.object(manager, 'parse_wiki_html', side_effect=mock_parse_wiki_html), \
+        patch.object(manager, 'parse_forum_html', side_effect=mock_parse_forum_html):
             
             result = manager.process_game_knowledge('test_game')
             
@@ -567,7 +646,7 @@ class TestKnowledgeManagerEdgeCases:
             assert result['title'] == "Test Title"
     
     @pytest.mark.unit
-    def test_process_knowledge_with_very_large_csv(self, temp_dir, mock_requests_session):
+    def test_process_knowledge_with_very_large_csv(self, temp_dir, mock_requests_session, stub_scraper_fetch):
         """Test processing knowledge with very large CSV file."""
         # Create large CSV file
         large_csv_path = os.path.join(temp_dir, "large_game.csv")
@@ -584,9 +663,10 @@ class TestKnowledgeManagerEdgeCases:
         
         manager = KnowledgeManager(games_info_dir=temp_dir)
         manager.session = mock_requests_session
+        stub_scraper_fetch(manager)
         
-        with patch.object(manager, 'extract_wiki_content', return_value=None), \
-        patch.object(manager, 'extract_forum_content', return_value=None):
+        with patch.object(manager, 'parse_wiki_html', return_value=None), \
+        patch.object(manager, 'parse_forum_html', return_value=None):
             
             result = manager.process_game_knowledge('large_game')
             
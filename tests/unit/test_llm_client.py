@@ -0,0 +1,198 @@
+"""
+Test suite for the async LLM client.
+
+This module tests deadlines, bounded concurrency, retries of transient
+errors and the circuit breaker against the offline fake provider with
+injected latency and failures.
+"""
+
+import pytest
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import Mock
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from services.llm_client import (
+        CircuitBreaker,
+        CircuitOpenError,
+        LLMClient,
+        LLMTimeoutError,
+        is_transient
+    )
+    from services.llm_provider import FakeProvider
+except ImportError as e:
+    pytest.skip(f"LLM client module not available: {e}", allow_module_level=True)
+
+
+def client_for(provider, **kwargs):
+    kwargs.setdefault('base_delay', 0.001)
+    kwargs.setdefault('max_delay', 0.01)
+    return LLMClient(lambda: provider, **kwargs)
+
+
+def fake(**kwargs):
+    kwargs.setdefault('latency', 0)
+    kwargs.setdefault('tokens_per_second', 0)
+    return FakeProvider(reply="Roll through the sweep.", **kwargs)
+
+
+async def collect(stream):
+    return "".join([text async for text in stream])
+
+
+class TestRetries:
+    """Test cases for retrying failed calls."""
+
+    @pytest.mark.unit
+    def test_transient_errors_are_retried(self):
+        """Test connection errors are retried until the call succeeds."""
+        provider = fake(fail_calls=2)
+        client = client_for(provider)
+
+        assert asyncio.run(client.generate("Hi")) == "Roll through the sweep."
+        assert provider.calls == 3
+        assert client.snapshot()['retries'] == 2
+
+    @pytest.mark.unit
+    def test_retries_are_bounded(self):
+        """Test the last error is raised once retries are used up."""
+        provider = fake(error_rate=1)
+        client = client_for(provider, max_retries=2)
+
+        with pytest.raises(ConnectionError):
+            asyncio.run(client.generate("Hi"))
+        assert provider.calls == 3
+        assert client.snapshot()['failures'] == 1
+
+    @pytest.mark.unit
+    def test_other_errors_are_not_retried(self):
+        """Test errors that will not go away are raised at once."""
+        provider = Mock()
+        provider.generate_content.side_effect = ValueError("Prompt blocked")
+        client = client_for(provider)
+
+        with pytest.raises(ValueError):
+            asyncio.run(client.generate("Hi"))
+        assert provider.generate_content.call_count == 1
+
+    @pytest.mark.unit
+    def test_is_transient(self):
+        """Test timeouts, connection errors and retryable HTTP statuses count as transient."""
+        assert is_transient(TimeoutError())
+        assert is_transient(ConnectionResetError())
+        assert is_transient(Mock(code=503))
+        assert not is_transient(Mock(code=400))
+        assert not is_transient(ValueError())
+
+    @pytest.mark.unit
+    def test_stream_retries_before_first_chunk(self):
+        """Test a stream that fails to start is retried and then delivers the whole answer."""
+        provider = fake(fail_calls=1, tokens_per_chunk=1)
+        client = client_for(provider)
+
+        assert asyncio.run(collect(client.stream("Hi"))) == "Roll through the sweep."
+        assert provider.calls == 2
+
+
+class TestDeadlinesAndConcurrency:
+    """Test cases for per-call deadlines and the concurrency cap."""
+
+    @pytest.mark.unit
+    def test_slow_call_times_out(self):
+        """Test a call slower than its deadline fails when the deadline passes."""
+        client = client_for(fake(latency=2), timeout=0.2)
+
+        start = time.perf_counter()
+        with pytest.raises(LLMTimeoutError):
+            asyncio.run(client.generate("Hi"))
+
+        assert time.perf_counter() - start < 1
+        assert client.snapshot()['timeouts'] >= 1
+
+    @pytest.mark.unit
+    def test_slow_stream_times_out(self):
+        """Test a stream that does not start before the deadline fails."""
+        client = client_for(fake(latency=2), timeout=0.2)
+
+        with pytest.raises(LLMTimeoutError):
+            asyncio.run(collect(client.stream("Hi")))
+
+    @pytest.mark.unit
+    def test_concurrency_is_bounded(self):
+        """Test calls beyond the cap wait for a free slot."""
+        provider = fake(latency=0.1)
+        client = client_for(provider, max_concurrency=2)
+        peak = []
+
+        async def main():
+            async def watch():
+                while True:
+                    peak.append(client.in_flight)
+                    await asyncio.sleep(0.01)
+            watcher = asyncio.create_task(watch())
+            await asyncio.gather(*(client.generate("Hi") for _ in range(6)))
+            watcher.cancel()
+
+        start = time.perf_counter()
+        asyncio.run(main())
+
+        assert time.perf_counter() - start >= 0.3
+        assert max(peak) == 2
+        assert client.snapshot()['in_flight'] == 0
+
+
+class TestCircuitBreaker:
+    """Test cases for failing fast during outages."""
+
+    @pytest.mark.unit
+    def test_opens_then_recovers(self):
+        """Test repeated failures open the circuit and a later successful trial closes it."""
+        provider = fake(error_rate=1)
+        client = client_for(provider, max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.2))
+
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                asyncio.run(client.generate("Hi"))
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(client.generate("Hi"))
+        assert provider.calls == 2
+        assert client.snapshot()['breaker']['state'] == 'open'
+
+        time.sleep(0.25)
+        provider.error_rate = 0
+        assert asyncio.run(client.generate("Hi")) == "Roll through the sweep."
+        assert client.snapshot()['breaker'] == {'state': 'closed', 'failures': 0, 'times_opened': 1}
+
+    @pytest.mark.unit
+    def test_failed_trial_reopens(self):
+        """Test a failing trial call opens the circuit again and only one trial runs at a time."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.state == 'open'
+        assert breaker.times_opened == 2
+
+    @pytest.mark.unit
+    def test_non_transient_errors_keep_circuit_closed(self):
+        """Test errors from a reachable model do not count towards opening the circuit."""
+        provider = Mock()
+        provider.generate_content.side_effect = ValueError("Prompt blocked")
+        client = client_for(provider, breaker=CircuitBreaker(failure_threshold=1))
+
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                asyncio.run(client.generate("Hi"))
+
+        assert client.snapshot()['breaker']['state'] == 'closed'
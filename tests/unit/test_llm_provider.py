@@ -0,0 +1,123 @@
+"""
+Test suite for chat model providers.
+
+This module tests provider selection and the deterministic offline fake:
+its answers, streaming chunks, latency and token rate.
+"""
+
+import pytest
+import os
+import sys
+import time
+from unittest.mock import patch
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from services.llm_provider import FakeProvider, LLMProvider, create_provider, load_system_prompt
+except ImportError as e:
+    pytest.skip(f"LLM provider module not available: {e}", allow_module_level=True)
+
+
+class TestCreateProvider:
+    """Test cases for provider selection."""
+
+    @pytest.mark.unit
+    def test_fake_by_name(self):
+        """Test the fake provider is built by name with constructor arguments."""
+        provider = create_provider('FAKE', latency=0, answer_tokens=5)
+
+        assert isinstance(provider, FakeProvider)
+        assert provider.answer_tokens == 5
+
+    @pytest.mark.unit
+    def test_unknown_name(self):
+        """Test an unknown provider name is rejected."""
+        with pytest.raises(ValueError):
+            create_provider('nope')
+
+    @pytest.mark.unit
+    def test_incomplete_provider_is_rejected(self):
+        """Test a provider without generate_content fails when it is created."""
+        class Incomplete(LLMProvider):
+            name = 'incomplete'
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    @pytest.mark.unit
+    def test_gemini_gets_image_data_as_bytes(self):
+        """Test uploaded bytearrays are handed to the Gemini SDK as bytes."""
+        with patch('services.llm_provider.genai') as genai:
+            provider = create_provider('gemini', api_key='key', system_prompt='')
+            image = {'mime_type': 'image/webp', 'data': bytearray(b'RIFF')}
+
+            provider.generate_content(["What now?", image])
+
+        content = genai.GenerativeModel.return_value.generate_content.call_args.args[0]
+        assert content == ["What now?", {'mime_type': 'image/webp', 'data': b'RIFF'}]
+        assert type(content[1]['data']) is bytes
+
+    @pytest.mark.unit
+    def test_system_prompt_is_read(self):
+        """Test the shared system prompt loads from PROMPTS.txt."""
+        assert load_system_prompt().strip()
+
+
+class TestFakeProvider:
+    """Test cases for the offline fake provider."""
+
+    @pytest.mark.unit
+    def test_answer_is_deterministic(self):
+        """Test answers echo the prompt's first line and pad to the requested length."""
+        provider = FakeProvider(latency=0, tokens_per_second=0, answer_tokens=20)
+
+        first = provider.generate_content("\n  How do I beat Margit?\nMore context").text
+
+        assert first.startswith("This is a fake answer to: How do I beat Margit?")
+        assert len(first.split(" ")) == 20
+        assert provider.generate_content(["How do I beat Margit?", object()]).text == first
+
+    @pytest.mark.unit
+    def test_stream_joins_to_answer(self):
+        """Test streamed chunks join back to the full answer."""
+        provider = FakeProvider(reply="one two three four five", latency=0, tokens_per_second=0,
+                                tokens_per_chunk=2)
+
+        chunks = [chunk.text for chunk in provider.generate_content("Hi", stream=True)]
+
+        assert chunks == ["one two ", "three four ", "five"]
+
+    @pytest.mark.unit
+    def test_latency_and_token_rate(self):
+        """Test the first chunk waits for the latency and later chunks follow the token rate."""
+        provider = FakeProvider(reply="a b c d e f", latency=0.05, tokens_per_second=100,
+                                tokens_per_chunk=2)
+
+        start = time.perf_counter()
+        stream = provider.generate_content("Hi", stream=True)
+        next(stream)
+        ttft = time.perf_counter() - start
+        list(stream)
+        total = time.perf_counter() - start
+
+        assert 0.05 <= ttft < 0.5
+        assert total >= 0.05 + 0.04
+
+    @pytest.mark.unit
+    def test_injected_failures_and_timeouts(self):
+        """Test the fake fails its first calls on request and times out like a request would."""
+        provider = FakeProvider(latency=0, tokens_per_second=0, fail_calls=1)
+        with pytest.raises(ConnectionError):
+            provider.generate_content("Hi")
+        assert provider.generate_content("Hi").text
+        assert provider.calls == 2
+
+        slow = FakeProvider(latency=1, tokens_per_second=0)
+        start = time.perf_counter()
+        with pytest.raises(TimeoutError):
+            slow.generate_content("Hi", timeout=0.05)
+        assert time.perf_counter() - start < 0.5
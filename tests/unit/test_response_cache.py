@@ -0,0 +1,204 @@
+"""
+Test suite for the semantic response cache.
+
+This module tests similarity lookups scoped per game, LRU and TTL
+eviction, invalidation when a game's knowledge changes, and how
+chat_with_gemini uses the cache.
+"""
+
+import pytest
+import os
+import sys
+import numpy as np
+from unittest.mock import Mock, patch
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from services.response_cache import ResponseCache
+except ImportError as e:
+    pytest.skip(f"Response cache module not available: {e}", allow_module_level=True)
+
+
+HELLO = {'user_message': "hi", 'assistant_response': "Hello!", 'timestamp': "2025-01-01T12:00:00"}
+
+
+def vector(*values):
+    return np.array([values], dtype=np.float32)
+
+
+class TestResponseCache:
+    """Test cases for the ResponseCache class."""
+
+    @pytest.mark.unit
+    def test_similar_query_hits(self):
+        """Test a query close enough to a cached one returns its answer."""
+        cache = ResponseCache(threshold=0.9)
+        cache.put('Elden Ring', 'how do I beat Malenia', vector(1, 0, 0), "Bleed her.")
+
+        assert cache.get('elden ring', vector(0.95, 0.1, 0)) == "Bleed her."
+        assert cache.get('elden ring', vector(0, 1, 0)) is None
+
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == 0.5
+        assert stats['last_similarity'] > 0.9
+
+    @pytest.mark.unit
+    def test_games_are_separate(self):
+        """Test answers are never shared between games."""
+        cache = ResponseCache()
+        cache.put('elden ring', 'best build', vector(1, 0), "Strength.")
+
+        assert cache.get('minecraft', vector(1, 0)) is None
+
+    @pytest.mark.unit
+    def test_best_match_wins_and_size_is_bounded(self):
+        """Test the most similar answer is returned and old answers are evicted."""
+        cache = ResponseCache(threshold=0.5, max_size=2)
+        cache.put('game', 'a', vector(1, 0), "A")
+        cache.put('game', 'b', vector(0.8, 0.6), "B")
+        assert cache.get('game', vector(0.7, 0.7)) == "B"
+
+        cache.put('game', 'c', vector(0, 1), "C")
+
+        assert cache.get_stats()['entries'] == {'game': 2}
+        assert cache.get('game', vector(1, 0)) == "B"
+
+    @pytest.mark.unit
+    def test_ttl_expiry(self):
+        """Test answers older than the TTL are dropped."""
+        cache = ResponseCache(ttl=10)
+        with patch('services.response_cache.time.time', return_value=1000):
+            cache.put('game', 'q', vector(1, 0), "A")
+        with patch('services.response_cache.time.time', return_value=1011):
+            assert cache.get('game', vector(1, 0)) is None
+        assert cache.get_stats()['entries'] == {'game': 0}
+
+    @pytest.mark.unit
+    def test_invalidate_game(self):
+        """Test invalidation drops only that game's answers."""
+        cache = ResponseCache()
+        cache.put('Elden Ring', 'q', vector(1, 0), "A")
+        cache.put('minecraft', 'q', vector(1, 0), "B")
+
+        cache.invalidate_game('ELDEN RING')
+
+        assert cache.get('elden ring', vector(1, 0)) is None
+        assert cache.get('minecraft', vector(1, 0)) == "B"
+        assert cache.get_stats()['invalidations'] == 1
+
+    @pytest.mark.unit
+    def test_zero_embedding_rejected(self):
+        """Test an empty embedding cannot be cached."""
+        with pytest.raises(ValueError):
+            ResponseCache().put('game', 'q', vector(0, 0), "A")
+
+
+class TestKnowledgeListeners:
+    """Test cases for invalidation when a game's knowledge changes."""
+
+    @pytest.mark.unit
+    def test_knowledge_changed_notifies_listeners(self):
+        """Test listeners get the game name, and a failing listener does not stop the others."""
+        from services import vector_service as vector_module
+
+        service = vector_module.VectorService.__new__(vector_module.VectorService)
+        service.query_cache = Mock()
+        calls = []
+        listeners = [Mock(side_effect=RuntimeError("boom")), calls.append]
+
+        with patch.object(vector_module, '_knowledge_listeners', listeners):
+            service.knowledge_changed('Elden Ring')
+
+        service.query_cache.invalidate_game.assert_called_once_with('Elden Ring')
+        assert calls == ['Elden Ring']
+
+
+class TestChatResponseCache:
+    """Test cases for the response cache in chat_with_gemini."""
+
+    @pytest.fixture
+    def chatbot(self):
+        try:
+            from services import chatbot
+        except ImportError as e:
+            pytest.skip(f"Chatbot module not available: {e}")
+        embeddings = {
+            "how do I beat malenia": vector(1, 0),
+            "malenia tips": vector(0.96, 0.28),
+            "what is the best build": vector(0, 1),
+            "how do I beat her": vector(0.6, 0.8),
+        }
+        with patch.object(chatbot, 'response_cache', ResponseCache(threshold=0.9)), \
+             patch('services.chatbot.lazy_status', return_value={'state': 'ready'}), \
+             patch('services.chatbot.detect_current_game', return_value='elden ring'), \
+             patch('services.vector_service.embed_query', side_effect=lambda query: embeddings[query]), \
+             patch('services.vector_service.search_knowledge', return_value=[]):
+            yield chatbot
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_similar_question_skips_model(self, chatbot):
+        """Test a rephrased question is answered from the cache, and a different one is not."""
+        answers = [Mock(text="Use bleed."), Mock(text="Go strength.")]
+        with patch('services.chatbot.model.generate_content', side_effect=answers) as mock_generate:
+            first = await chatbot.chat_with_gemini("how do I beat malenia")
+            second = await chatbot.chat_with_gemini("malenia tips")
+            third = await chatbot.chat_with_gemini("what is the best build")
+
+        assert first == second == {"response": "Use bleed."}
+        assert third == {"response": "Go strength."}
+        assert mock_generate.call_count == 2
+        assert chatbot.response_cache.get_stats()['hits'] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_uncacheable_questions(self, chatbot):
+        """Test screenshot questions and cold embedders bypass the cache."""
+        with patch('services.chatbot.model.generate_content', return_value=Mock(text="Answer")), \
+             patch('services.chatbot.get_recent_screenshots', return_value=[]), \
+             patch('services.chatbot.get_screenshot_stats',
+                   return_value={'total_screenshots': 0, 'applications': []}):
+            await chatbot.chat_with_gemini("show me my screen")
+            with patch('services.chatbot.lazy_status', return_value={'state': 'warming'}):
+                await chatbot.chat_with_gemini("how do I beat malenia")
+
+        assert chatbot.response_cache.get_stats()['entries'] == {}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_follow_up_with_history_bypasses_cache(self, chatbot):
+        """Test standalone questions are cached with history present, but follow-ups that refer to it are not."""
+        margit = {'user_message': "who is margit", 'assistant_response': "A boss.", 'timestamp': "2025-01-01T12:00:00"}
+        answers = [Mock(text="Use bleed."), Mock(text="Parry her."), Mock(text="Roll his swings.")]
+        with patch('services.chatbot.model.generate_content', side_effect=answers) as mock_generate:
+            first = await chatbot.chat_with_gemini("how do I beat malenia")
+            second = await chatbot.chat_with_gemini("how do I beat malenia", history=[HELLO])
+            third = await chatbot.chat_with_gemini("how do I beat her", history=[HELLO])
+            fourth = await chatbot.chat_with_gemini("how do I beat her", history=[margit])
+
+        assert first == second == {"response": "Use bleed."}
+        assert [third, fourth] == [{"response": "Parry her."}, {"response": "Roll his swings."}]
+        assert mock_generate.call_count == 3
+        assert chatbot.response_cache.get_stats()['hits'] == 1
+
+    @pytest.mark.unit
+    def test_repeated_question_through_router_hits_cache(self, chatbot, chat_client, chat_history, chat_model):
+        """Test /chat answers a repeated question from the cache although each request loads history."""
+        chat_history.get_recent_history.return_value = [HELLO]
+        with patch('services.chatbot.detect_current_game', return_value='elden ring'):
+            answers = [chat_client.post("/chat", json={"message": "how do I beat malenia"}).json()
+                       for _ in range(3)]
+            chat_client.post("/chat", json={"message": "how do I beat her"})
+            chat_client.post("/chat", json={"message": "how do I beat her"})
+
+        assert all(answer["response"] == chat_model.reply for answer in answers)
+        assert chat_model.generate_content.call_count == 3
+        stats = chatbot.response_cache.get_stats()
+        assert stats['hits'] == 2
+        assert stats['misses'] == 1
@@ -0,0 +1,249 @@
+"""
+Test suite for the async scraper module.
+
+These tests run the scraper against a local HTTP stand-in server to
+check concurrency limits, rate limiting and parse pipelining.
+"""
+
+import pytest
+import os
+import sys
+import time
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from services.scraper import AsyncScraper, TokenBucket, run_coroutine
+except ImportError as e:
+    pytest.skip(f"Scraper module not available: {e}", allow_module_level=True)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves /page/<n> with a small delay and /missing with a 404."""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.request_times.append(time.monotonic())
+        try:
+            time.sleep(server.delay)
+            if self.path.startswith('/missing'):
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = f"<html><body><p>Page {self.path}</p></body></html>".encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in_server():
+    """Start a local HTTP server in a background thread."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    server.lock = threading.Lock()
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.request_times = []
+    server.delay = 0.05
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def base_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def parse_text(url, response):
+    response.raise_for_status()
+    return response.text
+
+
+class TestAsyncScraper:
+    """Test cases for the AsyncScraper class."""
+
+    @pytest.mark.unit
+    def test_scrape_all_returns_results_in_job_order(self, stand_in_server):
+        """Test results line up with the submitted jobs."""
+        scraper = AsyncScraper(requests_per_second=1000, burst=1000, per_host_concurrency=4)
+        urls = [f"{base_url(stand_in_server)}/page/{i}" for i in range(6)]
+
+        results = scraper.scrape_all([(url, parse_text) for url in urls])
+
+        assert [f"Page /page/{i}" in result for i, result in enumerate(results)] == [True] * 6
+
+    @pytest.mark.unit
+    def test_failed_fetch_yields_none(self, stand_in_server):
+        """Test HTTP errors are reported as None without failing other pages."""
+        scraper = AsyncScraper(requests_per_second=1000, burst=1000)
+        jobs = [(f"{base_url(stand_in_server)}/missing", parse_text),
+                (f"{base_url(stand_in_server)}/page/1", parse_text)]
+
+        results = scraper.scrape_all(jobs)
+
+        assert results[0] is None
+        assert "Page /page/1" in results[1]
+
+    @pytest.mark.unit
+    def test_per_host_concurrency_limit(self, stand_in_server):
+        """Test no more than per_host_concurrency requests hit a host at once."""
+        stand_in_server.delay = 0.1
+        scraper = AsyncScraper(requests_per_second=1000, burst=1000, per_host_concurrency=2)
+        urls = [f"{base_url(stand_in_server)}/page/{i}" for i in range(8)]
+
+        scraper.scrape_all([(url, parse_text) for url in urls])
+
+        assert stand_in_server.max_in_flight == 2
+
+    @pytest.mark.unit
+    def test_busy_host_does_not_block_other_hosts(self, stand_in_server):
+        """Test a job for another host is not queued behind a busy host's jobs."""
+        stand_in_server.delay = 0.1
+        scraper = AsyncScraper(requests_per_second=1000, burst=1000, max_concurrency=4, per_host_concurrency=1)
+        port = stand_in_server.server_address[1]
+        urls = [f"http://127.0.0.1:{port}/page/{i}" for i in range(8)] + [f"http://localhost:{port}/page/other"]
+        finished = {}
+
+        def parse(url, response):
+            finished[url] = time.monotonic()
+            return response.status_code
+
+        start = time.monotonic()
+        scraper.scrape_all([(url, parse) for url in urls])
+
+        assert finished[urls[-1]] - start < 0.5
+        assert max(finished.values()) - start >= 8 * 0.1
+
+    @pytest.mark.unit
+    def test_pages_are_fetched_concurrently(self, stand_in_server):
+        """Test total time is well below fetching the pages one by one."""
+        stand_in_server.delay = 0.2
+        scraper = AsyncScraper(requests_per_second=1000, burst=1000, per_host_concurrency=8)
+        urls = [f"{base_url(stand_in_server)}/page/{i}" for i in range(8)]
+
+        start = time.monotonic()
+        scraper.scrape_all([(url, parse_text) for url in urls])
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 8 * 0.2 / 2
+
+    @pytest.mark.unit
+    def test_rate_limit_spaces_requests(self, stand_in_server):
+        """Test the token bucket spaces requests to one host."""
+        stand_in_server.delay = 0
+        scraper = AsyncScraper(requests_per_second=20, burst=1, per_host_concurrency=4)
+        urls = [f"{base_url(stand_in_server)}/page/{i}" for i in range(5)]
+
+        scraper.scrape_all([(url, parse_text) for url in urls])
+
+        times = sorted(stand_in_server.request_times)
+        assert times[-1] - times[0] >= 4 / 20 * 0.9
+
+    @pytest.mark.unit
+    def test_parse_runs_off_event_loop(self, stand_in_server):
+        """Test parsing happens in worker threads, not on the loop thread."""
+        threads = []
+
+        def parse(url, response):
+            threads.append(threading.current_thread())
+            return response.status_code
+
+        scraper = AsyncScraper(requests_per_second=1000, burst=1000)
+        scraper.scrape_all([(f"{base_url(stand_in_server)}/page/1", parse)])
+
+        assert threads and threads[0] is not threading.main_thread()
+
+    @pytest.mark.unit
+    def test_headers_for_adds_request_headers(self, stand_in_server):
+        """Test per-URL headers are passed to fetch."""
+        seen = []
+        scraper = AsyncScraper(requests_per_second=1000, burst=1000)
+        original_fetch = scraper.fetch
+
+        async def recording_fetch(client, url, headers=None):
+            seen.append(headers)
+            return await original_fetch(client, url, headers)
+
+        scraper.fetch = recording_fetch
+        scraper.scrape_all([(f"{base_url(stand_in_server)}/page/1", parse_text)],
+                           headers_for=lambda url: {'X-Test': '1'})
+
+        assert seen == [{'X-Test': '1'}]
+
+    @pytest.mark.unit
+    def test_iter_scrape_streams_all_results(self, stand_in_server):
+        """Test the blocking generator yields every job once."""
+        scraper = AsyncScraper(requests_per_second=1000, burst=1000, per_host_concurrency=4)
+        urls = [f"{base_url(stand_in_server)}/page/{i}" for i in range(6)]
+
+        results = dict(scraper.iter_scrape([(url, parse_text) for url in urls], max_pending=2))
+
+        assert sorted(results) == list(range(6))
+        assert all(f"Page /page/{i}" in results[i] for i in range(6))
+
+    @pytest.mark.unit
+    def test_iter_scrape_pauses_for_slow_consumer(self, stand_in_server):
+        """Test fetching stops while the consumer is not taking results."""
+        stand_in_server.delay = 0
+        scraper = AsyncScraper(requests_per_second=1000, burst=1000, per_host_concurrency=4)
+        urls = [f"{base_url(stand_in_server)}/page/{i}" for i in range(20)]
+
+        results = scraper.iter_scrape([(url, parse_text) for url in urls], max_pending=2)
+        next(results)
+        time.sleep(0.5)
+        fetched_while_paused = len(stand_in_server.request_times)
+        results.close()
+
+        assert fetched_while_paused <= 6
+
+
+class TestTokenBucket:
+    """Test cases for the TokenBucket class."""
+
+    @pytest.mark.unit
+    def test_burst_then_wait(self):
+        """Test a bucket allows a burst and then throttles."""
+        async def acquire_many():
+            bucket = TokenBucket(rate=20, capacity=2)
+            start = time.monotonic()
+            for _ in range(4):
+                await bucket.acquire()
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(acquire_many())
+
+        assert elapsed >= 2 / 20 * 0.9
+
+
+class TestRunCoroutine:
+    """Test cases for run_coroutine."""
+
+    @pytest.mark.unit
+    def test_run_coroutine_inside_running_loop(self):
+        """Test a coroutine can be run from code already inside an event loop."""
+        async def value():
+            return 42
+
+        async def outer():
+            return run_coroutine(value())
+
+        assert asyncio.run(outer()) == 42
@@ -10,6 +10,7 @@ import os
 import sys
 import tempfile
 import shutil
+import numpy as np
 from unittest.mock import Mock, patch, MagicMock
 
 # Add project root to path
@@ -130,11 +131,14 @@ class TestVectorService:
         service = VectorService()
         service.embedding_model = mock_embedding_model
         
-        texts = ["Test text 1", "Test text 2"]
+        texts = ["Test text 1", "Test text 2", "Test text 1"]
         result = service.generate_embeddings(texts)
         
-        assert result == [[0.1, 0.2, 0.3, 0.4, 0.5]]
-        mock_embedding_model.encode.assert_called_once_with(texts)
+        assert result.shape == (3, 5)
+        assert result.dtype == np.float32
+        # Duplicate texts are embedded only once
+        mock_embedding_model.encode.assert_called_once()
+        assert sorted(mock_embedding_model.encode.call_args[0][0]) == ["Test text 1", "Test text 2"]
     
     @pytest.mark.unit
     def test_generate_embeddings_no_model(self):
@@ -145,7 +149,7 @@ class TestVectorService:
         texts = ["Test text"]
         result = service.generate_embeddings(texts)
         
-        assert result == []
+        assert len(result) == 0
     
     @pytest.mark.unit
     def test_generate_embeddings_error(self, mock_embedding_model):
@@ -158,7 +162,7 @@ class TestVectorService:
         texts = ["Test text"]
         result = service.generate_embeddings(texts)
         
-        assert result == []
+        assert len(result) == 0
     
     @pytest.mark.unit
     def test_chunk_text_simple(self):
@@ -166,7 +170,7 @@ class TestVectorService:
         service = VectorService()
         
         text = "This is sentence one. This is sentence two. This is sentence three. "
-        result = service.chunk_text(text, max_length=50)
+        result = service.chunk_text(text, max_tokens=8)
         
         # Implementation may group sentences; ensure all expected phrases appear across chunks
         assert len(result) >= 2
@@ -181,21 +185,21 @@ class TestVectorService:
         service = VectorService()
         
         text = "This is a very long sentence that exceeds the maximum length limit. " * 10
-        result = service.chunk_text(text, max_length=100)
+        result = service.chunk_text(text, max_tokens=20)
         
         assert len(result) > 1
         for chunk in result:
-            assert len(chunk) <= 100
+            assert service.chunker.count_tokens(chunk) <= 20
     
     @pytest.mark.unit
     def test_chunk_text_empty(self):
         """Test text chunking with empty text."""
         service = VectorService()
         
-        result = service.chunk_text("", max_length=100)
+        result = service.chunk_text("", max_tokens=100)
         assert result == []
         
-        result = service.chunk_text(None, max_length=100)
+        result = service.chunk_text(None, max_tokens=100)
         assert result == []
     
     @pytest.mark.unit
@@ -204,7 +208,7 @@ class TestVectorService:
         service = VectorService()
         
         text = "This is a single sentence."
-        result = service.chunk_text(text, max_length=100)
+        result = service.chunk_text(text, max_tokens=100)
         
         assert len(result) == 1
         assert result[0].startswith("This is a single sentence.")
@@ -224,8 +228,8 @@ class TestVectorService:
             
             # Verify collections were created
             assert mock_chroma_client.get_collection.call_count >= 1
-            # add() may be called multiple times; assert at least once per non-empty type
-            assert mock_chroma_collection.add.call_count >= 1
+            # upsert() may be called multiple times; assert at least once per non-empty type
+            assert mock_chroma_collection.upsert.call_count >= 1
     
     @pytest.mark.unit
     def test_add_game_knowledge_no_client(self, mock_knowledge_data):
@@ -618,11 +622,11 @@ class TestVectorServiceEdgeCases:
         service = VectorService()
         
         long_sentence = "This is an extremely long sentence that goes on and on and on. " * 50
-        result = service.chunk_text(long_sentence, max_length=100)
+        result = service.chunk_text(long_sentence, max_tokens=20)
         
         assert len(result) > 1
         for chunk in result:
-            assert len(chunk) <= 100
+            assert service.chunker.count_tokens(chunk) <= 20
     
     @pytest.mark.unit
     def test_search_knowledge_with_empty_query(self, mock_chroma_client, mock_embedding_model):
@@ -0,0 +1,633 @@
+"""
+Test suite for the vector service against a real Chroma client.
+
+These tests cover incremental ingestion and the collection layouts using
+an on-disk Chroma client in a temporary directory with a small
+deterministic fake embedding model.
+"""
+
+import pytest
+import os
+import sys
+import hashlib
+import threading
+import time
+import numpy as np
+from unittest.mock import Mock, patch
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from services.vector_service import VectorService
+    from services.vector_store import VectorStore
+except ImportError as e:
+    pytest.skip(f"Vector service module not available: {e}", allow_module_level=True)
+
+
+def fake_encode(texts, **kwargs):
+    """Deterministic 8-dim unit vectors derived from the text hash."""
+    rows = []
+    for text in texts:
+        digest = hashlib.sha256(text.encode('utf-8')).digest()
+        vector = np.frombuffer(digest[:8], dtype=np.uint8).astype(np.float32) + 1.0
+        rows.append(vector / np.linalg.norm(vector))
+    return np.array(rows, dtype=np.float32)
+
+
+def make_knowledge(wiki_content, forum_content=None):
+    """Build knowledge per content type with a wiki and optional forum page."""
+    knowledge = {
+        'wiki': [{
+            'url': 'https://example.com/wiki1',
+            'title': 'Test Wiki Page',
+            'description': 'Wiki description',
+            'content': wiki_content
+        }],
+        'youtube': [],
+        'forum': []
+    }
+    if forum_content:
+        knowledge['forum'].append({
+            'url': 'https://forum.com/thread1',
+            'title': 'Test Forum Thread',
+            'description': 'Forum description',
+            'content': forum_content
+        })
+    return knowledge
+
+
+def stream_knowledge(knowledge):
+    """Patch the ingestion source to stream the given knowledge dict."""
+    def iter_knowledge(game_name):
+        for content_type, entries in knowledge.items():
+            for entry in entries:
+                yield content_type, entry
+    return patch('services.vector_service.iter_game_knowledge', side_effect=iter_knowledge)
+
+
+def make_service(vector_db_dir, **kwargs):
+    """VectorService backed by a temporary Chroma directory and fake model."""
+    with patch('services.vector_service.SentenceTransformer'), \
+         patch('services.vector_service.EMBEDDING_CACHE_ENABLED', False):
+        service = VectorService(vector_db_dir=vector_db_dir, **kwargs)
+    model = Mock()
+    model.tokenizer = None
+    model.encode = Mock(side_effect=fake_encode)
+    service.embedding_model = model
+    return service
+
+
+@pytest.fixture
+def service(temp_vector_db_dir):
+    """Per-content-type collection layout."""
+    return make_service(temp_vector_db_dir)
+
+
+@pytest.fixture
+def unified_service(temp_vector_db_dir):
+    """Single collection per game layout."""
+    return make_service(temp_vector_db_dir, unified_collections=True)
+
+
+class TestIncrementalIngestion:
+    """Test cases for idempotent re-ingestion."""
+
+    @pytest.mark.unit
+    def test_chunk_id_is_deterministic(self, service):
+        """Test chunk ids depend only on content type, url and text."""
+        first = service.chunk_id('wiki', 'https://example.com', 'Some chunk.')
+        second = service.chunk_id('wiki', 'https://example.com', 'Some chunk.')
+        other = service.chunk_id('wiki', 'https://example.com/other', 'Some chunk.')
+
+        assert first == second
+        assert first != other
+        assert first.startswith('wiki_')
+
+    @pytest.mark.unit
+    def test_reprocessing_keeps_collection_size(self, service):
+        """Test re-running ingestion on unchanged pages adds nothing."""
+        content = "The first sentence is here. " * 40
+        with stream_knowledge(make_knowledge(content)):
+            assert service.add_game_knowledge('test_game') is True
+            count = service.get_or_create_collection('test_game', 'wiki').count()
+            calls = service.embedding_model.encode.call_count
+
+            assert service.add_game_knowledge('test_game') is True
+
+        assert count > 0
+        assert service.get_or_create_collection('test_game', 'wiki').count() == count
+        # Unchanged chunks are never re-embedded
+        assert service.embedding_model.encode.call_count == calls
+
+    @pytest.mark.unit
+    def test_changed_page_replaces_stale_chunks(self, service):
+        """Test chunks that disappear from a page are deleted."""
+        with stream_knowledge(make_knowledge("Old content about the boss. Old tips here.")):
+            service.add_game_knowledge('test_game')
+
+        with stream_knowledge(make_knowledge("New content about the boss. New tips here.")):
+            service.add_game_knowledge('test_game')
+
+        stored = service.get_or_create_collection('test_game', 'wiki').get(include=['documents'])
+        assert len(stored['ids']) == 1
+        assert 'New content' in stored['documents'][0]
+
+    @pytest.mark.unit
+    def test_failed_embedding_keeps_stale_chunks(self, service):
+        """Test a changed page whose new chunks fail to embed keeps its old chunks."""
+        with stream_knowledge(make_knowledge("Old content about the boss. Old tips here.")):
+            service.add_game_knowledge('test_game')
+
+        service.embedding_model.encode.side_effect = RuntimeError("out of memory")
+        with stream_knowledge(make_knowledge("New content about the boss. New tips here.")):
+            service.add_game_knowledge('test_game')
+
+        stored = service.get_or_create_collection('test_game', 'wiki').get(include=['documents'])
+        assert stored['documents'] == ["Old content about the boss. Old tips here."]
+        assert service.get_ingest_progress('test_game')['stages']['upsert']['deleted'] == 0
+
+    @pytest.mark.unit
+    def test_failed_page_keeps_existing_chunks(self, service):
+        """Test a page missing from a run keeps its previously stored chunks."""
+        with stream_knowledge(make_knowledge("Stable content about crafting.")):
+            service.add_game_knowledge('test_game')
+
+        empty = {'wiki': [], 'youtube': [], 'forum': []}
+        with stream_knowledge(empty):
+            service.add_game_knowledge('test_game')
+
+        assert service.get_or_create_collection('test_game', 'wiki').count() == 1
+
+    @pytest.mark.unit
+    def test_removed_row_deletes_its_chunks(self, service):
+        """Test pages no longer listed in the CSV are deleted, while listed pages that failed keep theirs."""
+        listed = {'wiki': {'https://example.com/wiki1'}, 'youtube': set(), 'forum': {'https://forum.com/thread1'}}
+        with stream_knowledge(make_knowledge("Wiki content about crafting.", "Forum thread about bosses.")), \
+             patch('services.vector_service.list_source_urls', return_value=listed):
+            service.add_game_knowledge('test_game')
+
+        # The forum row was removed and the wiki page failed to fetch
+        listed['forum'] = set()
+        empty = {'wiki': [], 'youtube': [], 'forum': []}
+        with stream_knowledge(empty), patch('services.vector_service.list_source_urls', return_value=listed):
+            assert service.add_game_knowledge('test_game') is True
+
+        assert service.get_or_create_collection('test_game', 'wiki').count() == 1
+        assert service.get_or_create_collection('test_game', 'forum').count() == 0
+        assert service.get_ingest_progress('test_game')['stages']['upsert']['deleted'] == 1
+
+
+class TestCollectionLayouts:
+    """Test cases for per-type and unified collection search."""
+
+    @pytest.mark.unit
+    def test_search_fans_out_over_content_types(self, service):
+        """Test per-type collections are all searched and merged."""
+        knowledge = make_knowledge("Wiki text about swords", "Forum text about swords")
+        with stream_knowledge(knowledge):
+            service.add_game_knowledge('test_game')
+
+        results = service.search_knowledge('test_game', 'Wiki text about swords', limit=5)
+
+        assert {r['content_type'] for r in results} == {'wiki', 'forum'}
+        assert results[0]['content'] == 'Wiki text about swords'
+        assert results == sorted(results, key=lambda r: r['distance'])
+
+    @pytest.mark.unit
+    def test_unified_collection_uses_single_query(self, unified_service):
+        """Test unified mode stores every type in one collection and queries it once."""
+        unified_service.brute_force_max_vectors = 0  # Query Chroma rather than the in-process index
+        knowledge = make_knowledge("Wiki text about swords", "Forum text about swords")
+        with stream_knowledge(knowledge):
+            unified_service.add_game_knowledge('test_game')
+
+        names = [c.name for c in unified_service.chroma_client.list_collections()]
+        assert names == ['test_game_knowledge']
+
+        collection = unified_service.collections['test_game_knowledge']
+        with patch.object(collection, 'query', wraps=collection.query) as mock_query:
+            results = unified_service.search_knowledge('test_game', 'swords', limit=5)
+        assert mock_query.call_count == 1
+        assert {r['content_type'] for r in results} == {'wiki', 'forum'}
+
+    @pytest.mark.unit
+    def test_unified_collection_filters_content_types(self, unified_service):
+        """Test the where filter restricts results to the requested types."""
+        knowledge = make_knowledge("Wiki text about swords", "Forum text about swords")
+        with stream_knowledge(knowledge):
+            unified_service.add_game_knowledge('test_game')
+
+        results = unified_service.search_knowledge('test_game', 'swords', content_types=['forum'])
+
+        assert [r['content_type'] for r in results] == ['forum']
+        assert unified_service.get_game_stats('test_game') == {'wiki': 1, 'youtube': 0, 'forum': 1}
+
+    @pytest.mark.unit
+    def test_unified_delete_removes_collection(self, unified_service):
+        """Test deleting a game's knowledge drops its unified collection."""
+        with stream_knowledge(make_knowledge("Wiki text about swords.")):
+            unified_service.add_game_knowledge('test_game')
+
+        assert unified_service.delete_game_knowledge('test_game') is True
+        assert unified_service.chroma_client.list_collections() == []
+
+
+class TestCollectionRegistry:
+    """Test cases for the collection registry and cached counts."""
+
+    @pytest.mark.unit
+    def test_search_makes_no_metadata_round_trips(self, service):
+        """Test searches, including of missing collections, never look collections up."""
+        with stream_knowledge(make_knowledge("Wiki text about swords.")):
+            service.add_game_knowledge('test_game')
+
+        with patch.object(service.chroma_client, 'get_collection') as get_collection, \
+             patch.object(service.chroma_client, 'list_collections') as list_collections:
+            assert service.search_knowledge('test_game', 'swords')
+            assert service.search_knowledge('other_game', 'swords') == []
+            assert service.get_or_create_collection('test_game', 'wiki') is service.collections['test_game_wiki']
+
+        get_collection.assert_not_called()
+        list_collections.assert_not_called()
+
+    @pytest.mark.unit
+    def test_stats_use_cached_counts(self, service):
+        """Test stats are counted once and recounted after a write."""
+        with stream_knowledge(make_knowledge("Wiki text about swords.", "Forum text about shields.")):
+            service.add_game_knowledge('test_game')
+
+        with patch('chromadb.api.models.Collection.Collection.count', return_value=1) as count:
+            assert service.get_game_stats('test_game') == {'wiki': 1, 'youtube': 0, 'forum': 1}
+            service.get_game_stats('test_game')
+        assert count.call_count == 2
+
+        with stream_knowledge(make_knowledge("Wiki text about swords.\n\nAnd a second paragraph about armor.")), \
+             patch('services.vector_service.CHUNK_MAX_TOKENS', 8):
+            service._chunker = None
+            service.add_game_knowledge('test_game')
+
+        assert service.get_game_stats('test_game')['wiki'] > 1
+
+    @pytest.mark.unit
+    def test_registry_is_loaded_from_disk(self, service, temp_vector_db_dir):
+        """Test a store opened on an existing directory lists its collections."""
+        with stream_knowledge(make_knowledge("Wiki text about swords.")):
+            service.add_game_knowledge('test_game')
+
+        assert set(VectorStore(temp_vector_db_dir).collections) == {'test_game_wiki'}
+
+        service.delete_game_knowledge('test_game')
+        assert service.collections == {}
+        assert service.get_game_stats('test_game') == {'wiki': 0, 'youtube': 0, 'forum': 0}
+
+
+class TestQueryCaching:
+    """Test cases for the query cache inside search_knowledge."""
+
+    @pytest.mark.unit
+    def test_repeated_query_is_served_from_cache(self, service):
+        """Test an equivalent repeated query skips embedding and Chroma."""
+        with stream_knowledge(make_knowledge("Wiki text about swords")):
+            service.add_game_knowledge('test_game')
+
+        first = service.search_knowledge('test_game', 'Best sword')
+        calls = service.embedding_model.encode.call_count
+        second = service.search_knowledge('test_game', '  best   SWORD ')
+
+        assert second == first
+        assert service.embedding_model.encode.call_count == calls
+        assert service.get_cache_stats()['result_hits'] == 1
+
+    @pytest.mark.unit
+    def test_reingest_invalidates_cached_results(self, service):
+        """Test changed knowledge is visible to the next search."""
+        with stream_knowledge(make_knowledge("Old text about swords")):
+            service.add_game_knowledge('test_game')
+        assert service.search_knowledge('test_game', 'swords')[0]['content'] == 'Old text about swords'
+
+        with stream_knowledge(make_knowledge("New text about swords")):
+            service.add_game_knowledge('test_game')
+
+        assert service.search_knowledge('test_game', 'swords')[0]['content'] == 'New text about swords'
+
+    @pytest.mark.unit
+    def test_delete_invalidates_cached_results(self, service):
+        """Test deleting a game's knowledge clears its cached results."""
+        with stream_knowledge(make_knowledge("Wiki text about swords")):
+            service.add_game_knowledge('test_game')
+        assert service.search_knowledge('test_game', 'swords')
+
+        service.delete_game_knowledge('test_game')
+
+        assert service.search_knowledge('test_game', 'swords') == []
+
+
+class TestStreamingIngestion:
+    """Test cases for the scrape -> chunk -> embed -> upsert pipeline."""
+
+    @staticmethod
+    def pages(count):
+        for i in range(count):
+            yield 'wiki', {'url': f'https://example.com/wiki{i}', 'title': f'Page {i}',
+                           'description': '', 'content': f"Page {i} text about swords"}
+
+    @pytest.mark.unit
+    def test_progress_is_reported_per_stage(self, service):
+        """Test every stage reports its counters and the run is tracked per game."""
+        updates = []
+        with patch('services.vector_service.iter_game_knowledge', return_value=self.pages(5)):
+            assert service.add_game_knowledge('test_game', on_progress=lambda stage, snap: updates.append(stage))
+
+        progress = service.get_ingest_progress('test_game')
+        assert progress['state'] == 'done'
+        assert progress['stages']['scrape']['pages'] == 5
+        assert progress['stages']['chunk'] == {'pages': 5, 'chunks': 5, 'unchanged': 0}
+        assert progress['stages']['embed']['chunks'] == 5
+        assert progress['stages']['upsert']['chunks'] == 5
+        assert set(updates) == {'scrape', 'chunk', 'embed', 'upsert'}
+        assert service.get_or_create_collection('test_game', 'wiki').count() == 5
+
+    @pytest.mark.unit
+    def test_vectors_land_before_scraping_finishes(self, service):
+        """Test the first page is searchable while later pages are still being produced."""
+        collection = service.get_or_create_collection('test_game', 'wiki')
+        seen_early = []
+
+        def source(game_name):
+            pages = self.pages(2)
+            yield next(pages)
+            deadline = time.monotonic() + 5
+            while collection.count() == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            seen_early.append(collection.count())
+            yield next(pages)
+
+        with patch('services.vector_service.iter_game_knowledge', side_effect=source):
+            service.add_game_knowledge('test_game')
+
+        assert seen_early == [1]
+        assert collection.count() == 2
+
+    @pytest.mark.unit
+    def test_slow_embedding_applies_backpressure(self, service):
+        """Test a stalled stage stops the source from being drained."""
+        release = threading.Event()
+        pulled = []
+
+        def blocking_encode(texts, **kwargs):
+            release.wait(5)
+            return fake_encode(texts)
+
+        def source(game_name):
+            for page in self.pages(40):
+                pulled.append(page)
+                yield page
+
+        service.embedding_model.encode = Mock(side_effect=blocking_encode)
+        with patch('services.vector_service.INGEST_QUEUE_SIZE', 1), \
+             patch('services.vector_service.INGEST_BATCH_SIZE', 1), \
+             patch('services.vector_service.iter_game_knowledge', side_effect=source):
+            worker = threading.Thread(target=service.add_game_knowledge, args=('test_game',))
+            worker.start()
+            time.sleep(0.5)
+            pulled_while_blocked = len(pulled)
+            release.set()
+            worker.join(10)
+
+        assert pulled_while_blocked < 10
+        assert service.get_or_create_collection('test_game', 'wiki').count() == 40
+
+    @pytest.mark.unit
+    def test_failing_stage_aborts_run(self, service):
+        """Test an upsert error stops the pipeline and reports failure."""
+        collection = Mock()
+        collection.get.return_value = {'ids': [], 'metadatas': []}
+        collection.upsert.side_effect = RuntimeError("disk full")
+        with patch.object(service, 'get_or_create_collection', return_value=collection), \
+             patch('services.vector_service.iter_game_knowledge', return_value=self.pages(20)):
+            assert service.add_game_knowledge('test_game') is False
+
+        progress = service.get_ingest_progress('test_game')
+        assert progress['state'] == 'failed'
+        assert 'disk full' in progress['error']
+
+
+class TestQuantizedStorage:
+    """Test cases for int8 / float16 vector storage outside Chroma."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("quantization", ['int8', 'float16'])
+    @pytest.mark.parametrize("unified", [False, True])
+    def test_search_matches_float32_storage(self, temp_vector_db_dir, quantization, unified):
+        """Test quantized collections return the same results as float32 ones."""
+        knowledge = make_knowledge("Wiki text about swords", "Forum text about swords")
+        baseline = make_service(os.path.join(temp_vector_db_dir, 'float32'), unified_collections=unified)
+        quantized = make_service(os.path.join(temp_vector_db_dir, quantization),
+                                 unified_collections=unified, quantization=quantization)
+        with stream_knowledge(knowledge):
+            baseline.add_game_knowledge('test_game')
+            quantized.add_game_knowledge('test_game')
+
+        for content_types in (None, ['forum']):
+            expected = baseline.search_knowledge('test_game', 'swords', content_types=content_types)
+            results = quantized.search_knowledge('test_game', 'swords', content_types=content_types)
+            assert [r['content'] for r in results] == [r['content'] for r in expected]
+            assert [r['distance'] for r in results] == pytest.approx([r['distance'] for r in expected], abs=1e-4)
+
+    @pytest.mark.unit
+    def test_stale_chunks_leave_the_index(self, temp_vector_db_dir):
+        """Test re-ingestion and deletion keep the quantized index in sync."""
+        service = make_service(temp_vector_db_dir, quantization='int8')
+        with stream_knowledge(make_knowledge("Old content about the boss.")):
+            service.add_game_knowledge('test_game')
+        with stream_knowledge(make_knowledge("New content about the boss.")):
+            service.add_game_knowledge('test_game')
+
+        collection = service.get_or_create_collection('test_game', 'wiki')
+        assert collection.metadata['quantization'] == 'int8'
+        assert service.dense_index(collection).count() == 1
+        assert service.search_knowledge('test_game', 'boss')[0]['content'] == 'New content about the boss.'
+
+        assert service.delete_game_knowledge('test_game') is True
+        assert not os.path.exists(os.path.join(temp_vector_db_dir, 'dense', 'test_game_wiki'))
+        assert service.search_knowledge('test_game', 'boss') == []
+
+
+class TestBruteForceBackend:
+    """Test cases for switching between in-process NumPy search and Chroma."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("unified", [False, True])
+    def test_results_match_chroma(self, temp_vector_db_dir, unified):
+        """Test both backends return the same hits behind search_knowledge."""
+        knowledge = make_knowledge("Wiki text about swords", "Forum text about swords")
+        chroma = make_service(os.path.join(temp_vector_db_dir, 'chroma'), unified_collections=unified,
+                              brute_force_max_vectors=0)
+        flat = make_service(os.path.join(temp_vector_db_dir, 'flat'), unified_collections=unified)
+        with stream_knowledge(knowledge):
+            chroma.add_game_knowledge('test_game')
+            flat.add_game_knowledge('test_game')
+
+        for content_types in (None, ['forum']):
+            expected = chroma.search_knowledge('test_game', 'swords', content_types=content_types)
+            results = flat.search_knowledge('test_game', 'swords', content_types=content_types)
+            assert [r['content'] for r in results] == [r['content'] for r in expected]
+            assert [r['metadata'] for r in results] == [r['metadata'] for r in expected]
+            assert [r['distance'] for r in results] == pytest.approx([r['distance'] for r in expected], abs=1e-4)
+        assert all(index is not None for index in flat.flat_indexes.values())
+        assert all(index is None for index in chroma.flat_indexes.values())
+
+    @pytest.mark.unit
+    def test_small_collection_skips_chroma_queries(self, service):
+        """Test a small collection is answered in-process and kept in sync."""
+        with stream_knowledge(make_knowledge("Old content about the boss.")):
+            service.add_game_knowledge('test_game')
+        service.search_knowledge('test_game', 'boss', content_types=['wiki'])
+
+        with stream_knowledge(make_knowledge("New content about the boss.")), \
+             patch('chromadb.api.models.Collection.Collection.query') as query:
+            service.add_game_knowledge('test_game')
+            results = service.search_knowledge('test_game', 'boss', content_types=['wiki'])
+
+        query.assert_not_called()
+        assert [r['content'] for r in results] == ['New content about the boss.']
+
+    @pytest.mark.unit
+    def test_growing_collection_switches_to_chroma(self, temp_vector_db_dir):
+        """Test a collection that outgrows the brute-force size is queried via Chroma."""
+        service = make_service(temp_vector_db_dir, brute_force_max_vectors=2)
+        with stream_knowledge(make_knowledge("First page about the boss.")):
+            service.add_game_knowledge('test_game')
+        service.search_knowledge('test_game', 'boss', content_types=['wiki'])
+        assert service.flat_indexes['test_game_wiki'] is not None
+
+        knowledge = make_knowledge("First page about the boss.")
+        knowledge['wiki'] += [{'url': f'https://example.com/wiki{i}', 'title': 'Page', 'description': '',
+                               'content': f"Page {i} about the boss."} for i in range(2, 5)]
+        with stream_knowledge(knowledge):
+            service.add_game_knowledge('test_game')
+
+        assert service.flat_indexes['test_game_wiki'] is None
+        assert len(service.search_knowledge('test_game', 'boss', content_types=['wiki'], limit=10)) == 4
+
+    @pytest.mark.unit
+    def test_copy_built_during_write_keeps_new_rows(self, service):
+        """Test a search building the in-process copy while chunks are written still finds them."""
+        with stream_knowledge(make_knowledge("Old content about the boss.")):
+            service.add_game_knowledge('test_game')
+        collection = service.get_or_create_collection('test_game', 'wiki')
+        writing = threading.Event()
+        original_upsert = collection.upsert
+
+        def slow_upsert(**kwargs):
+            writing.set()
+            time.sleep(0.2)
+            original_upsert(**kwargs)
+
+        record = {'id': 'wiki_new', 'document': "New content about the boss.",
+                  'metadata': {'game': 'test_game', 'content_type': 'wiki', 'url': 'https://example.com/wiki2',
+                               'title': 'New', 'description': '', 'chunk_index': 0, 'total_chunks': 1}}
+        with patch.object(collection, 'upsert', side_effect=slow_upsert):
+            writer = threading.Thread(target=service.upsert_chunks,
+                                      args=('test_game', collection, [record], fake_encode([record['document']])))
+            writer.start()
+            writing.wait(5)
+            index = service.flat_index(collection)
+            writer.join()
+
+        assert index.count() == 2
+        results = service.search_knowledge('test_game', 'boss', content_types=['wiki'], limit=10)
+        assert sorted(r['content'] for r in results) == ["New content about the boss.", "Old content about the boss."]
+
+
+class TestHybridSearch:
+    """Test cases for BM25 keyword and hybrid retrieval."""
+
+    def knowledge(self):
+        knowledge = make_knowledge("Malenia is an optional boss in the Haligtree.",
+                                   "Strength builds need a heavy weapon.")
+        knowledge['wiki'].append({'url': 'https://example.com/wiki2', 'title': 'Margit', 'description': '',
+                                  'content': "Margit guards Stormveil Castle."})
+        return knowledge
+
+    @pytest.mark.unit
+    def test_keyword_mode_finds_exact_terms(self, service):
+        """Test a name lookup returns the chunk containing the name."""
+        with stream_knowledge(self.knowledge()):
+            service.add_game_knowledge('test_game')
+
+        results = service.search_knowledge('test_game', 'Malenia', search_mode='keyword')
+
+        assert [r['content'] for r in results] == ["Malenia is an optional boss in the Haligtree."]
+        assert results[0]['distance'] is None
+        assert results[0]['score'] > 0
+        assert results[0]['metadata']['url'] == 'https://example.com/wiki1'
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("unified", [False, True])
+    def test_hybrid_ranks_term_match_first(self, temp_vector_db_dir, unified):
+        """Test fusion lifts the keyword match above vector-only hits."""
+        service = make_service(temp_vector_db_dir, unified_collections=unified)
+        with stream_knowledge(self.knowledge()):
+            service.add_game_knowledge('test_game')
+
+        results = service.search_knowledge('test_game', 'Where is Malenia', search_mode='hybrid')
+
+        assert results[0]['content'] == "Malenia is an optional boss in the Haligtree."
+        assert results[0]['distance'] is not None
+        assert len(results) == 3
+        assert [r['score'] for r in results] == sorted((r['score'] for r in results), reverse=True)
+
+        forum_only = service.search_knowledge('test_game', 'Malenia', content_types=['forum'], search_mode='hybrid')
+        assert [r['content_type'] for r in forum_only] == ['forum']
+
+    @pytest.mark.unit
+    def test_keyword_index_follows_ingestion(self, service):
+        """Test stale chunks and deleted games leave the keyword index."""
+        with stream_knowledge(make_knowledge("Old notes about Malenia.")):
+            service.add_game_knowledge('test_game')
+        with stream_knowledge(make_knowledge("New notes about Radahn.")):
+            service.add_game_knowledge('test_game')
+
+        assert service.search_knowledge('test_game', 'Malenia', search_mode='keyword') == []
+        assert len(service.search_knowledge('test_game', 'Radahn', search_mode='keyword')) == 1
+
+        service.delete_game_knowledge('test_game')
+        assert service.keyword_index.count('test_game') == 0
+
+    @pytest.mark.unit
+    def test_existing_chunks_are_indexed_once(self, service):
+        """Test chunks stored before the keyword index existed are backfilled."""
+        with stream_knowledge(make_knowledge("Malenia waits in the Haligtree.")):
+            service.add_game_knowledge('test_game')
+        service.keyword_index.drop_game('test_game')
+        service._keyword_synced.clear()
+
+        results = service.search_knowledge('test_game', 'Malenia', search_mode='keyword')
+
+        assert [r['content'] for r in results] == ["Malenia waits in the Haligtree."]
+
+    @pytest.mark.unit
+    def test_legacy_ids_are_found(self, service):
+        """Test chunks with ids that do not start with their content type are still returned."""
+        collection = service.get_or_create_collection('test_game', 'forum')
+        collection.add(ids=['0f8e4c2a-legacy'], documents=["Malenia parries are worth learning."],
+                       metadatas=[{'url': 'https://example.com/forum1'}],
+                       embeddings=fake_encode(["Malenia parries are worth learning."]).tolist())
+
+        results = service.search_knowledge('test_game', 'Malenia', search_mode='keyword')
+
+        assert [r['content'] for r in results] == ["Malenia parries are worth learning."]
+        assert results[0]['content_type'] == 'forum'
+
+    @pytest.mark.unit
+    def test_unknown_mode_falls_back_to_vector(self, service):
+        """Test an unknown search mode behaves like vector search."""
+        with stream_knowledge(self.knowledge()):
+            service.add_game_knowledge('test_game')
+
+        expected = service.search_knowledge('test_game', 'boss', search_mode='vector')
+        assert service.search_knowledge('test_game', 'boss', search_mode='fuzzy') == expected
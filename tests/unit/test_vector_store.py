@@ -0,0 +1,61 @@
+"""
+Test suite for the shared Chroma store registry.
+
+This module tests that every user of a vector_db directory gets the same
+client and collection handles, including the chat history manager.
+"""
+
+import pytest
+import os
+import sys
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from services.vector_store import get_store
+    from backend.chat_history import ChatHistoryManager
+except ImportError as e:
+    pytest.skip(f"Vector store modules not available: {e}", allow_module_level=True)
+
+
+class TestGetStore:
+    """Test cases for the process-wide store registry."""
+
+    @pytest.mark.unit
+    def test_one_store_per_directory(self, temp_dir):
+        """Test the same directory, however spelled, maps to one client."""
+        path = os.path.join(temp_dir, 'vector_db')
+        store = get_store(path)
+
+        assert get_store(os.path.join(path, '..', 'vector_db')) is store
+        assert get_store(os.path.join(temp_dir, 'other')) is not store
+
+    @pytest.mark.unit
+    def test_collection_handles_are_shared(self, temp_dir):
+        """Test collections are opened once and forgotten when deleted."""
+        store = get_store(os.path.join(temp_dir, 'vector_db'))
+
+        collection = store.get_or_create_collection('elden_ring_wiki', metadata={'game': 'Elden Ring'})
+        assert store.get_or_create_collection('elden_ring_wiki') is collection
+        assert collection.metadata == {'game': 'Elden Ring'}
+
+        store.delete_collection('elden_ring_wiki')
+        assert 'elden_ring_wiki' not in store.collections
+        assert store.client.list_collections() == []
+
+    @pytest.mark.unit
+    def test_chat_history_shares_the_client(self, temp_dir):
+        """Test chat history opens the directory through the shared store."""
+        path = os.path.join(temp_dir, 'vector_db')
+        manager = ChatHistoryManager(persist_directory=path)
+
+        collection = manager._get_or_create_collection('Elden Ring')
+
+        store = get_store(path)
+        assert manager.client is store.client
+        assert store.collections['elden_ring_chat_history'] is collection
+        assert collection.metadata == {'game': 'Elden Ring', 'type': 'chat_history'}
+        assert manager.get_stats('Elden Ring')['total_messages'] == 0